@@ -1,9 +1,7 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
 from google_monitor import GoogleAdMonitor
 import json
-import glob
 import os
-from datetime import datetime
 import requests
 from urllib.parse import urlencode, urljoin, urlparse
 from bs4 import BeautifulSoup
@@ -14,8 +12,15 @@ import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from src.config import KeywordConfig
-from src.core.results.deduplication import deduplicate_keyword_records, deduplicate_results, merge_and_deduplicate
+from src.config import CrawlerConfig, KeywordConfig, StorageConfig
+from src.core.crawler.jobs import CrawlJobManager
+from src.core.results import CrawlDiff, KeywordArchive, KeywordRecordExporter, get_result_store
+from src.core.results.browse import SORT_LATEST, browse_results
+from src.core.results.cache import PayloadCache
+from src.core.results.search import search_pages
+from src.core.results.serialization import load_results
+from src.utils.proxy_client import get_proxy_client
+from src.utils.screenshot_manifest import get_screenshot_manifest
 from src.utils.screenshot import create_driver, wait_for_page_load, update_results_json, capture_screenshot, save_screenshot
 
 app = Flask(__name__)
@@ -41,66 +46,14 @@ def normalize_url(url):
 def load_all_results():
     """加载所有监控结果"""
     try:
-        with open('all_results.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+        return get_result_store().all()
     except Exception as e:
         print(f"Error loading results: {str(e)}")
         return []
 
-def save_results(new_results, market):
-    """保存新的监控结果，避免重复"""
-    all_results = load_all_results()
-    
-    # 处理新结果
-    for result in new_results:
-        # 获取最新的 keyword_records
-        if 'keyword_records' in result and result['keyword_records']:
-            latest_record = result['keyword_records'][-1]
-            keyword = latest_record.get('keyword', '')
-            title = latest_record.get('title', '')
-        else:
-            # 如果没有历史记录，则从当前结果中获取
-            keyword = result.get('keyword', '') or result.get('search_term', '')
-            title = result.get('ad_title', '') or result.get('title', '')
-        
-        # 只有当 keyword 和 title 都不为空时才添加记录
-        if keyword and title:
-            # 创建关键词记录
-            keyword_record = {
-                'timestamp': datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%f'),
-                'market': market,
-                'keyword': keyword,
-                'title': title
-            }
-            
-            # 添加关键词记录
-            if 'keyword_records' not in result:
-                result['keyword_records'] = []
-            result['keyword_records'].append(keyword_record)
-    
-    # 使用去重模块处理结果
-    merged_results = merge_and_deduplicate(all_results, new_results)
-    deduped_results = deduplicate_results(merged_results)
-    
-    # 保存结果
-    with open('all_results.json', 'w', encoding='utf-8') as f:
-        json.dump(deduped_results, f, ensure_ascii=False, indent=2)
-    
-    return deduped_results
-
 def get_screenshot_filename(url):
-    """根据URL获取对应的截图文件名"""
-    from urllib.parse import urlparse
-    import glob
-    import os
-    
-    domain = urlparse(url).netloc.replace('.', '')
-    pattern = os.path.join('screenshots', f'*{domain}.png')
-    matches = glob.glob(pattern)
-    
-    return os.path.basename(matches[0]) if matches else None
+    """根据URL获取对应的截图文件名（从截图清单中查找）"""
+    return get_screenshot_manifest().filename_for(url)
 
 @app.route('/')
 def index():
@@ -111,17 +64,63 @@ def index():
     except Exception as e:
         return render_template('index.html', keywords=[], error=str(e))
 
+# /latest 的响应缓存（结果存储写入后失效）
+latest_cache = PayloadCache()
+
+def cached_json_response(payload):
+    """
+    返回缓存的 JSON 响应：If-None-Match 匹配时返回 304，否则按 Accept-Encoding 返回压缩后的内容
+    """
+    headers = {
+        'ETag': f'W/"{payload.etag}"',
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache'  # 每次都向服务器确认，未变化时只返回 304
+    }
+    if request.if_none_match.contains_weak(payload.etag):
+        return Response(status=304, headers=headers)
+    encoding = payload.choose_encoding(lambda name: request.accept_encodings[name] > 0)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(payload.encoded(encoding), mimetype='application/json', headers=headers)
+
 @app.route('/latest')
 def get_latest_results():
-    """获取最新的监控结果"""
-    results = load_all_results()
-    # 更新每个结果的screenshot字段
-    for result in results:
-        if 'final_url' in result:
-            screenshot = get_screenshot_filename(result['final_url'])
-            if screenshot:
-                result['screenshot'] = screenshot
-    return jsonify(results)
+    """
+    分页获取监控结果
+
+    参数: market, keyword, q（文本）, since / until（时间范围）, sort（latest / oldest / domain）,
+    cursor（上一页返回的 next_cursor）, limit（每页数量）
+    """
+    store = get_result_store()
+
+    def build():
+        page = browse_results(
+            store,
+            market=request.args.get('market') or None,
+            keyword=request.args.get('keyword') or None,
+            q=request.args.get('q') or None,
+            since=request.args.get('since') or None,
+            until=request.args.get('until') or None,
+            sort=request.args.get('sort') or SORT_LATEST,
+            cursor=request.args.get('cursor') or None,
+            limit=request.args.get('limit', default=StorageConfig.BROWSE_PAGE_SIZE, type=int)
+        )
+        # 更新每个结果的screenshot字段
+        for result in page['results']:
+            if 'final_url' in result:
+                screenshot = get_screenshot_filename(result['final_url'])
+                if screenshot:
+                    result['screenshot'] = screenshot
+        return {'status': 'success', **page}
+
+    try:
+        key = tuple(sorted(request.args.items(multi=True)))
+        # 截图清单变化（如其他进程保存了截图）时缓存同样失效
+        version = f'{store.version()}:{get_screenshot_manifest().version}'
+        payload = latest_cache.get(key, version, build)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return cached_json_response(payload)
 
 @app.route('/api/keywords', methods=['GET'])
 def get_keywords():
@@ -192,61 +191,31 @@ def toggle_keyword(category, keyword):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def run_crawl_job(job):
+    """在后台线程中运行 google_monitor.py 的 main 函数，结果按 original_url 合并写入结果存储"""
+    from google_monitor import main
+    return main(on_progress=job.publish, cancel_event=job.cancel_event)
+
+# 后台爬取任务（同一时间只运行一个）
+crawl_jobs = CrawlJobManager(run_crawl_job)
+
 @app.route('/crawl', methods=['POST'])
+@app.route('/api/crawl_jobs', methods=['POST'])
 def crawl():
-    """爬取指定关键词的广告"""
+    """启动后台爬取任务，已有任务在运行时返回该任务；进度见 /api/crawl_jobs/<job_id>/events"""
     try:
         # 直接使用已启用的关键词
         keywords = KeywordConfig.load_keywords()  # 这个方法现在只返回启用的关键词
         if not keywords:
             return jsonify({'error': '没有启用的关键词'}), 400
-            
-        # 备份现有结果
-        try:
-            with open('all_results.json', 'r', encoding='utf-8') as f:
-                existing_results = json.load(f)
-        except:
-            existing_results = []
-            
-        # 创建临时文件来存储新结果
-        if os.path.exists('temp_results.json'):
-            os.remove('temp_results.json')
-            
-        # 直接调用google_monitor.py的main函数，但使用临时文件
-        from google_monitor import main
-        main(output_file='temp_results.json')
         
-        # 读取新爬取的结果
-        try:
-            with open('temp_results.json', 'r', encoding='utf-8') as f:
-                new_results = json.load(f)
-                
-            # 使用去重函数处理结果
-            from src.core.results.deduplication import merge_and_deduplicate
-            merged_results = merge_and_deduplicate(existing_results, new_results)
-            
-            # 保存去重后的结果
-            with open('all_results.json', 'w', encoding='utf-8') as f:
-                json.dump(merged_results, f, ensure_ascii=False, indent=2)
-                
-            # 清理临时文件
-            if os.path.exists('temp_results.json'):
-                os.remove('temp_results.json')
-                
-            return jsonify({
-                'message': '爬取完成',
-                'results': merged_results
-            })
-        except FileNotFoundError:
-            # 如果文件不存在但有备份，恢复备份
-            if existing_results:
-                with open('all_results.json', 'w', encoding='utf-8') as f:
-                    json.dump(existing_results, f, ensure_ascii=False, indent=2)
-                return jsonify({
-                    'message': '爬取失败，已恢复备份',
-                    'results': existing_results
-                })
-            return jsonify({'error': '爬取失败且无法恢复备份'}), 500
+        job, created = crawl_jobs.start()
+        return jsonify({
+            'status': 'success',
+            'message': '爬取已开始' if created else '已有爬取任务在运行',
+            'attached': not created,
+            'job': job.to_dict()
+        }), 202 if created else 200
     except Exception as e:
         return jsonify({'error': f'爬取失败: {str(e)}'}), 500
 
@@ -292,36 +261,21 @@ def proxy():
             'Cache-Control': 'max-age=0',
         }
         
-        # 发送请求
-        response = requests.get(
-            url, 
-            headers=headers, 
-            timeout=15,
-            allow_redirects=True,
-            verify=False  # 忽略SSL证书验证
-        )
-        
-        # 获取响应内容类型
-        content_type = response.headers.get('Content-Type', 'text/html')
+        # 通过共享的连接池请求（页面在有效期内直接返回缓存）
+        response = get_proxy_client().get(url, headers=headers, variant='desktop')
         
         # 设置响应头
         response_headers = {
-            'Content-Type': content_type,
+            'Content-Type': response.content_type,
             'Access-Control-Allow-Origin': '*',  # 允许跨域访问
             'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
             'Access-Control-Allow-Headers': 'Content-Type',
             'X-Frame-Options': 'SAMEORIGIN',  # 允许在同源iframe中显示
+            'X-Cache': response.cache_status,
         }
         
-        # 如果是HTML内容，处理相对路径
-        if 'text/html' in content_type.lower():
-            content = response.text
-            # 在这里可以添加HTML理逻辑
-            
-            return content, response.status_code, response_headers
-        else:
-            # 对于其他类型的内容（图片、CSS、JS等）直接返回
-            return response.content, response.status_code, response_headers
+        # HTML 和其他类型的内容（图片、CSS、JS等）都直接返回
+        return response.content, response.status, response_headers
             
     except requests.Timeout:
         return jsonify({'error': '请求超时，请稍后重试'}), 504
@@ -349,8 +303,8 @@ def preview():
             'Upgrade-Insecure-Requests': '1',
         }
         
-        # 通过后端请求目标页面
-        response = requests.get(url, headers=headers, timeout=10)
+        # 通过后端请求目标页面（复用共享的连接池；共享会话默认不验证证书，预览页面需要验证）
+        response = get_proxy_client().session.get(url, headers=headers, timeout=10, verify=True)
         
         # 设置响应头
         response_headers = {
@@ -370,6 +324,53 @@ def mobile_preview():
         return "Missing URL parameter", 400
     return render_template('mobile_preview.html', url=url)
 
+def rewrite_mobile_html(content, base_url):
+    """改写移动端预览的 HTML：移除安全策略 meta 标签，注入 base 标签和禁用框架检测的脚本"""
+    # 移除原有的安全头部meta标签
+    content = re.sub(r'<meta[^>]*http-equiv=["\']Content-Security-Policy["\'][^>]*>', '', content)
+    content = re.sub(r'<meta[^>]*http-equiv=["\']X-Frame-Options["\'][^>]*>', '', content)
+    
+    # 注入新的meta标签
+    meta_tags = '''
+        <meta http-equiv="Content-Security-Policy" content="frame-ancestors *; default-src * 'unsafe-inline' 'unsafe-eval' data: blob:;">
+        <meta http-equiv="X-Frame-Options" content="ALLOWALL">
+        <base href="{}">
+    '''.format(base_url)
+    
+    # 注入meta标签到head
+    if '<head>' in content:
+        content = content.replace('<head>', f'<head>{meta_tags}')
+    else:
+        content = f'<head>{meta_tags}</head>{content}'
+    
+    # 注入脚本以禁用框架检测
+    script = '''
+        <script>
+            // 禁用框架检测
+            if (window.top !== window.self) {
+                try {
+                    // 阻止框架检测
+                    Object.defineProperty(window, 'top', {
+                        get: function() { return window.self; }
+                    });
+                    Object.defineProperty(window, 'parent', {
+                        get: function() { return window.self; }
+                    });
+                    Object.defineProperty(window, 'frameElement', {
+                        get: function() { return null; }
+                    });
+                } catch(e) {}
+            }
+        </script>
+    '''
+    
+    # 在body开始标签后注入脚本
+    if '<body>' in content:
+        content = content.replace('<body>', f'<body>{script}')
+    else:
+        content = f'{script}{content}'
+    return content
+
 @app.route('/mobile_proxy')
 def mobile_proxy():
     """移动端代理请求"""
@@ -394,82 +395,22 @@ def mobile_proxy():
             'Sec-Fetch-User': '?1'
         }
         
-        # 发送请求
-        session = requests.Session()
-        response = session.get(
-            url, 
-            headers=headers, 
-            timeout=15,
-            allow_redirects=True,
-            verify=False
-        )
-        
-        # 获取响应内容类型
-        content_type = response.headers.get('Content-Type', 'text/html')
+        # 通过共享的连接池请求，缓存改写后的 HTML（页面在有效期内直接返回缓存）
+        response = get_proxy_client().get(url, headers=headers, variant='mobile', rewrite_html=rewrite_mobile_html)
         
         # 设置响应头，移除限制性的安全头部
         response_headers = {
-            'Content-Type': content_type,
+            'Content-Type': response.content_type,
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
             'Access-Control-Allow-Headers': '*',
             'Access-Control-Allow-Credentials': 'true',
             'X-Frame-Options': 'ALLOWALL',  # 允许在任何页面中嵌入
             'Content-Security-Policy': "frame-ancestors *; default-src * 'unsafe-inline' 'unsafe-eval' data: blob:;",  # 允许所有来源
+            'X-Cache': response.cache_status,
         }
         
-        # 如果是HTML内容，处理相对路径和安全策略
-        if 'text/html' in content_type.lower():
-            content = response.text
-            
-            # 移除原有的安全头部meta标签
-            content = re.sub(r'<meta[^>]*http-equiv=["\']Content-Security-Policy["\'][^>]*>', '', content)
-            content = re.sub(r'<meta[^>]*http-equiv=["\']X-Frame-Options["\'][^>]*>', '', content)
-            
-            # 注入新的meta标签
-            meta_tags = '''
-                <meta http-equiv="Content-Security-Policy" content="frame-ancestors *; default-src * 'unsafe-inline' 'unsafe-eval' data: blob:;">
-                <meta http-equiv="X-Frame-Options" content="ALLOWALL">
-                <base href="{}">
-            '''.format(response.url)
-            
-            # 注入meta标签到head
-            if '<head>' in content:
-                content = content.replace('<head>', f'<head>{meta_tags}')
-            else:
-                content = f'<head>{meta_tags}</head>{content}'
-            
-            # 注入脚本以禁用框架检测
-            script = '''
-                <script>
-                    // 禁用框架检测
-                    if (window.top !== window.self) {
-                        try {
-                            // 阻止框架检测
-                            Object.defineProperty(window, 'top', {
-                                get: function() { return window.self; }
-                            });
-                            Object.defineProperty(window, 'parent', {
-                                get: function() { return window.self; }
-                            });
-                            Object.defineProperty(window, 'frameElement', {
-                                get: function() { return null; }
-                            });
-                        } catch(e) {}
-                    }
-                </script>
-            '''
-            
-            # 在body开始标签后注入脚本
-            if '<body>' in content:
-                content = content.replace('<body>', f'<body>{script}')
-            else:
-                content = f'{script}{content}'
-            
-            return content, response.status_code, response_headers
-        else:
-            # 对于非HTML内容，直接返回
-            return response.content, response.status_code, response_headers
+        return response.content, response.status, response_headers
             
     except requests.Timeout:
         return jsonify({'error': '请求超时，请稍后重试'}), 504
@@ -479,9 +420,6 @@ def mobile_proxy():
         return jsonify({'error': f'请求错误: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': f'服务器错误: {str(e)}'}), 500
-    finally:
-        if 'session' in locals():
-            session.close()
 
 @app.route('/resource_proxy')
 def resource_proxy():
@@ -502,13 +440,10 @@ def resource_proxy():
             'Origin': urlparse(url).scheme + '://' + urlparse(url).netloc,
         }
         
-        session = requests.Session()
-        response = session.get(
+        response = get_proxy_client().session.get(
             url, 
             headers=headers, 
-            timeout=15,
-            verify=False,
-            stream=True
+            timeout=15
         )
         
         # 设置响应头
@@ -525,9 +460,155 @@ def resource_proxy():
         
     except Exception as e:
         return jsonify({'error': f'资源加载失败: {str(e)}'}), 500
-    finally:
-        if 'session' in locals():
-            session.close()
+
+@app.route('/api/proxy_cache')
+def proxy_cache_stats():
+    """预览代理的缓存统计：各缓存状态的请求数、命中率、缓存条目数和字节数"""
+    return jsonify({'status': 'success', **get_proxy_client().stats()})
+
+@app.route('/api/exports/keyword_records', methods=['GET', 'POST'])
+def export_keyword_records():
+    """关键词记录列式导出：GET 返回导出清单，POST 追加上次导出之后的新记录（full=true 时全部重新导出）"""
+    try:
+        data = request.get_json(silent=True) or {}
+        kwargs = {'fmt': data['format']} if data.get('format') else {}
+        exporter = KeywordRecordExporter(get_result_store(), **kwargs)
+        if request.method == 'GET':
+            return jsonify(exporter.manifest())
+        full = data.get('full', request.args.get('full') in ('1', 'true'))
+        return jsonify({'status': 'success', **exporter.export(full=bool(full))})
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        print(f"导出关键词记录时出错: {str(e)}")
+        return jsonify({'status': 'error', 'message': f'导出失败: {str(e)}'}), 500
+
+@app.route('/api/keyword_history')
+def keyword_history():
+    """域名的完整关键词记录历史（近期记录 + 按需读取的归档记录），可用 since / until 限定时间范围"""
+    domain = request.args.get('domain')
+    if not domain:
+        return jsonify({'status': 'error', 'message': '缺少 domain 参数'}), 400
+    try:
+        records = KeywordArchive(get_result_store()).history(
+            domain, since=request.args.get('since'), until=request.args.get('until')
+        )
+        return jsonify({'status': 'success', 'domain': domain, 'count': len(records), 'records': records})
+    except Exception as e:
+        print(f"读取关键词历史时出错: {str(e)}")
+        return jsonify({'status': 'error', 'message': f'读取失败: {str(e)}'}), 500
+
+@app.route('/api/search')
+def search_results():
+    """按域名、关键词和广告标题搜索落地页，返回按相关度排序的记录 id（q 为查询文本，limit 为数量）"""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'status': 'error', 'message': '缺少 q 参数'}), 400
+    try:
+        limit = request.args.get('limit', default=StorageConfig.BROWSE_PAGE_SIZE, type=int)
+        found = search_pages(get_result_store(), text, limit=min(max(1, limit), StorageConfig.BROWSE_MAX_PAGE_SIZE))
+        return jsonify({'status': 'success', 'count': len(found['results']), **found})
+    except Exception as e:
+        print(f"搜索时出错: {str(e)}")
+        return jsonify({'status': 'error', 'message': f'搜索失败: {str(e)}'}), 500
+
+@app.route('/api/crawl_diffs')
+def crawl_diff_runs():
+    """最近的爬取批次及各类变化的数量，可用 limit 限定数量"""
+    try:
+        limit = request.args.get('limit', default=20, type=int)
+        runs = CrawlDiff(get_result_store()).runs(limit=max(1, limit))
+        return jsonify({'status': 'success', 'runs': runs})
+    except Exception as e:
+        print(f"读取爬取批次时出错: {str(e)}")
+        return jsonify({'status': 'error', 'message': f'读取失败: {str(e)}'}), 500
+
+@app.route('/api/crawl_diffs/<run_id>')
+def crawl_diff_changes(run_id):
+    """爬取批次中新出现、消失和标题变化的广告，run_id 为 latest 时取最近完成的批次，可用 change / keyword / market 过滤"""
+    try:
+        crawl_diff = CrawlDiff(get_result_store())
+        if run_id == 'latest':
+            run_id = crawl_diff.latest_run_id()
+        elif run_id.isdigit():
+            run_id = int(run_id)
+        else:
+            return jsonify({'status': 'error', 'message': f'无效的批次: {run_id}'}), 400
+        run = crawl_diff.run(run_id) if run_id is not None else None
+        if run is None:
+            return jsonify({'status': 'error', 'message': '批次不存在'}), 404
+        changes = crawl_diff.changes(
+            run_id,
+            change=request.args.get('change'),
+            keyword=request.args.get('keyword'),
+            market=request.args.get('market')
+        )
+        return jsonify({'status': 'success', 'run': run, 'count': len(changes), 'changes': changes})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        print(f"读取爬取差异时出错: {str(e)}")
+        return jsonify({'status': 'error', 'message': f'读取失败: {str(e)}'}), 500
+
+@app.route('/api/crawl_jobs')
+def list_crawl_jobs():
+    """最近的爬取任务（从新到旧），current 为正在运行的任务 id"""
+    current = crawl_jobs.current()
+    return jsonify({
+        'status': 'success',
+        'current': current.id if current is not None else None,
+        'jobs': [job.to_dict() for job in crawl_jobs.jobs()]
+    })
+
+@app.route('/api/crawl_jobs/<job_id>')
+def get_crawl_job(job_id):
+    """爬取任务的状态和进度"""
+    job = crawl_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict()})
+
+@app.route('/api/crawl_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_crawl_job(job_id):
+    """取消爬取任务：不再开始新的关键词，已完成部分保留在检查点中，下次爬取时恢复"""
+    job = crawl_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    if not crawl_jobs.cancel(job_id):
+        return jsonify({'status': 'error', 'message': '任务已结束', 'job': job.to_dict()}), 409
+    return jsonify({'status': 'success', 'message': '正在取消', 'job': job.to_dict()})
+
+@app.route('/api/crawl_jobs/<job_id>/events')
+def crawl_job_events(job_id):
+    """
+    爬取任务的进度流（Server-Sent Events）：每个进度事件一条消息，id 为事件序号，
+    断线重连时按 Last-Event-ID（或 since 参数）继续发送；任务结束（finished 事件）后关闭
+    """
+    job = crawl_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    last_event = request.headers.get('Last-Event-ID') or request.args.get('since') or '0'
+    seq = int(last_event) if last_event.isdigit() else 0
+
+    def stream(seq):
+        yield 'retry: 3000\n\n'
+        while True:
+            events = job.events_after(seq, timeout=CrawlerConfig.JOB_HEARTBEAT_INTERVAL)
+            if not events:
+                if job.finished:
+                    return
+                # 心跳，避免代理因连接空闲而断开
+                yield ': heartbeat\n\n'
+                continue
+            for seq, event_type, data in events:
+                yield f'id: {seq}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n'
+            if job.finished and seq >= job.last_seq:
+                return
+
+    return Response(stream(seq), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # 禁止 nginx 缓冲
+    })
 
 @app.route('/screenshots/<path:filename>')
 def serve_screenshot(filename):
@@ -554,70 +635,33 @@ def delete_record():
                 'message': '缺少 final_url 参数'
             }), 400
             
-        # 读取现有数据
+        # 按 final_url 删除记录（索引查询）
+        store = get_result_store()
         try:
-            with open('all_results.json', 'r', encoding='utf-8') as f:
-                results = json.load(f)
-                print(f"成功读取数据文件，当前记录数: {len(results)}")
-                
-                # 打印所有的 final_url，帮助调试
-                print("\n当前所有的 final_url:")
-                for r in results:
-                    print(f"- {r.get('final_url')}")
-                print("\n")
-                
-        except FileNotFoundError:
-            print("数据文件不存在")
+            deleted = store.delete('final_url', final_url)
+        except Exception as e:
+            print(f"删除数据时出错: {str(e)}")
             return jsonify({
                 'status': 'error',
-                'message': '数据文件不存在'
-            }), 404
-            
-        # 在删除前记录当前数量
-        original_count = len(results)
-        print(f"当前记录数: {original_count}")
-        
-        # 查找并删除记录
-        new_results = []
-        found = False
-        for r in results:
-            current_url = r.get('final_url')
-            if current_url == final_url:
-                found = True
-                print(f"找到要删除的记录: {final_url}")
-                continue
-            new_results.append(r)
+                'message': f'删除数据时出错: {str(e)}'
+            }), 500
             
         # 检查是否有记录被删除
-        if not found:
+        if not deleted:
             print(f"未找到要删除的记录: {final_url}")
-            print("URL 比对结果:")
-            for r in results:
-                print(f"数据库中: {r.get('final_url')}")
-                print(f"请求URL: {final_url}")
-                print(f"是否匹配: {r.get('final_url') == final_url}\n")
             return jsonify({
                 'status': 'error',
                 'message': f'未找到要删除的记录: {final_url}'
             }), 404
             
-        # 保存更新后的数据
-        try:
-            with open('all_results.json', 'w', encoding='utf-8') as f:
-                json.dump(new_results, f, ensure_ascii=False, indent=2)
-            print(f"成功保存更新后的数据，剩余记录数: {len(new_results)}")
-        except Exception as e:
-            print(f"保存数据时出错: {str(e)}")
-            return jsonify({
-                'status': 'error',
-                'message': f'保存数据时出错: {str(e)}'
-            }), 500
+        remaining_count = store.count()
+        print(f"成功删除 {deleted} 条记录，剩余记录数: {remaining_count}")
             
         return jsonify({
             'status': 'success',
             'message': '记录已删除',
             'deleted_url': final_url,
-            'remaining_count': len(new_results)
+            'remaining_count': remaining_count
         })
         
     except Exception as e:
@@ -746,35 +790,32 @@ def after_request(response):
 @app.route('/merge_results', methods=['POST'])
 def merge_results():
     try:
-        # 读取现有的 all_results.json
-        with open('all_results.json', 'r', encoding='utf-8') as f:
-            all_results = json.load(f)
+        store = get_result_store()
             
         # 获取 results 目录下的所有 json 文件
         results_dir = 'results'
         json_files = [f for f in os.listdir(results_dir) if f.endswith('.json')]
         
-        for json_file in json_files:
-            with open(os.path.join(results_dir, json_file), 'r', encoding='utf-8') as f:
-                new_results = json.load(f)
-                
-            # 合并数据时需要确保字段名一致
-            for result in new_results:
-                # 检查是否已存在相同的 landing_page
-                existing_result = next((r for r in all_results if r['landing_page'] == result['landing_page']), None)
-                
-                if existing_result:
-                    # 更新现有记录
-                    if 'screenshot_path' in result:  # 这里需要确保使用 screenshot_path
-                        existing_result['screenshot_path'] = result['screenshot_path']
-                    # 更新其他字段...
-                else:
-                    # 添加新记录
-                    all_results.append(result)
+        with store.transaction():
+            for json_file in json_files:
+                new_results = load_results(os.path.join(results_dir, json_file))
                     
-        # 保存更新后的数据
-        with open('all_results.json', 'w', encoding='utf-8') as f:
-            json.dump(all_results, f, indent=2, ensure_ascii=False)
+                # 合并数据时需要确保字段名一致
+                for result in new_results:
+                    # 检查是否已存在相同的落地页（旧格式使用 landing_page 字段）
+                    landing_page = result.get('final_url') or result.get('landing_page')
+                    existing = store.find_one('final_url', landing_page) if landing_page else None
+                    
+                    if existing:
+                        # 更新现有记录
+                        page_id, existing_result = existing
+                        if 'screenshot_path' in result:  # 这里需要确保使用 screenshot_path
+                            existing_result['screenshot_path'] = result['screenshot_path']
+                            store.update(page_id, existing_result)
+                        # 更新其他字段...
+                    else:
+                        # 添加新记录
+                        store.insert(result)
             
         return jsonify({'status': 'success', 'message': '数据合并成功'})
         
@@ -790,5 +831,8 @@ if __name__ == '__main__':
     # 确保截图目录存在
     os.makedirs(app.config['SCREENSHOT_FOLDER'], exist_ok=True)
     
+    # 监视截图目录，爬取进程保存的截图也会更新到截图清单
+    get_screenshot_manifest().start_watching()
+    
     # 启动服务器
     app.run(debug=True, port=9090, host='0.0.0.0')
@@ -1,22 +1,41 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from datetime import datetime
 import time
-import json
 import logging
 import requests
 import urllib3
-from urllib.parse import unquote, urlparse, parse_qs
+from urllib.parse import unquote, urlparse
 import os
 import glob
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import traceback
 import ssl
-from src.config import KeywordConfig
+from src.config import KeywordConfig, CrawlerConfig, MonitorConfig, StorageConfig
+from src.core.crawler import (
+    AdaptiveConcurrency,
+    CrawlCheckpoint,
+    CrawlUnit,
+    DriverPool,
+    ExtractionStats,
+    PipelineStage,
+    RedirectCache,
+    RedirectResolver,
+    SERP_READY_STATES,
+    SingleFlight,
+    StagedPipeline,
+    build_search_url,
+    extract_ads,
+    get_market_params,
+    parse_serp_html,
+    save_serp_snapshot,
+    wait_for_serp_ready
+)
 from src.utils.screenshot import save_screenshot, capture_screenshot
+from src.core.results import CrawlDiff, DomainIndex, KeywordArchive, ResultsCommitter, get_result_store, get_results_committer
+from src.core.results.serialization import dump_results
 from src.core.results.deduplication import deduplicate_results
 
 # 配置SSL
@@ -35,29 +54,33 @@ requests.packages.urllib3.disable_warnings()
 save_lock = threading.Lock()
 
 class GoogleAdMonitor:
-    def __init__(self, target_market="in"):
+    def __init__(self, target_market="in", markets=None):
         self.target_market = target_market
+        self.markets = [market.lower() for market in (markets or [target_market])]  # 一次爬取覆盖的市场
         self.setup_logging()
         self.driver = None  # 初始化时不创建driver
+        self.driver_pool = None  # 搜索结果页浏览器池，在 monitor_keywords 中创建
+        self.landing_pool = None  # 落地页截图浏览器池，在 monitor_keywords 中创建
+        self.pipeline = None  # 当前运行的爬取流水线，可通过 pipeline.snapshot() 查看各阶段状态
+        self.concurrency = None  # 搜索结果页阶段的自适应并发控制器，在 monitor_keywords 中创建
+        self.checkpoint = None  # 爬取检查点，结果保存后调用 checkpoint.finish() 删除
+        self.extraction_stats = ExtractionStats()  # 广告提取统计
+        self.screenshot_flight = SingleFlight(remember=True)  # 同一域名在各市场间只截图一次
+        self.new_records = {}  # 本次爬取新建的记录（域名 -> 记录），各市场共用
+        self.store = get_result_store()  # 结果存储
+        self.committer = get_results_committer()  # 结果写入线程，所有对结果存储的修改都由它按批次提交
+        self.crawl_diff = CrawlDiff(self.store)  # 每次爬取与上次看到的广告之间的差异
+        self.cancel_event = None  # 设置后停止爬取，见 monitor_keywords 的 cancel_event 参数
+        self.index = None  # 已有结果的域名索引，每次爬取加载一次，见 get_index()
         
         # 创建保存目录
         self.screenshots_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'screenshots')
         if not os.path.exists(self.screenshots_dir):
             os.makedirs(self.screenshots_dir)
         
-        # 配置requests会话
-        self.session = requests.Session()
-        self.session.verify = False  # 禁用SSL验证
-        
-        # 设置默认请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        # 跳转解析器（共享连接池，支持并发解析，解析结果持久化缓存）
+        self.redirect_resolver = RedirectResolver(cache=RedirectCache())
+        self.session = self.redirect_resolver.session
 
     def setup_logging(self):
         logging.basicConfig(
@@ -118,6 +141,9 @@ class GoogleAdMonitor:
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.implicitly_wait(10)
         
+        # 记录启动时的窗口大小，归还浏览器池时恢复（截图时会把窗口调整为整页高度）
+        driver.launch_window_size = driver.get_window_size()
+        
         # 执行反自动化检测的JavaScript代码
         driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
             'source': '''
@@ -129,282 +155,271 @@ class GoogleAdMonitor:
         
         return driver
 
+    def reset_driver(self, driver):
+        """归还浏览器池前清理状态（Cookie、当前页面的 localStorage / sessionStorage、窗口大小），避免不同关键词之间互相影响"""
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        # 本地存储按源隔离，需要在离开页面前清理（about:blank 等页面不能访问存储，忽略）
+        try:
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+        except Exception as e:
+            self.logger.debug(f"清理页面存储失败: {str(e)}")
+        driver.get('about:blank')
+        launch_size = getattr(driver, 'launch_window_size', None)
+        if launch_size and driver.get_window_size() != launch_size:
+            driver.set_window_size(launch_size['width'], launch_size['height'])
+
+    def create_driver_pool(self, max_size=CrawlerConfig.DRIVER_POOL_SIZE, name='serp'):
+        """创建浏览器池"""
+        return DriverPool(
+            factory=self.create_driver,
+            max_size=max_size,
+            max_uses=CrawlerConfig.DRIVER_MAX_USES,
+            lease_timeout=CrawlerConfig.DRIVER_LEASE_TIMEOUT,
+            reset=self.reset_driver,
+            name=name
+        )
+
     def get_final_url(self, url, max_retries=3, timeout=10, backoff_factor=0.3):
         """获取最终的重定向URL，包含重试机制和错误处理"""
-        if not url:
-            return None
+        return self.redirect_resolver.resolve(url)
+
+    def close(self):
+        """释放监控器持有的资源"""
+        self.redirect_resolver.close()
+
+    def fetch_serp_ads(self, keyword, driver, unit=None, market=None):
+        """
+        访问搜索结果页并收集广告的基本信息（标题、链接、位置）
         
-        # 特殊处理 Google Ads URL
-        if 'google.com/aclk' in url:
-            try:
-                parsed = urlparse(url)
-                params = parse_qs(parsed.query)
-                
-                # 检查是否存在目标URL参数
-                target_url = None
-                for param in ['adurl', 'dest', 'url']:
-                    if param in params:
-                        target_url = params[param][0]
-                        break
-                    
-                if target_url:
-                    # 递归调用以获取目标URL的最终重定向
-                    return self.get_final_url(target_url)
-            except Exception as e:
-                self.logger.error(f"处理 Google Ads URL 时出错: {str(e)}")
+        Args:
+            keyword: 关键词
+            driver: 浏览器驱动实例
+            unit: 流水线中的爬取单元，提供时记录页面就绪状态
+            market: 市场代码，默认使用 target_market
+        """
+        market = (market or self.target_market).lower()
+        params = get_market_params(market)
+        self.logger.info(f"Searching in {params.gl.upper()} market (mobile, {params.domain}): {keyword}")
+        
+        search_url = build_search_url(keyword, market)
+        self.logger.info(f"访问URL: {search_url}")
+        driver.get(search_url)
+        
+        # 滚动页面以触发广告加载，然后等待页面就绪（出现广告、确认无广告或 DOM 静默）
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/4); window.scrollTo(0, 0);")
+        readiness = wait_for_serp_ready(driver)
+        self.logger.info(
+            f"关键词 '{keyword}' 页面就绪: {readiness.state}, "
+            f"等待 {readiness.waited:.2f}s (上限 {CrawlerConfig.SERP_WAIT_TIMEOUT}s)"
+        )
+        if unit is not None:
+            unit.serp_state = readiness.state
+        if readiness.state == 'blocked':
+            self.logger.warning(f"关键词 '{keyword}' 触发了 Google 验证码拦截，跳过")
+            return []
         
-        # 处理 App Store URLs
-        if 'apps.apple.com' in url:
+        extracted = self.extract_serp_ads(keyword, driver, readiness.ads, market)
+        total_ads = extracted['total']
+        raw_ads = extracted['raw_ads']
+        if total_ads:
+            self.logger.info(
+                f"关键词 '{keyword}' 找到 {total_ads} 个广告 (选择器: {extracted['selector']}"
+                f"{', 兜底提取' if extracted['fallback'] else ''})"
+            )
+        for ad_info in raw_ads:
+            self.logger.info(f"关键词 '{keyword}' - 广告 {ad_info['position']}/{total_ads}: {ad_info['title']}")
+        
+        self.logger.info(f"关键词 '{keyword}' 成功收集 {len(raw_ads)} 个有效广告")
+        return raw_ads
+
+    def extract_serp_ads(self, keyword, driver, expected_ads=0, market=None):
+        """
+        提取当前搜索结果页中的广告
+
+        snapshot 模式下一次获取页面源码并在进程内解析；页面上检测到广告容器但快照中
+        解析不到时，改用浏览器内提取。
+
+        Args:
+            keyword: 关键词
+            driver: 浏览器驱动实例
+            expected_ads: 就绪检测时看到的广告容器数量
+            market: 市场代码，用于快照文件名
+
+        Returns:
+            Dict[str, Any]: selector、total、raw_ads、fallback
+        """
+        if CrawlerConfig.SERP_EXTRACTION_MODE == 'snapshot':
             try:
-                parsed = urlparse(url)
-                if parsed.scheme == 'itms-apps':
-                    return url.replace('itms-apps://', 'https://')
-                return url
+                html = driver.page_source
+                if CrawlerConfig.SERP_SAVE_SNAPSHOTS:
+                    save_serp_snapshot(html, keyword, market or self.target_market)
+                extracted = parse_serp_html(html, driver.current_url)
+                if extracted['total'] or not expected_ads:
+                    self.extraction_stats.record(False, snapshot=True)
+                    return extracted
+                self.logger.warning(f"关键词 '{keyword}' 快照中未解析到广告，改用浏览器内提取")
             except Exception as e:
-                self.logger.error(f"处理 App Store URL 时出错: {str(e)}")
-                return url
-            
-        # 原有的重定向处理逻辑...
-        session = requests.Session()
-        session.max_redirects = 5
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
+                self.logger.warning(f"关键词 '{keyword}' 快照解析失败，改用浏览器内提取: {str(e)}")
         
-        try:
-            response = session.get(
-                url,
-                allow_redirects=True,
-                timeout=timeout,
-                headers=headers,
-                verify=False
-            )
-            
-            if response.status_code == 200:
-                return response.url
-        except Exception as e:
-            self.logger.error(f"获取最终URL失败: {url}, 错误: {str(e)}")
+        # 一次脚本调用收集所有广告的基本信息
+        return extract_ads(driver, self.extraction_stats)
+
+    def resolve_ads(self, raw_ads):
+        """并发解析广告的最终URL和域名，结果与广告顺序一致"""
+        final_urls = self.redirect_resolver.resolve_many(ad_info["link"] for ad_info in raw_ads)
         
-        return url
+        ads = []
+        for ad_info, final_url in zip(raw_ads, final_urls):
+            if not final_url:
+                continue
+            ads.append(dict(ad_info, final_url=final_url, domain=urlparse(final_url).netloc))
+        return ads
 
-    def get_google_ads(self, keyword, driver):
-        """获取Google广告结果"""
-        ad_results = []
-        raw_ads = []  # 用于暂存原始广告信息
-        seen_links = set()  # 用于存储已见过的链接
+    def get_index(self, reload=False):
+        """获取已有结果的域名索引，首次使用或 reload=True 时从结果存储加载"""
+        with save_lock:
+            if self.index is None or reload:
+                if self.index is not None:
+                    self.index.flush()
+                self.index = DomainIndex(self.store, committer=self.committer).load()
+            return self.index
+
+    def add_keyword_record(self, record, keyword, title, market):
+        """
+        为域名记录添加关键词记录，同一关键词和市场只保留最新的一条
         
-        try:
-            # 根据目标市场构建Google搜索URL
-            market_params = {
-                "in": {"gl": "in", "hl": "en-IN", "country": "india"},
-            }
-            
-            params = market_params.get(self.target_market.lower(), {"gl": "us", "hl": "en"})
-            base_url = (
-                f"https://www.google.com/search?"
-                f"gl={params['gl']}&"
-                f"hl={params['hl']}&"
-                f"source=mobile&"
-                f"v=mobile&"
-                f"mobile=1&"
-                f"device=mobile&"
-                f"nfpr=1&"
-                f"gws_rd=cr&"
-                f"pws=0"
-            )
-            
-            self.logger.info(f"Searching in {params['gl'].upper()} market (mobile): {keyword}")
-            
-            search_url = f"{base_url}&q={keyword}"
-            self.logger.info(f"访问URL: {search_url}")
-            driver.get(search_url)
-            
-            # 等待页面加载
-            time.sleep(5)
-            
-            # 尝试滚动页面以触发广告加载
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/4);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
-            
-            # 移动端广告选择器
-            ad_selectors = [
-                "div.uEierd",  # 通用广告容器
-            ]
-            
-            # 第一步：收集所有广告的基本信息
-            total_ads = 0
-            for selector in ad_selectors:
-                ads = driver.find_elements(By.CSS_SELECTOR, selector)
-                if ads:
-                    total_ads = len(ads)
-                    self.logger.info(f"关键词 '{keyword}' 找到 {total_ads} 个广告 (选择器: {selector})")
-                    
-                    for index, ad in enumerate(ads, 1):
-                        try:
-                            # 获取标题和链接
-                            title = None
-                            link = None
-                            
-                            # 获取标题
-                            title_selectors = [
-                                "div.CCgQ5", "div.v9i61e", "a[data-text-ad] div",
-                                "div.BmP5tf", "div[role='heading']", "h3"
-                            ]
-                            for title_selector in title_selectors:
-                                try:
-                                    title_element = ad.find_element(By.CSS_SELECTOR, title_selector)
-                                    title = title_element.text.strip()
-                                    if title:
-                                        break
-                                except:
-                                    continue
-                            
-                            if not title:
-                                continue
-                            
-                            # 获取链接
-                            link_selectors = [
-                                "a[data-rw]", "a.sVXRqc", "a[ping]",
-                                "a[data-pcu]", "a"
-                            ]
-                            for link_selector in link_selectors:
-                                try:
-                                    link_element = ad.find_element(By.CSS_SELECTOR, link_selector)
-                                    link = link_element.get_attribute("href")
-                                    if link:
-                                        break
-                                except:
-                                    continue
-                            
-                            if not link:
-                                continue
-                                
-                            # 检查链接是否已经存在
-                            if link not in seen_links:
-                                seen_links.add(link)
-                                raw_ads.append({
-                                    "title": title,
-                                    "link": link,
-                                    "position": len(raw_ads) + 1  # 使用实际位置
-                                })
-                                self.logger.info(f"关键词 '{keyword}' - 广告 {index}/{total_ads}: {title}")
-                            
-                        except Exception as e:
-                            self.logger.error(f"处理关键词 '{keyword}' 的广告 {index} 时出错: {str(e)}")
-                            continue
-            
-            self.logger.info(f"关键词 '{keyword}' 成功收集 {len(raw_ads)} 个有效广告")
+        Returns:
+            bool: 是否修改了记录
+        """
+        if not keyword or not title:
+            return False
+        
+        new_timestamp = datetime.now().isoformat()
+        keyword_records = record.setdefault("keyword_records", [])
+        for keyword_record in keyword_records:
+            if keyword_record.get("keyword") == keyword and keyword_record.get("market", market) == market:
+                # 如果新记录时间戳更新，则替换旧记录
+                if new_timestamp > keyword_record.get("timestamp", ""):
+                    keyword_record.update({
+                        "timestamp": new_timestamp,
+                        "market": market,
+                        "keyword": keyword,
+                        "title": title
+                    })
+                break
+        else:
+            # 如果不存在相同关键词的记录，则添加新记录
+            keyword_records.insert(0, {
+                "timestamp": new_timestamp,
+                "market": market,
+                "keyword": keyword,
+                "title": title
+            })
+        
+        # 更新时间戳为最新记录的时间戳
+        record["timestamp"] = max(r.get("timestamp", "") for r in keyword_records)
+        return True
+
+    def apply_ads(self, keyword, ads, capture, market=None):
+        """
+        处理广告落地页：已有域名追加关键词记录，新域名截图后创建新记录
+        
+        本次爬取中其他市场或关键词已经创建记录的域名不再截图，返回只包含本次关键词记录的
+        副本，由 merge_unit_results 按域名合并。
+        
+        Args:
+            keyword: 关键词
+            ads: resolve_ads 返回的广告列表
+            capture: 截图函数，参数为落地页URL，返回截图文件名
+            market: 市场代码，默认使用 target_market
             
-            # 第二步：处理每个广告的落地页
-            # 读取现有结果
+        Returns:
+            list: 本次任务产生的记录
+        """
+        market = (market or self.target_market).lower()
+        index = self.get_index()
+        ad_results = []
+        
+        # 先为新域名截图，截图较慢，不持有锁
+        screenshots = {}
+        for ad_info in ads:
+            domain = ad_info["domain"]
+            if domain in screenshots or domain in self.new_records or domain in index:
+                continue
             try:
-                with open('all_results.json', 'r', encoding='utf-8') as f:
-                    existing_results = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                existing_results = []
-            
-            # 处理每个广告
-            new_ads = []
-            for ad_info in raw_ads:
+                screenshots[domain], shared = self.screenshot_flight.do_shared(
+                    domain, lambda url=ad_info["final_url"], domain=domain: self._capture_new_domain(domain, url, capture)
+                )
+                if shared:
+                    self.logger.info(f"复用本次爬取中的截图: {domain}")
+            except Exception as e:
+                self.logger.error(f"处理广告落地页时出错: {str(e)}")
+                screenshots[domain] = None
+        
+        with save_lock:
+            for ad_info in ads:
                 try:
-                    # 获取最终URL
-                    final_url = self.get_final_url(ad_info["link"])
-                    if not final_url:
-                        continue
-                    
-                    # 解析域名
-                    parsed_url = urlparse(final_url)
-                    domain = parsed_url.netloc
+                    domain = ad_info["domain"]
                     
                     # 在现有结果中查找匹配的域名记录
-                    existing_record = None
-                    for record in existing_results:
-                        if record.get('domain') == domain:
-                            existing_record = record
-                            break
+                    existing_record = index.get(domain)
                     
                     if existing_record:
-                        # 使用现有截图
-                        self.logger.info(f"使用现有截图: {existing_record['screenshot_path']}")
-                        screenshot_filename = existing_record['screenshot_path']
-                        
-                        # 添加新的关键词记录（只在关键词和标题都不为空时）
+                        # 使用现有截图，添加新的关键词记录（只在关键词和标题都不为空时）
+                        self.logger.info(f"使用现有截图: {existing_record.get('screenshot_path')}")
+                        if keyword and ad_info["title"]:
+                            index.add_keyword_record(domain, {
+                                "timestamp": datetime.now().isoformat(),
+                                "market": market,
+                                "keyword": keyword,
+                                "title": ad_info["title"]
+                            })
+                    elif domain in self.new_records:
+                        # 其他市场或关键词在本次爬取中已创建该域名的记录，复用截图，只记录本次的关键词
                         if keyword and ad_info["title"]:
-                            # 检查是否已存在相同关键词的记录
-                            has_same_keyword = False
-                            for record in existing_record["keyword_records"]:
-                                if record.get("keyword") == keyword:
-                                    # 如果新记录时间戳更新，则替换旧记录
-                                    new_timestamp = datetime.now().isoformat()
-                                    if new_timestamp > record["timestamp"]:
-                                        record.update({
-                                            "timestamp": new_timestamp,
-                                            "market": self.target_market,
-                                            "keyword": keyword,
-                                            "title": ad_info["title"]
-                                        })
-                                    has_same_keyword = True
-                                    break
-                            
-                            # 如果不存在相同关键词的记录，则添加新记录
-                            if not has_same_keyword:
-                                keyword_record = {
-                                    "timestamp": datetime.now().isoformat(),
-                                    "market": self.target_market,
-                                    "keyword": keyword,
-                                    "title": ad_info["title"]
-                                }
-                                existing_record["keyword_records"].insert(0, keyword_record)
-                            
-                            # 更新时间戳为最新记录的时间戳
-                            existing_record["timestamp"] = existing_record["keyword_records"][0]["timestamp"]
+                            shared_record = dict(self.new_records[domain], keyword_records=[])
+                            self.add_keyword_record(shared_record, keyword, ad_info["title"], market)
+                            ad_results.append(shared_record)
                     else:
-                        # 创建新的截图
-                        self.logger.info(f"为新域名创建截图: {domain}")
-                        screenshot_filename = capture_screenshot(final_url, driver)
+                        screenshot_filename = screenshots.get(domain)
+                        if screenshot_filename is None:
+                            continue
                         
                         # 只在关键词和标题都不为空时创建新记录
                         if keyword and ad_info["title"]:
-                            keyword_record = {
-                                "timestamp": datetime.now().isoformat(),
-                                "market": self.target_market,
-                                "keyword": keyword,
-                                "title": ad_info["title"]
-                            }
-                            # 创建新记录
                             new_record = {
                                 "domain": domain,
                                 "original_url": ad_info["link"],
-                                "final_url": final_url,
+                                "final_url": ad_info["final_url"],
                                 "screenshot_path": screenshot_filename,
                                 "timestamp": datetime.now().isoformat(),
-                                "keyword_records": [keyword_record]
+                                "keyword_records": []
                             }
+                            self.add_keyword_record(new_record, keyword, ad_info["title"], market)
+                            self.new_records[domain] = new_record
                             ad_results.append(new_record)
-                            new_ads.append(new_record)
                     
                 except Exception as e:
                     self.logger.error(f"处理广告落地页时出错: {str(e)}")
                     continue
-            
-            # 保存更新后的结果
-            with open('all_results.json', 'w', encoding='utf-8') as f:
-                json.dump(existing_results, f, ensure_ascii=False, indent=2)
-                
-            if not ad_results:
-                self.logger.info(f"关键词 '{keyword}' 找到 {len(raw_ads)} 个广告，0 个新广告。")
-            else:
-                self.logger.info(f"关键词 '{keyword}' 找到 {len(raw_ads)} 个广告，{len(new_ads)} 个新广告。")
-            
-            return ad_results
+        
+        # 已有记录的修改批量写回
+        index.maybe_flush()
+        
+        self.logger.info(f"关键词 '{keyword}' ({market}) 找到 {len(ads)} 个广告，{len(ad_results)} 个新域名记录。")
+        return ad_results
+
+    def _capture_new_domain(self, domain, url, capture):
+        """为新域名截图"""
+        self.logger.info(f"为新域名创建截图: {domain}")
+        return capture(url)
+
+    def get_google_ads(self, keyword, driver, market=None):
+        """获取Google广告结果（在同一个浏览器中依次完成搜索、跳转解析和截图）"""
+        try:
+            raw_ads = self.fetch_serp_ads(keyword, driver, market=market)
+            ads = self.resolve_ads(raw_ads)
+            return self.apply_ads(keyword, ads, lambda url: capture_screenshot(url, driver), market)
             
         except Exception as e:
             self.logger.error(f"获取广告时出错: {str(e)}")
@@ -442,27 +457,20 @@ class GoogleAdMonitor:
 
     def process_keyword(self, keyword, total_keywords, current_index):
         """处理单个关键词的方法"""
-        driver = None
+        owns_pool = self.driver_pool is None
+        if owns_pool:
+            # 单独调用时临时创建只有一个浏览器的池
+            self.driver_pool = self.create_driver_pool(max_size=1)
         try:
-            driver = self.create_driver()  # 为每个线程创建新的driver
-            self.logger.info(f"正在爬取第 {current_index}/{total_keywords} 个关键词: {keyword}")
-            
-            results = self.get_google_ads(keyword, driver)
+            with self.driver_pool.lease() as driver:
+                self.logger.info(f"正在爬取第 {current_index}/{total_keywords} 个关键词: {keyword}")
+                
+                results = self.get_google_ads(keyword, driver)
             
+            # 写回已有记录的修改，再保存新记录
+            self.get_index().flush()
             if results:
-                # 对结果进行去重
-                deduped_results = []
-                seen_links = set()
-                
-                for result in results:
-                    link = result.get('link')
-                    if link not in seen_links:
-                        seen_links.add(link)
-                        deduped_results.append(result)
-                
-                # 保存去重后的结果
-                with open('all_results.json', 'w', encoding='utf-8') as f:
-                    json.dump(deduped_results, f, ensure_ascii=False, indent=2)
+                save_results(results, self.target_market)
                 return results
             
             return []
@@ -472,178 +480,353 @@ class GoogleAdMonitor:
             self.logger.error(f"错误详情: {traceback.format_exc()}")
             return []
         finally:
-            if driver:
-                try:
-                    driver.quit()
-                    time.sleep(1)  # 等待浏览器完全关闭
-                except:
-                    pass
-
-    def monitor_keywords(self, keywords, max_workers=3):
-        """并行监控关键词列表"""
-        all_results = []
-        total_keywords = len(keywords)
-        
-        # 创建线程池
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_keyword = {
-                executor.submit(
-                    self.process_keyword, 
-                    keyword, 
-                    total_keywords, 
-                    i + 1
-                ): 
-                keyword 
-                for i, keyword in enumerate(keywords)
-            }
+            if owns_pool:
+                self.driver_pool.close()
+                self.driver_pool = None
+
+    def _serp_stage(self, unit):
+        """流水线阶段一：访问搜索结果页并提取广告"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            # 已取消时丢弃队列中尚未开始的任务，下次运行时从检查点恢复
+            return None
+        self.logger.info(f"正在爬取第 {unit.index}/{unit.total} 个任务: {unit.keyword} ({unit.market})")
+        start = time.perf_counter()
+        with self.concurrency.slot() as slot:
+            with self.driver_pool.lease() as driver:
+                unit.raw_ads = self.fetch_serp_ads(unit.keyword, driver, unit, unit.market)
+            if unit.serp_state == 'blocked':
+                slot.outcome = 'blocked'
+        unit.timings['serp'] = time.perf_counter() - start
+        return unit
+
+    def _redirect_stage(self, unit):
+        """流水线阶段二：并发解析广告跳转"""
+        start = time.perf_counter()
+        unit.ads = self.resolve_ads(unit.raw_ads)
+        unit.timings['redirect'] = time.perf_counter() - start
+        return unit
+
+    def record_unit_diff(self, run_id, unit):
+        """
+        记录任务的爬取差异
+        
+        只有搜索结果页完整就绪（见 SERP_READY_STATES）的任务参与比较；部分广告跳转解析失败时
+        无法得知这些广告的域名，上次看到、本次没有解析到的广告不记为消失
+        
+        Returns:
+            dict: 各类变化的数量，没有记录时返回 None
+        """
+        if unit.serp_state not in SERP_READY_STATES:
+            self.logger.info(
+                f"关键词 '{unit.keyword}' ({unit.market}) 搜索结果页状态为 {unit.serp_state}，不计算爬取差异"
+            )
+            return None
+        return self.crawl_diff.record_unit(
+            run_id, unit.keyword, unit.market,
+            [(ad.get('domain'), ad.get('title')) for ad in unit.ads],
+            partial=len(unit.ads) < len(unit.raw_ads)
+        )
+
+    def _capture_with_pool(self, url):
+        """从落地页浏览器池租用浏览器截图"""
+        with self.landing_pool.lease() as driver:
+            return capture_screenshot(url, driver)
+
+    def _landing_stage(self, unit):
+        """流水线阶段三：为新域名截图并写入结果"""
+        start = time.perf_counter()
+        unit.results = self.apply_ads(unit.keyword, unit.ads, self._capture_with_pool, unit.market)
+        unit.timings['landing'] = time.perf_counter() - start
+        self.logger.info(
+            f"关键词 '{unit.keyword}' ({unit.market}) 处理完成: "
+            + ", ".join(f"{stage} {elapsed:.2f}s" for stage, elapsed in unit.timings.items())
+        )
+        return unit
+
+    def monitor_keywords(self, keywords, max_workers=None, min_workers=None, markets=None, resume=True,
+                         on_progress=None, cancel_event=None):
+        """
+        并行监控关键词列表
+        
+        爬取分为三个阶段，通过有界队列连接：搜索结果页（自适应并发的浏览器池）、
+        跳转解析（共享 HTTP 连接池）、落地页截图（独立的浏览器池）。
+        落地页再慢也不会占用搜索结果页的浏览器。
+        
+        每个关键词在每个市场中各爬取一次，所有市场共用浏览器池、跳转解析和截图，
+        各市场都出现的落地页只解析和截图一次。
+        
+        每完成一个任务向检查点追加一行。中断后再次运行会跳过检查点中已完成的任务，
+        结束时从检查点流式读取所有结果并按域名合并。调用方保存结果后应调用
+        self.checkpoint.finish() 删除检查点。
+        
+        on_progress(事件类型, 数据) 在以下时机被调用（可能在多个线程中）：
+        - 'started': total（任务总数）、skipped（检查点中已完成的任务数）
+        - 'unit': 一个任务完成，keyword、market、index、state、ads（广告数）、
+          new_records（新记录数）、timings（各阶段耗时，秒）
+        - 'unit_failed': 一个任务在某个阶段失败，keyword、market、index、stage、error
+        
+        Args:
+            keywords: 关键词列表
+            max_workers: 搜索结果页最大并发数，默认 CrawlerConfig.ADAPTIVE_MAX_WORKERS
+            min_workers: 搜索结果页最小并发数，默认 CrawlerConfig.ADAPTIVE_MIN_WORKERS
+            markets: 市场代码列表，默认使用创建监控器时指定的市场
+            resume: 是否从未过期的检查点恢复
+            on_progress: 进度回调，见上
+            cancel_event: threading.Event，设置后不再开始新任务，已完成的任务保留在检查点中，
+                本次差异批次不标记为完成
             
-            # 处理完成的任务
-            for future in as_completed(future_to_keyword):
-                keyword = future_to_keyword[future]
-                try:
-                    results = future.result()
-                    if results:
-                        # 为每个结果添加市场信息
-                        for ad in results:
-                            ad['market'] = self.target_market
-                        all_results.extend(results)
-                        
-                        # 实时保存部分结果
-                        with save_lock:
-                            try:
-                                with open('partial_results.json', 'w', encoding='utf-8') as f:
-                                    json.dump(all_results, f, ensure_ascii=False, indent=2)
-                            except Exception as save_error:
-                                print(f"部分结果保存失败: {save_error}")
-                            
-                except Exception as e:
-                    print(f"处理关键词 '{keyword}' 的任务失败: {e}")
+        Returns:
+            list: 本次爬取（含恢复前已完成部分）按域名合并后的记录
+        """
+        if max_workers is None:
+            max_workers = CrawlerConfig.ADAPTIVE_MAX_WORKERS
+        if min_workers is None:
+            min_workers = min(CrawlerConfig.ADAPTIVE_MIN_WORKERS, max_workers)
+        
+        markets = [market.lower() for market in (markets or self.markets)]
+        total_units = len(keywords) * len(markets)
+        self.screenshot_flight.forget()
+        
+        self.checkpoint = CrawlCheckpoint()
+        if not resume:
+            self.checkpoint.finish()
+        self.checkpoint.open()
+        
+        # 每次爬取加载一次已有结果的域名索引
+        self.get_index(reload=True)
+        
+        # 恢复时已完成任务创建的域名记录不再重复截图
+        self.new_records = {}
+        for record in self.checkpoint.iter_records():
+            self.new_records.setdefault(record.get('domain'), record)
+        
+        # 每次爬取（含恢复）对应一个差异批次
+        run_id = self.crawl_diff.start_run(resume=self.checkpoint.resumed)
+        
+        self.cancel_event = cancel_event
+        
+        def emit(event_type, data):
+            if on_progress is None:
+                return
+            try:
+                on_progress(event_type, data)
+            except Exception as e:
+                self.logger.error(f"进度回调失败: {str(e)}")
+        
+        def collect(unit):
+            emit('unit', {
+                'keyword': unit.keyword,
+                'market': unit.market,
+                'index': unit.index,
+                'state': unit.serp_state,
+                'ads': len(unit.ads or []),
+                'new_records': len(unit.results or []),
+                'timings': {stage: round(elapsed, 3) for stage, elapsed in unit.timings.items()}
+            })
+            if unit.serp_state == 'blocked':
+                # 被拦截的任务不记为完成，下次运行时重试
+                return
+            self.record_unit_diff(run_id, unit)
+            # 为每个结果添加市场信息
+            for ad in unit.results:
+                ad['market'] = unit.market
+            self.checkpoint.record(unit.keyword, unit.market, unit.results)
+        
+        # 搜索结果页阶段按最大并发数启动线程，实际同时处理的数量由并发控制器决定
+        self.concurrency = AdaptiveConcurrency(min_limit=min_workers, max_limit=max_workers)
+        
+        # 各阶段使用独立的浏览器池（浏览器按需启动，不会一次创建 max_workers 个）
+        self.driver_pool = self.create_driver_pool(max_size=max_workers)
+        self.landing_pool = self.create_driver_pool(max_size=CrawlerConfig.LANDING_WORKERS, name='landing')
+        self.pipeline = StagedPipeline([
+            PipelineStage('serp', self._serp_stage, workers=max_workers),
+            PipelineStage('redirect', self._redirect_stage, workers=CrawlerConfig.REDIRECT_STAGE_WORKERS),
+            PipelineStage('landing', self._landing_stage, workers=CrawlerConfig.LANDING_WORKERS),
+        ], on_result=collect, on_error=lambda stage, unit, error: emit('unit_failed', {
+            'keyword': unit.keyword,
+            'market': unit.market,
+            'index': unit.index,
+            'stage': stage,
+            'error': str(error)
+        }), name='crawl')
         
-        return all_results
+        # 同一关键词的各市场相邻提交，便于共享跳转解析和截图
+        units = [
+            CrawlUnit(keyword, index, total_units, market)
+            for index, (keyword, market) in enumerate(
+                ((keyword, market) for keyword in keywords for market in markets), start=1
+            )
+            if not self.checkpoint.is_done(keyword, market)
+        ]
+        skipped = total_units - len(units)
+        
+        try:
+            self.pipeline.start()
+            emit('started', {'total': total_units, 'skipped': skipped})
+            if skipped:
+                self.logger.info(f"跳过检查点中已完成的 {skipped}/{total_units} 个任务")
+            for unit in units:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                self.pipeline.submit(unit)
+            self.pipeline.join()
+            if cancel_event is not None and cancel_event.is_set():
+                self.logger.info("爬取已取消，已完成的任务保留在检查点中")
+            else:
+                self.crawl_diff.finish_run(run_id)
+        finally:
+            self.concurrency.log_stats()
+            self.driver_pool.log_stats()
+            self.landing_pool.log_stats()
+            self.extraction_stats.log_stats()
+            self.redirect_resolver.cache.log_stats()
+            screenshot_stats = self.screenshot_flight.stats()
+            self.logger.info(
+                f"截图统计: 新截图 {screenshot_stats['executed']} 个, 跨市场复用 {screenshot_stats['shared']} 次"
+            )
+            self.driver_pool.close()
+            self.landing_pool.close()
+            self.driver_pool = None
+            self.landing_pool = None
+            self.cancel_event = None
+            self.checkpoint.close()
+            self.index.flush()
+            self.committer.flush()
+            self.committer.log_stats()
+        
+        return self.checkpoint.results()
 
-def save_results(results, market, output_file='all_results.json'):
-    """存监控结果到文件"""
+def save_results(results, market, output_file=None, store=None):
+    """
+    保存监控结果到结果存储，按 original_url 合并到已有记录（由结果写入线程提交）
+    
+    Args:
+        results: 新的监控结果
+        market: 关键词记录缺少市场信息时使用的市场
+        output_file: 可选，额外把本次保存的记录写入该 JSON 文件
+        store: 结果存储，默认使用共享的结果存储和结果写入线程
+        
+    Returns:
+        list: 本次新增或更新后的记录，失败时返回空列表
+    """
     if not results:
         return []
         
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     current_time = datetime.now().isoformat()
+    # 指定存储时使用临时的写入线程
+    owns_committer = store is not None
+    committer = ResultsCommitter(store) if owns_committer else get_results_committer()
+    store = committer.store
     
-    # 确保results目录存在
-    results_dir = 'results'
-    if not os.path.exists(results_dir):
-        os.makedirs(results_dir)
-        
     try:
-        # 读取现有的结果（如果存在）
-        try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                existing_results = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            existing_results = []
-            
-        # 创建一个以original_url为键的字典来存储现有结果
-        results_dict = {}
-        for result in existing_results:
-            if result and isinstance(result, dict) and result.get('original_url'):
-                key = result['original_url']
-                if 'landing_page' in result:
-                    del result['landing_page']
-                results_dict[key] = result
-                
-        # 合并新结果
+        original_urls = []
         for new_result in results:
             if not new_result or not isinstance(new_result, dict) or not new_result.get('original_url'):
                 continue
-                
-            key = new_result['original_url']
             
-            if key in results_dict:
-                # 更新现有记录
-                existing = results_dict[key]
-                
-                # 更新截图
-                if new_result.get('screenshot_path'):
-                    existing['screenshot_path'] = new_result['screenshot_path']
-                
-                # 添加新的关键词记录
-                keyword_record = {
-                    'timestamp': current_time,
-                    'market': market,
-                    'keyword': new_result.get('keyword_records', [{}])[0].get('keyword', ''),
-                    'title': new_result.get('keyword_records', [{}])[0].get('title', '')
-                }
-                
-                if 'keyword_records' not in existing:
-                    existing['keyword_records'] = []
-                    
-                # 检查是否已存在相同的记录
-                record_exists = False
-                for record in existing['keyword_records']:
-                    if (record.get('keyword') == keyword_record['keyword'] and 
-                        record.get('title') == keyword_record['title']):
-                        record_exists = True
-                        break
-                        
-                if not record_exists:
-                    existing['keyword_records'].append(keyword_record)
-                
-                # 更新其他字段
-                existing['final_url'] = new_result.get('final_url', existing.get('final_url', ''))
-                
-            else:
-                # 添加新记录
-                formatted_result = {
-                    'domain': new_result.get('domain', ''),
-                    'original_url': new_result.get('original_url', ''),
-                    'final_url': new_result.get('final_url', ''),
-                    'screenshot_path': new_result.get('screenshot_path', ''),
+            keyword_records = [
+                {
                     'timestamp': current_time,
-                    'keyword_records': [{
-                        'timestamp': current_time,
-                        'market': market,
-                        'keyword': new_result.get('keyword_records', [{}])[0].get('keyword', ''),
-                        'title': new_result.get('keyword_records', [{}])[0].get('title', '')
-                    }]
+                    'market': record.get('market', market),
+                    'keyword': record.get('keyword', ''),
+                    'title': record.get('title', '')
                 }
-                results_dict[key] = formatted_result
+                for record in (new_result.get('keyword_records') or [{}])
+            ]
+            
+            # 已有记录时更新截图和 final_url，并添加新的关键词记录（同一域名可能包含多个市场的记录）
+            committer.upsert({
+                'domain': new_result.get('domain', ''),
+                'original_url': new_result.get('original_url', ''),
+                'final_url': new_result.get('final_url', ''),
+                'screenshot_path': new_result.get('screenshot_path', ''),
+                'timestamp': current_time,
+                'keyword_records': keyword_records
+            })
+            original_urls.append(new_result['original_url'])
         
-        # 转换回列表并保存
-        final_results = list(results_dict.values())
+        # 等待写入线程提交后读取保存的记录
+        committer.flush()
+        saved_results = []
+        for original_url in dict.fromkeys(original_urls):
+            saved = store.find_one('original_url', original_url)
+            if saved is None:
+                raise RuntimeError(f"记录未能保存: {original_url}")
+            saved_results.append(saved[1])
         
-        # 保存到指定的输出文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(final_results, f, ensure_ascii=False, indent=2)
+        if output_file:
+            dump_results(saved_results, output_file)
             
-        return final_results
+        return saved_results
         
     except Exception as e:
         print(f"保存结果时出错: {str(e)}")
         return []
+    finally:
+        if owns_committer:
+            committer.close()
 
-def main(output_file='all_results.json'):
-    """主函数"""
+def main(output_file=None, on_progress=None, cancel_event=None):
+    """
+    主函数
+    
+    Args:
+        output_file: 可选，额外把本次保存的记录写入该 JSON 文件
+        on_progress: 进度回调 on_progress(事件类型, 数据)，除 monitor_keywords 的事件外，
+            保存和归档前发送 'status' 事件（phase 为 saving / archiving）
+        cancel_event: threading.Event，设置后停止爬取，不保存结果并保留检查点，下次运行时恢复
+        
+    Returns:
+        dict: 运行结果，results 为保存的记录数，cancelled 表示是否被取消，出错时 error 为错误信息
+    """
+    summary = {'results': 0, 'cancelled': False, 'error': None}
     try:
         # 加载关键词
         keywords = load_keywords()
         if not keywords:
             print("没有找到关键词配置")
-            return
+            summary['error'] = '没有找到关键词配置'
+            return summary
             
         # 创建监控器实例并开始监控
-        monitor = GoogleAdMonitor()
-        results = monitor.monitor_keywords(keywords)
+        monitor = GoogleAdMonitor(markets=MonitorConfig.MARKETS)
+        try:
+            results = monitor.monitor_keywords(keywords, on_progress=on_progress, cancel_event=cancel_event)
+        finally:
+            monitor.close()
+        
+        if cancel_event is not None and cancel_event.is_set():
+            print("爬取已取消，保留检查点，下次运行时恢复")
+            summary['cancelled'] = True
+            return summary
         
-        # 保存结果到指定的输出文件
+        # 保存结果到结果存储（指定 output_file 时同时写入该文件）
         if results:
-            save_results(results, monitor.target_market, output_file)
-            print(f"结果已保存到 {output_file}")
+            if on_progress is not None:
+                on_progress('status', {'phase': 'saving'})
+            saved = save_results(results, monitor.target_market, output_file)
+            if not saved:
+                print("结果保存失败，保留检查点，下次运行时恢复")
+                summary['error'] = '结果保存失败'
+                return summary
+            summary['results'] = len(saved)
+            print(f"结果已保存到 {output_file or StorageConfig.RESULTS_DB}")
         else:
             print("没有找到新的广告结果")
+        
+        # 结果已保存，下次运行重新开始
+        monitor.checkpoint.finish()
+        
+        # 早于保留期的关键词记录移入归档，落地页记录只保留近期记录
+        if StorageConfig.KEYWORD_ARCHIVE_AFTER_CRAWL:
+            if on_progress is not None:
+                on_progress('status', {'phase': 'archiving'})
+            KeywordArchive(get_result_store()).archive()
             
     except Exception as e:
         print(f"运行出错: {str(e)}")
+        summary['error'] = str(e)
+    return summary
 
 def load_keywords():
     """加载关键词列表"""
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any
 from src.core.results.deduplication import deduplicate_results
+from src.core.results.serialization import dump_results, load_results
 
 # 配置日志
 logging.basicConfig(
@@ -35,8 +36,7 @@ def save_results(results, market):
     try:
         # 读取现有的结果
         try:
-            with open('all_results.json', 'r', encoding='utf-8') as f:
-                existing_results = json.load(f)
+            existing_results = load_results('all_results.json')
         except (FileNotFoundError, json.JSONDecodeError):
             existing_results = []
             
@@ -111,11 +111,8 @@ def save_results(results, market):
         )
         
         # 保存结果
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-            
-        with open('all_results.json', 'w', encoding='utf-8') as f:
-            json.dump(final_results, f, ensure_ascii=False, indent=2)
+        dump_results(results, filename)
+        dump_results(final_results, 'all_results.json')
             
         return final_results
         
@@ -132,11 +129,10 @@ def merge_results():
         if os.path.exists('all_results.json'):
             logger.info("读取现有的 all_results.json...")
             try:
-                with open('all_results.json', 'r', encoding='utf-8') as f:
-                    existing_results = json.load(f)
-                    if isinstance(existing_results, list):
-                        all_results.extend(existing_results)
-                        logger.info(f"从 all_results.json 读取了 {len(existing_results)} 条记录")
+                existing_results = load_results('all_results.json')
+                if isinstance(existing_results, list):
+                    all_results.extend(existing_results)
+                    logger.info(f"从 all_results.json 读取了 {len(existing_results)} 条记录")
             except Exception as e:
                 logger.error(f"读取 all_results.json 失败: {str(e)}")
         
@@ -148,13 +144,12 @@ def merge_results():
             # 读取并合并所有新结果
             for file_path in results_files:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        results = json.load(f)
-                        if isinstance(results, list):
-                            all_results.extend(results)
-                            logger.info(f"从 {file_path} 读取了 {len(results)} 条记录")
-                        else:
-                            logger.warning(f"文件格式错误 {file_path}: 不是列表格式")
+                    results = load_results(file_path)
+                    if isinstance(results, list):
+                        all_results.extend(results)
+                        logger.info(f"从 {file_path} 读取了 {len(results)} 条记录")
+                    else:
+                        logger.warning(f"文件格式错误 {file_path}: 不是列表格式")
                             
                 except Exception as e:
                     logger.error(f"处理结果文件时出错 {file_path}: {str(e)}")
@@ -162,6 +157,9 @@ def merge_results():
         
         if not all_results:
             logger.info("没有���到需要处理的数据")
+            # 结果文件不存在时写入空列表（原子写入），已有但读取失败的文件保持不变
+            if not os.path.exists('all_results.json'):
+                dump_results([], 'all_results.json')
             return
             
         # 统计原始数据
@@ -185,8 +183,7 @@ def merge_results():
         deduped_records = sum(len(r.get('keyword_records', [])) for r in merged_results)
         
         # 保存合并后的结果
-        with open('all_results.json', 'w', encoding='utf-8') as f:
-            json.dump(merged_results, f, ensure_ascii=False, indent=2)
+        dump_results(merged_results, 'all_results.json')
             
         # 清理旧的结果文件
         if results_files:
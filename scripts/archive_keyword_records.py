@@ -0,0 +1,27 @@
+"""
+把早于保留期的关键词记录移入按月分表的归档
+用法: python scripts/archive_keyword_records.py [保留天数]   默认使用 StorageConfig.KEYWORD_HOT_DAYS
+"""
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import StorageConfig
+from src.core.results import KeywordArchive, ResultStore
+
+def main():
+    hot_days = int(sys.argv[1]) if len(sys.argv) > 1 else StorageConfig.KEYWORD_HOT_DAYS
+
+    store = ResultStore()
+    try:
+        archive = KeywordArchive(store, hot_days=hot_days)
+        stats = archive.archive()
+        stats['archive_months'] = archive.months()
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
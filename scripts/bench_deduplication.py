@@ -0,0 +1,57 @@
+"""
+结果去重性能测试：生成指定数量的模拟结果（约 1/4 为重复记录），测量 merge_and_deduplicate 的耗时
+用法: python scripts/bench_deduplication.py [记录数 ...]   默认 10000 100000 1000000
+"""
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.results.deduplication import merge_and_deduplicate
+
+MARKETS = ['in', 'gh', 'ke', 'ng', 'uk']
+
+def make_results(count, seed):
+    """生成模拟结果：域名在 0.75 * count 个中随机选取，每条结果 1-3 条关键词记录"""
+    rng = random.Random(seed)
+    domains = max(1, int(count * 0.75))
+    results = []
+    for _ in range(count):
+        n = rng.randrange(domains)
+        day = rng.randrange(1, 29)
+        results.append({
+            'domain': f'site{n}.com',
+            'original_url': f'https://www.googleadservices.com/pagead/aclk?adurl=site{n}.com',
+            'final_url': f'https://www.site{n}.com/landing/?gclid={rng.random()}',
+            'screenshot_path': f'site{n}.png',
+            'timestamp': f'2024-01-{day:02d}T00:00:00',
+            'keyword_records': [
+                {
+                    'timestamp': f'2024-01-{day:02d}T00:00:00',
+                    'market': rng.choice(MARKETS),
+                    'keyword': f'keyword {rng.randrange(50)}',
+                    'title': f'Ad {n}'
+                }
+                for _ in range(rng.randint(1, 3))
+            ]
+        })
+    return results
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{'已有':>10} {'新增':>10} {'去重后':>10} {'耗时(s)':>9} {'每条(µs)':>9}")
+    for size in sizes:
+        existing = make_results(size, seed=1)
+        new = make_results(max(1, size // 10), seed=2)
+
+        start = time.perf_counter()
+        merged = merge_and_deduplicate(existing, new)
+        elapsed = time.perf_counter() - start
+
+        total = len(existing) + len(new)
+        print(f"{len(existing):>10} {len(new):>10} {len(merged):>10} {elapsed:>9.2f} {elapsed / total * 1e6:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+搜索索引性能测试：生成指定数量的模拟落地页（中英文混合标题），测量建立索引和查询的耗时
+用法: python scripts/bench_search.py [记录数 ...]   默认 10000 100000
+"""
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.results.store import ResultStore
+from src.core.results.search import search_pages
+
+MARKETS = ['in', 'gh', 'ke', 'ng', 'uk']
+WORDS = ['cheap', 'best', 'loan', 'shoes', 'insurance', 'casino', 'hotel', 'flight', 'phone', 'game']
+CJK_WORDS = ['运动鞋', '贷款', '保险', '酒店', '机票', '手机', '游戏', '特价']
+QUERIES = ['lo', 'loan', 'best shoes', '贷款', '运动', 'site123', 'hotel 特价', 'nothingmatches']
+
+def make_records(count, seed=1):
+    """生成模拟落地页，每条 1-3 条关键词记录"""
+    rng = random.Random(seed)
+    records = []
+    for n in range(count):
+        records.append({
+            'domain': f'site{n}.com',
+            'final_url': f'https://www.site{n}.com/',
+            'keyword_records': [
+                {
+                    'timestamp': f'2024-01-{rng.randint(1, 28):02d}T00:00:00',
+                    'market': rng.choice(MARKETS),
+                    'keyword': f'{rng.choice(WORDS)} {rng.choice(CJK_WORDS)}',
+                    'title': ' '.join(rng.sample(WORDS, 3)) + ' ' + rng.choice(CJK_WORDS)
+                }
+                for _ in range(rng.randint(1, 3))
+            ]
+        })
+    return records
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        store = ResultStore(None)
+        start = time.perf_counter()
+        store.insert_many(make_records(size))
+        print(f"\n{size} 条记录: 写入并建立索引 {time.perf_counter() - start:.2f}s")
+        print(f"{'查询':<16} {'结果数':>6} {'耗时(ms)':>9}")
+        for query in QUERIES:
+            found = search_pages(store, query, limit=50)
+            print(f"{query:<16} {len(found['results']):>6} {found['elapsed_ms']:>9.2f}")
+        store.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+结果文件序列化性能测试：比较各格式的文件大小和编码、解码耗时
+用法: python scripts/bench_serialization.py [结果文件] [--repeat N]   默认使用 all_results.json，不存在时生成 10000 条模拟结果
+"""
+import sys
+import json
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import StorageConfig
+from src.core.results import serialization
+from src.core.results.serialization import FORMAT_COMPACT, FORMAT_JSON, FORMAT_MSGPACK, decode, encode, load_results
+
+def make_results(count):
+    """生成模拟结果"""
+    return [
+        {
+            'domain': f'site{n}.com',
+            'original_url': f'https://www.googleadservices.com/pagead/aclk?adurl=site{n}.com',
+            'final_url': f'https://www.site{n}.com/landing/',
+            'screenshot_path': f'site{n}.png',
+            'timestamp': '2024-01-01T00:00:00',
+            'keyword_records': [
+                {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': f'关键词 {n % 50}', 'title': f'Ad {n}'}
+                for _ in range(3)
+            ]
+        }
+        for n in range(count)
+    ]
+
+def measure(fn, repeat):
+    """返回 repeat 次中最短的耗时"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    args = sys.argv[1:]
+    repeat = 5
+    if '--repeat' in args:
+        i = args.index('--repeat')
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    path = Path(args[0]) if args else StorageConfig.RESULTS_JSON
+    data = load_results(path) if path.exists() else make_results(10_000)
+    print(f"数据: {len(data)} 条记录 ({path if path.exists() else '模拟数据'})")
+
+    # 标准库 json 缩进写入（原有写法）作为基准
+    cases = [
+        ('json.dump indent=2', lambda: json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'),
+         lambda raw: json.loads(raw.decode('utf-8'))),
+        (FORMAT_JSON, lambda: encode(data, FORMAT_JSON), decode),
+        (FORMAT_COMPACT, lambda: encode(data, FORMAT_COMPACT), decode),
+    ]
+    if serialization.msgpack is not None:
+        cases.append((FORMAT_MSGPACK, lambda: encode(data, FORMAT_MSGPACK), decode))
+    else:
+        print("未安装 msgpack，跳过 MessagePack 格式")
+    print(f"orjson: {'已安装' if serialization.orjson is not None else '未安装，使用标准库'}")
+
+    print(f"{'格式':<20} {'大小(KB)':>10} {'编码(ms)':>10} {'解码(ms)':>10}")
+    for name, encoder, decoder in cases:
+        raw = encoder()
+        assert decoder(raw) == data
+        encode_time = measure(encoder, repeat)
+        decode_time = measure(lambda: decoder(raw), repeat)
+        print(f"{name:<20} {len(raw) / 1024:>10.1f} {encode_time * 1000:>10.1f} {decode_time * 1000:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+把结果数据库中的关键词记录导出为列式文件（Parquet 或 NumPy .npz），默认只追加上次导出之后的新记录
+用法:
+    python scripts/export_keyword_records.py [--full] [--format parquet|npz|auto] [--out 导出目录]
+读取:
+    KeywordRecordExporter(store, out_dir).read()  # pandas DataFrame，字符串列为 category 类型
+"""
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import StorageConfig
+from src.core.results import KeywordRecordExporter, ResultStore
+
+def main():
+    args = sys.argv[1:]
+    options = {'--format': StorageConfig.ANALYTICS_EXPORT_FORMAT, '--out': StorageConfig.ANALYTICS_EXPORT_DIR}
+    full = False
+    i = 0
+    while i < len(args):
+        if args[i] == '--full':
+            full = True
+            i += 1
+        elif args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            sys.exit(1)
+
+    store = ResultStore()
+    try:
+        exporter = KeywordRecordExporter(store, out_dir=options['--out'], fmt=options['--format'])
+        stats = exporter.export(full=full)
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
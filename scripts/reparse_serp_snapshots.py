@@ -0,0 +1,42 @@
+"""
+重新解析保存的搜索结果页快照，用于 Google 改版后验证选择器，无需重新爬取
+用法: python scripts/reparse_serp_snapshots.py [快照目录或文件 ...]
+"""
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import CrawlerConfig
+from src.core.crawler import parse_serp_snapshot
+
+def iter_snapshots(paths):
+    """遍历快照文件"""
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            yield from sorted(path.rglob('*.html.gz'))
+            yield from sorted(path.rglob('*.html'))
+        elif path.exists():
+            yield path
+
+def main():
+    paths = sys.argv[1:] or [CrawlerConfig.SERP_SNAPSHOT_DIR]
+    total_files = 0
+    total_ads = 0
+    for path in iter_snapshots(paths):
+        extracted = parse_serp_snapshot(path)
+        total_files += 1
+        total_ads += len(extracted['raw_ads'])
+        print(json.dumps({
+            'file': str(path),
+            'selector': extracted['selector'],
+            'total': extracted['total'],
+            'raw_ads': extracted['raw_ads']
+        }, ensure_ascii=False))
+
+    print(f"共解析 {total_files} 个快照，{total_ads} 个广告", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+结果数据库与 all_results.json 之间的导入导出
+用法:
+    python scripts/results_store.py import [all_results.json]   # 用 JSON 文件替换数据库内容
+    python scripts/results_store.py export [all_results.json]   # 把数据库导出为 JSON 文件
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import StorageConfig
+from src.core.results import ResultStore
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'export'):
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    json_path = sys.argv[2] if len(sys.argv) > 2 else StorageConfig.RESULTS_JSON
+
+    # 不自动导入，由命令决定数据方向
+    store = ResultStore(json_path=None)
+    try:
+        if command == 'import':
+            count = store.import_json(json_path)
+            print(f"已从 {json_path} 导入 {count} 条记录到 {store.path}")
+        else:
+            count = store.export_json(json_path)
+            print(f"已从 {store.path} 导出 {count} 条记录到 {json_path}")
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
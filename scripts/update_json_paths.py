@@ -2,10 +2,15 @@
 更新 all_results.json 中的截图路径，移除时间戳前缀
 示例: 20241211_160531_baiducom.png -> baiducom.png
 """
+import sys
 import json
 import re
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.results.serialization import ResultsWriter, iter_results
+
 def simplify_filename(filename: str) -> str:
     """
     简化文件名，移除时间戳前缀
@@ -29,40 +34,40 @@ def update_json_paths():
     
     print("开始处理 all_results.json...")
     
-    # 读取 JSON 文件
+    # 记录修改数量
+    changes = 0
+    writer = ResultsWriter(json_path, report_every=0)
+    
+    # 逐条读取并更新每个记录的截图路径
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        for item in iter_results(json_path):
+            if 'screenshot_path' in item:
+                old_path = item['screenshot_path']
+                new_path = simplify_filename(old_path)
+                
+                if old_path != new_path:
+                    item['screenshot_path'] = new_path
+                    changes += 1
+                    print(f"更新路径: {old_path} -> {new_path}")
+            writer.write(item)
     except json.JSONDecodeError:
+        writer.abort()
         print("JSON 文件格式错误!")
         return
     except Exception as e:
+        writer.abort()
         print(f"读取文件失败: {str(e)}")
         return
     
-    # 记录修改数量
-    changes = 0
-    
-    # 更新每个记录的截图路径
-    for item in data:
-        if 'screenshot_path' in item:
-            old_path = item['screenshot_path']
-            new_path = simplify_filename(old_path)
-            
-            if old_path != new_path:
-                item['screenshot_path'] = new_path
-                changes += 1
-                print(f"更新路径: {old_path} -> {new_path}")
-    
     if changes == 0:
+        writer.abort()
         print("没有需要更新的路径。")
         return
     
     # 保存更新后的文件
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"\n成功更新了 {changes} 个路径! ✨")
+        writer.close()
+        print(f"\n成功更新了 {changes} 个路径! ✨ (共 {writer.count} 条记录, {writer.rate:.0f} 条/s)")
     except Exception as e:
         print(f"保存文件失败: {str(e)}")
 
@@ -7,6 +7,7 @@ from .settings import (
     KeywordConfig,
     MonitorConfig,
     BrowserConfig,
+    CrawlerConfig,
     StorageConfig,
     TimeConfig
 )
@@ -17,6 +18,7 @@ __all__ = [
     'KeywordConfig',
     'MonitorConfig',
     'BrowserConfig',
+    'CrawlerConfig',
     'StorageConfig',
     'TimeConfig'
 ]
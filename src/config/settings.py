@@ -181,11 +181,106 @@ class BrowserConfig:
     MAX_RETRIES = 3        # 最大重试次数
     RETRY_DELAY = 2        # 重试间隔(秒)
 
+class CrawlerConfig:
+    """爬虫运行相关配置"""
+    # 浏览器池配置
+    DRIVER_POOL_SIZE: int = 3        # 浏览器池最大实例数
+    DRIVER_MAX_USES: int = 50        # 单个浏览器最多复用次数，超过后回收重建
+    DRIVER_LEASE_TIMEOUT: int = 300  # 等待空闲浏览器的最长时间(秒)
+    
+    # 自适应并发配置（同时处理的关键词数量）
+    ADAPTIVE_MIN_WORKERS: int = 1
+    ADAPTIVE_MAX_WORKERS: int = max(2, min(8, (os.cpu_count() or 2) // 2))
+    ADAPTIVE_INITIAL_WORKERS: int = 3
+    ADAPTIVE_TARGET_LATENCY: float = 15.0        # 单个关键词搜索结果页的目标耗时(秒)
+    ADAPTIVE_MAX_ERROR_RATE: float = 0.2         # 评估窗口内允许的最大失败率
+    ADAPTIVE_MIN_FREE_MEMORY_MB: int = 1024      # 低于该可用内存时降低并发
+    ADAPTIVE_WINDOW: int = 5                     # 每完成多少个关键词评估一次
+    
+    # 搜索结果页就绪等待配置
+    SERP_WAIT_TIMEOUT: float = 8.0   # 最长等待时间(秒)
+    SERP_QUIET_PERIOD: float = 0.5   # DOM 静默多久视为渲染完成(秒)
+    SERP_POLL_INTERVAL: float = 0.1  # 轮询间隔(秒)
+    
+    # 广告提取配置
+    SERP_EXTRACTION_MODE: str = 'live'      # live: 在浏览器中提取（默认）; snapshot: 获取页面源码后在进程内解析（可能包含隐藏文本）
+    SERP_SAVE_SNAPSHOTS: bool = False       # 是否压缩保存页面源码，便于改版后重新解析
+    SERP_SNAPSHOT_DIR = BaseConfig.ROOT_DIR / 'cache' / 'serp_snapshots'
+    
+    # 跳转解析配置
+    REDIRECT_WORKERS: int = 8        # 并发解析跳转的线程数
+    REDIRECT_TIMEOUT: float = 10     # 单个请求超时时间(秒)
+    REDIRECT_MAX_RETRIES: int = 3    # 连接失败时的重试次数
+    REDIRECT_DRAIN_BYTES: int = 64 * 1024  # 不支持 HEAD 时改用 GET，正文不超过该大小时读完以复用连接
+    
+    # 分阶段流水线配置
+    REDIRECT_STAGE_WORKERS: int = 2       # 跳转解析阶段线程数（每个线程内部再并发解析）
+    LANDING_WORKERS: int = 2              # 落地页截图阶段线程数（同时也是截图浏览器池大小）
+    PIPELINE_QUEUE_SIZE: int = 20         # 阶段之间队列容量，满时上游阻塞
+    PIPELINE_REPORT_INTERVAL: float = 30  # 运行中输出队列深度和阶段耗时的间隔(秒)
+    
+    # 域名索引配置（爬取期间修改已有记录后批量写回）
+    INDEX_FLUSH_BATCH: int = 50           # 待写回记录达到该数量时写回
+    INDEX_FLUSH_INTERVAL: float = 30      # 距上次写回超过该时间时写回(秒)
+    
+    # 爬取检查点配置
+    CHECKPOINT_FILE = BaseConfig.ROOT_DIR / 'cache' / 'crawl_checkpoint.jsonl'
+    CHECKPOINT_MAX_AGE: int = 24 * 3600   # 超过该时间未完成的检查点不再恢复(秒)
+    CHECKPOINT_FSYNC: bool = False        # 每完成一个任务是否同步到磁盘
+    
+    # 跳转缓存配置
+    REDIRECT_CACHE_FILE = BaseConfig.ROOT_DIR / 'cache' / 'redirects.db'
+    REDIRECT_CACHE_MAX_ENTRIES: int = 50000         # 最多缓存条目数
+    REDIRECT_CACHE_TTL: int = 7 * 24 * 3600         # 成功结果有效期(秒)
+    REDIRECT_CACHE_NEGATIVE_TTL: int = 3600         # 失败结果（超时等）有效期(秒)
+    
+    # 后台爬取任务配置
+    JOB_HISTORY: int = 20                 # 保留最近多少个已结束的任务
+    JOB_MAX_EVENTS: int = 10000           # 每个任务最多保留的进度事件数（超过后丢弃最早的）
+    JOB_HEARTBEAT_INTERVAL: float = 15    # 进度流没有新事件时发送心跳的间隔(秒)
+
 class StorageConfig:
     """存储相关配置"""
     # 目录配置
     RESULTS_DIR = BaseConfig.ROOT_DIR / 'results'
     SCREENSHOTS_DIR = BaseConfig.ROOT_DIR / 'screenshots'
+    SCREENSHOT_WATCH_INTERVAL: float = 2.0  # 检查截图目录变化的间隔（秒），见 ScreenshotManifest
+    
+    # 结果存储
+    RESULTS_DB = BaseConfig.ROOT_DIR / 'results.db'          # 结果数据库（SQLite）
+    RESULTS_JSON = BaseConfig.ROOT_DIR / 'all_results.json'  # 旧版 JSON 结果文件，首次使用数据库时自动导入
+    
+    # 结果写入线程（爬取线程的修改放入队列，由一个线程按批次提交）
+    COMMIT_BATCH_SIZE: int = 100     # 每批最多提交的修改数
+    COMMIT_MAX_DELAY: float = 1.0    # 修改最多等待多久提交（秒）
+    COMMIT_QUEUE_SIZE: int = 1000    # 队列容量，满时提交方阻塞
+    
+    # 结果文件格式：compact（不缩进的 JSON）/ json（缩进的 JSON）/ msgpack（需要安装 msgpack）
+    RESULTS_FILE_FORMAT: str = 'compact'
+    RESULTS_FILE_FSYNC: bool = True  # 写入结果文件后同步到磁盘再替换原文件
+    
+    # 关键词记录分析导出（列式文件，每次只追加上次导出之后的新记录）
+    ANALYTICS_EXPORT_DIR = BaseConfig.ROOT_DIR / 'exports' / 'keyword_records'
+    ANALYTICS_EXPORT_FORMAT: str = 'auto'     # parquet（需要 pyarrow）/ npz（NumPy）/ auto（有 pyarrow 时用 parquet）
+    ANALYTICS_PART_ROWS: int = 500000         # 每个分片文件最多的行数
+    
+    # 关键词记录冷热分离：早于 KEYWORD_HOT_DAYS 天的关键词记录移入按月分表的归档
+    KEYWORD_HOT_DAYS: int = 90
+    KEYWORD_ARCHIVE_AFTER_CRAWL: bool = True  # 每次爬取保存结果后自动归档
+    
+    # 结果浏览（/latest 按条件分页查询）
+    BROWSE_PAGE_SIZE: int = 50       # 每页默认的落地页数
+    BROWSE_MAX_PAGE_SIZE: int = 200  # 每页最多的落地页数
+    BROWSE_CACHE_ENTRIES: int = 64   # 缓存的查询结果数（按查询参数，结果存储写入后失效）
+    BROWSE_COMPRESS_MIN_SIZE: int = 1024  # 响应超过该字节数时压缩（gzip / brotli）
+    
+    # 预览代理（/proxy、/mobile_proxy 共用连接池，页面缓存在本地）
+    PROXY_CACHE_FILE = BaseConfig.ROOT_DIR / 'cache' / 'proxy_cache.db'
+    PROXY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024     # 缓存内容总字节数上限，超过后淘汰最久未使用的页面
+    PROXY_CACHE_MAX_ENTRY_BYTES: int = 8 * 1024 * 1024  # 单个页面超过该字节数时不缓存
+    PROXY_CACHE_DEFAULT_TTL: int = 300                 # 源站没有指定有效期时的缓存有效期(秒)
+    PROXY_POOL_SIZE: int = 16                          # 每个主机保持的连接数
+    PROXY_TIMEOUT: float = 15                          # 请求超时时间(秒)
     
     # 文件名格式
     RESULT_FILE_PREFIX: str = 'monitoring_results_'
@@ -218,6 +313,7 @@ __all__ = [
     'KeywordConfig',
     'MonitorConfig',
     'BrowserConfig',
+    'CrawlerConfig',
     'StorageConfig',
     'TimeConfig'
 ] 
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+核心业务模块
+"""
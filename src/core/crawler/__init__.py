@@ -0,0 +1,46 @@
+"""
+爬虫核心模块
+"""
+from .driver_pool import DriverPool, PooledDriver
+from .extraction import ExtractionStats, extract_ads
+from .serp_parser import parse_serp_html, parse_serp_snapshot, save_serp_snapshot
+from .redirect_cache import RedirectCache, normalize_cache_key
+from .redirects import RedirectResolver, extract_ad_target
+from .waits import SERP_READY_STATES, SerpReadiness, wait_for_serp_ready
+from .concurrency import AdaptiveConcurrency, available_memory_mb
+from .markets import MarketParams, build_market_table, build_search_url, get_market_params
+from .singleflight import SingleFlight
+from .checkpoint import CrawlCheckpoint, merge_unit_results
+from .pipeline import CrawlUnit, PipelineStage, StagedPipeline
+from .jobs import CrawlJob, CrawlJobManager
+
+__all__ = [
+    'DriverPool',
+    'PooledDriver',
+    'ExtractionStats',
+    'extract_ads',
+    'parse_serp_html',
+    'parse_serp_snapshot',
+    'save_serp_snapshot',
+    'RedirectCache',
+    'normalize_cache_key',
+    'RedirectResolver',
+    'extract_ad_target',
+    'SERP_READY_STATES',
+    'SerpReadiness',
+    'wait_for_serp_ready',
+    'AdaptiveConcurrency',
+    'available_memory_mb',
+    'MarketParams',
+    'build_market_table',
+    'build_search_url',
+    'get_market_params',
+    'SingleFlight',
+    'CrawlCheckpoint',
+    'merge_unit_results',
+    'CrawlUnit',
+    'PipelineStage',
+    'StagedPipeline',
+    'CrawlJob',
+    'CrawlJobManager'
+]
@@ -0,0 +1,198 @@
+"""
+爬取检查点模块：以追加方式记录已完成的关键词×市场任务及其结果，
+中断后重新运行时跳过已完成的任务
+"""
+import json
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+# 日志行类型
+RECORD_RUN = 'run'
+RECORD_UNIT = 'unit'
+
+
+def unit_key(keyword: str, market: str) -> Tuple[str, str]:
+    """任务键：关键词 + 市场"""
+    return keyword, market.lower()
+
+
+def merge_unit_results(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按域名合并各任务产生的记录，合并关键词记录并保留最新时间戳
+
+    Args:
+        records: 各任务产生的记录
+
+    Returns:
+        List[Dict[str, Any]]: 按首次出现顺序排列的合并结果
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        domain = record.get('domain')
+        existing = merged.get(domain)
+        if existing is None:
+            merged[domain] = dict(record, keyword_records=list(record.get('keyword_records', [])))
+            continue
+        seen = {(r.get('keyword'), r.get('market')) for r in existing['keyword_records']}
+        for keyword_record in record.get('keyword_records', []):
+            key = (keyword_record.get('keyword'), keyword_record.get('market'))
+            if key not in seen:
+                seen.add(key)
+                existing['keyword_records'].append(keyword_record)
+        if record.get('timestamp', '') > existing.get('timestamp', ''):
+            existing['timestamp'] = record['timestamp']
+    return list(merged.values())
+
+
+class CrawlCheckpoint:
+    """
+    爬取检查点
+
+    文件为 JSON Lines 格式，第一行记录本次爬取的开始时间，之后每完成一个任务追加一行，
+    每次写入的开销与已完成任务的数量无关。文件超过 max_age 未完成时视为过期，重新开始。
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = CrawlerConfig.CHECKPOINT_FILE,
+        max_age: float = CrawlerConfig.CHECKPOINT_MAX_AGE,
+        fsync: bool = CrawlerConfig.CHECKPOINT_FSYNC
+    ):
+        """
+        Args:
+            path: 检查点文件路径
+            max_age: 检查点有效期（秒），超过后不再恢复
+            fsync: 每次写入后是否同步到磁盘
+        """
+        self.path = Path(path)
+        self.max_age = max_age
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self.completed: Set[Tuple[str, str]] = set()
+        self.started_at: Optional[float] = None
+        self.resumed = False
+
+    def open(self) -> 'CrawlCheckpoint':
+        """打开检查点：有未过期的检查点时加载已完成的任务，否则新建"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = self._read_header()
+        if header is not None and time.time() - header.get('started_at', 0) <= self.max_age:
+            self.started_at = header['started_at']
+            self.completed = {unit_key(entry['keyword'], entry['market']) for entry in self._iter_units()}
+            self.resumed = True
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if not self._ends_with_newline():
+                # 上次中断时最后一行没写完，换行后再追加
+                self._file.write('\n')
+            logger.info(f"从检查点恢复: 已完成 {len(self.completed)} 个任务 ({self.path})")
+        else:
+            if header is not None:
+                logger.info(f"检查点已过期，重新开始: {self.path}")
+            self.started_at = time.time()
+            self.completed = set()
+            self.resumed = False
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write({'type': RECORD_RUN, 'started_at': self.started_at})
+        return self
+
+    def _read_header(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return header if header.get('type') == RECORD_RUN else None
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _iter_units(self) -> Iterator[Dict[str, Any]]:
+        """逐行读取已完成的任务，忽略中断时写了一半的最后一行"""
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"忽略检查点中不完整的记录: {line[:80]}")
+                    continue
+                if entry.get('type') == RECORD_UNIT:
+                    yield entry
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def is_done(self, keyword: str, market: str) -> bool:
+        """任务是否已完成"""
+        return unit_key(keyword, market) in self.completed
+
+    def record(self, keyword: str, market: str, results: List[Dict[str, Any]]) -> None:
+        """
+        记录完成的任务
+
+        Args:
+            keyword: 关键词
+            market: 市场代码
+            results: 任务产生的记录
+        """
+        key = unit_key(keyword, market)
+        with self._lock:
+            self._write({
+                'type': RECORD_UNIT,
+                'keyword': keyword,
+                'market': key[1],
+                'finished_at': time.time(),
+                'results': results
+            })
+            self.completed.add(key)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """流式读取所有已完成任务产生的记录"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        for entry in self._iter_units():
+            yield from entry.get('results') or []
+
+    def results(self) -> List[Dict[str, Any]]:
+        """读取并按域名合并所有已完成任务的结果"""
+        return merge_unit_results(self.iter_records())
+
+    def close(self) -> None:
+        """关闭检查点文件（保留文件，下次运行可以恢复）"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finish(self) -> None:
+        """结果已保存，删除检查点"""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        logger.info(f"爬取完成，已删除检查点: {self.path}")
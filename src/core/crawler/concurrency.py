@@ -0,0 +1,211 @@
+"""
+自适应并发模块：根据搜索结果页耗时、失败/拦截率和主机可用内存动态调整同时处理的关键词数量
+"""
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+# 单个关键词的处理结果
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'
+OUTCOME_BLOCKED = 'blocked'
+
+
+def available_memory_mb() -> Optional[float]:
+    """
+    获取主机可用内存
+
+    Returns:
+        Optional[float]: 可用内存(MB)，无法获取时返回 None
+    """
+    try:
+        with open('/proc/meminfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class ConcurrencySlot:
+    """一次并发占用，处理过程中可通过 outcome 标记结果"""
+
+    def __init__(self):
+        self.outcome = OUTCOME_OK
+        self.started_at = time.monotonic()
+
+
+class AdaptiveConcurrency:
+    """
+    自适应并发控制器
+
+    每完成 window 个关键词评估一次（加性增、乘性减）：
+    - 出现验证码拦截或失败率超过 max_error_rate：并发数减半
+    - 可用内存低于 min_free_memory_mb：并发数减一
+    - 平均耗时超过 target_latency：并发数减一
+    - 以上都正常且还有空闲内存：并发数加一
+    并发数始终在 [min_limit, max_limit] 之间，每次调整都会记录日志。
+    """
+
+    def __init__(
+        self,
+        min_limit: int = CrawlerConfig.ADAPTIVE_MIN_WORKERS,
+        max_limit: int = CrawlerConfig.ADAPTIVE_MAX_WORKERS,
+        initial: Optional[int] = None,
+        target_latency: float = CrawlerConfig.ADAPTIVE_TARGET_LATENCY,
+        max_error_rate: float = CrawlerConfig.ADAPTIVE_MAX_ERROR_RATE,
+        min_free_memory_mb: float = CrawlerConfig.ADAPTIVE_MIN_FREE_MEMORY_MB,
+        window: int = CrawlerConfig.ADAPTIVE_WINDOW,
+        memory_probe: Callable[[], Optional[float]] = available_memory_mb,
+        name: str = 'serp'
+    ):
+        """
+        Args:
+            min_limit: 最小并发数
+            max_limit: 最大并发数
+            initial: 初始并发数，默认取 CrawlerConfig.ADAPTIVE_INITIAL_WORKERS
+            target_latency: 单个关键词的目标耗时(秒)
+            max_error_rate: 允许的最大失败率
+            min_free_memory_mb: 最低可用内存(MB)
+            window: 每完成多少个关键词评估一次
+            memory_probe: 获取可用内存的函数，便于测试
+            name: 名称，用于日志
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        if initial is None:
+            initial = CrawlerConfig.ADAPTIVE_INITIAL_WORKERS
+        self._limit = min(max(int(initial), self.min_limit), self.max_limit)
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.min_free_memory_mb = min_free_memory_mb
+        self.window = max(1, int(window))
+        self.memory_probe = memory_probe
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._samples: List[tuple] = []  # 本轮评估窗口内的 (耗时, 结果)
+        self._adjustments: List[Dict[str, Any]] = []
+        self._completed = 0
+        self._outcomes = {OUTCOME_OK: 0, OUTCOME_ERROR: 0, OUTCOME_BLOCKED: 0}
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        with self._cond:
+            return self._limit
+
+    def acquire(self) -> ConcurrencySlot:
+        """占用一个并发名额，达到当前上限时阻塞"""
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return ConcurrencySlot()
+
+    def release(self, slot: ConcurrencySlot) -> None:
+        """释放并发名额并记录本次耗时和结果"""
+        latency = time.monotonic() - slot.started_at
+        with self._cond:
+            self._in_flight -= 1
+            self._completed += 1
+            self._outcomes[slot.outcome] = self._outcomes.get(slot.outcome, 0) + 1
+            self._samples.append((latency, slot.outcome))
+            if len(self._samples) >= self.window:
+                self._evaluate()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[ConcurrencySlot]:
+        """
+        以上下文管理器的方式占用名额，抛出异常时自动记为失败
+
+        用法:
+            with controller.slot() as slot:
+                ...
+                if blocked:
+                    slot.outcome = OUTCOME_BLOCKED
+        """
+        slot = self.acquire()
+        try:
+            yield slot
+        except BaseException:
+            slot.outcome = OUTCOME_ERROR
+            raise
+        finally:
+            self.release(slot)
+
+    def _evaluate(self) -> None:
+        """根据本轮窗口的统计调整并发上限（调用方已持有锁）"""
+        samples, self._samples = self._samples, []
+        count = len(samples)
+        avg_latency = sum(latency for latency, _ in samples) / count
+        blocked = sum(1 for _, outcome in samples if outcome == OUTCOME_BLOCKED)
+        errors = sum(1 for _, outcome in samples if outcome == OUTCOME_ERROR)
+        error_rate = (blocked + errors) / count
+        free_memory = self.memory_probe() if self.memory_probe else None
+        low_memory = free_memory is not None and free_memory < self.min_free_memory_mb
+
+        old = self._limit
+        if blocked or error_rate > self.max_error_rate:
+            new = max(self.min_limit, old // 2)
+            reason = f"拦截 {blocked} 次, 失败率 {error_rate:.0%}"
+        elif low_memory:
+            new = max(self.min_limit, old - 1)
+            reason = f"可用内存 {free_memory:.0f}MB 低于 {self.min_free_memory_mb:.0f}MB"
+        elif avg_latency > self.target_latency:
+            new = max(self.min_limit, old - 1)
+            reason = f"平均耗时 {avg_latency:.2f}s 超过目标 {self.target_latency:.2f}s"
+        else:
+            new = min(self.max_limit, old + 1)
+            reason = f"平均耗时 {avg_latency:.2f}s, 失败率 {error_rate:.0%}"
+
+        if new == old:
+            return
+        self._limit = new
+        self._adjustments.append({
+            'time': time.time(),
+            'from': old,
+            'to': new,
+            'reason': reason,
+            'avg_latency': avg_latency,
+            'error_rate': error_rate,
+            'free_memory_mb': free_memory,
+        })
+        logger.info(f"[{self.name}] 并发调整 {old} -> {new} ({reason})")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取并发控制统计信息"""
+        with self._cond:
+            return {
+                'limit': self._limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'outcomes': dict(self._outcomes),
+                'adjustments': list(self._adjustments),
+            }
+
+    def log_stats(self) -> None:
+        """输出并发控制统计信息"""
+        stats = self.stats()
+        outcomes = stats['outcomes']
+        logger.info(
+            f"[{self.name}] 并发控制统计: 当前上限 {stats['limit']} "
+            f"(范围 {stats['min_limit']}-{stats['max_limit']}), 完成 {stats['completed']} "
+            f"(成功 {outcomes.get(OUTCOME_OK, 0)}, 失败 {outcomes.get(OUTCOME_ERROR, 0)}, "
+            f"拦截 {outcomes.get(OUTCOME_BLOCKED, 0)}), 调整 {len(stats['adjustments'])} 次"
+        )
@@ -0,0 +1,268 @@
+"""
+浏览器池模块：复用 WebDriver 实例，避免每个关键词都重新启动浏览器
+"""
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """池中的浏览器实例及其使用信息"""
+
+    def __init__(self, driver: Any, launch_time: float):
+        self.driver = driver
+        self.launch_time = launch_time
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """
+    有界、线程安全的浏览器池
+
+    - 租用时优先复用空闲浏览器（命中），没有空闲且未达上限时启动新浏览器（未命中）
+    - 复用前做健康检查，失效的浏览器直接丢弃
+    - 浏览器使用次数达到上限或执行过程中崩溃时回收重建
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = CrawlerConfig.DRIVER_POOL_SIZE,
+        max_uses: int = CrawlerConfig.DRIVER_MAX_USES,
+        lease_timeout: float = CrawlerConfig.DRIVER_LEASE_TIMEOUT,
+        health_check: Optional[Callable[[Any], bool]] = None,
+        reset: Optional[Callable[[Any], None]] = None,
+        name: str = 'driver'
+    ):
+        """
+        Args:
+            factory: 创建浏览器的函数
+            max_size: 池中最多同时存在的浏览器数量
+            max_uses: 单个浏览器最多被租用的次数
+            lease_timeout: 等待空闲浏览器的超时时间（秒）
+            health_check: 健康检查函数，返回 False 表示浏览器不可用
+            reset: 归还时清理浏览器状态的函数
+            name: 池名称，用于日志
+        """
+        self._factory = factory
+        self.max_size = max(1, int(max_size))
+        self.max_uses = max(1, int(max_uses))
+        self.lease_timeout = lease_timeout
+        self._health_check = health_check or self._default_health_check
+        self._reset = reset
+        self.name = name
+
+        self._idle = deque()
+        self._size = 0  # 当前存活的浏览器数量（空闲 + 已租出）
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'launches': 0,
+            'launch_failures': 0,
+            'launch_time_total': 0.0,
+            'launch_time_max': 0.0,
+            'recycled': 0,
+            'crashed': 0,
+            'unhealthy': 0,
+        }
+
+    @staticmethod
+    def _default_health_check(driver: Any) -> bool:
+        """默认健康检查：执行一次最简单的脚本"""
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _incr(self, key: str, value: float = 1) -> None:
+        with self._cond:
+            self._stats[key] += value
+
+    def _launch(self) -> PooledDriver:
+        """启动新的浏览器（调用前已占用名额）"""
+        start = time.perf_counter()
+        try:
+            driver = self._factory()
+            if driver is None:
+                raise RuntimeError('浏览器创建函数返回了 None')
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._stats['launch_failures'] += 1
+                self._cond.notify()
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            self._stats['launches'] += 1
+            self._stats['launch_time_total'] += elapsed
+            self._stats['launch_time_max'] = max(self._stats['launch_time_max'], elapsed)
+        logger.info(f"[{self.name}] 启动新浏览器耗时 {elapsed:.2f}s")
+        return PooledDriver(driver, elapsed)
+
+    def _destroy(self, pooled: PooledDriver) -> None:
+        """关闭浏览器并释放名额"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"[{self.name}] 关闭浏览器失败: {str(e)}")
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        租用一个浏览器
+
+        Args:
+            timeout: 等待超时时间（秒），默认使用 lease_timeout
+
+        Returns:
+            PooledDriver: 租到的浏览器
+
+        Raises:
+            TimeoutError: 超时仍没有可用浏览器
+            RuntimeError: 浏览器池已关闭
+        """
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f'浏览器池 {self.name} 已关闭')
+                    if self._idle:
+                        pooled = self._idle.popleft()
+                        launch = False
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._stats['misses'] += 1
+                        pooled = None
+                        launch = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f'等待浏览器池 {self.name} 超时 ({timeout}s)')
+                    self._cond.wait(remaining)
+
+            if launch:
+                pooled = self._launch()
+            elif not self._health_check(pooled.driver):
+                # 空闲浏览器已失效，丢弃后重新获取
+                logger.warning(f"[{self.name}] 空闲浏览器健康检查失败，已丢弃")
+                self._incr('unhealthy')
+                self._destroy(pooled)
+                continue
+            else:
+                self._incr('hits')
+
+            pooled.uses += 1
+            return pooled
+
+    def release(self, pooled: PooledDriver, discard: bool = False) -> None:
+        """
+        归还浏览器
+
+        Args:
+            pooled: 租用的浏览器
+            discard: 是否直接丢弃（例如执行过程中崩溃）
+        """
+        if discard:
+            self._incr('crashed')
+            self._destroy(pooled)
+            return
+
+        if pooled.uses >= self.max_uses:
+            logger.info(f"[{self.name}] 浏览器已使用 {pooled.uses} 次，回收重建")
+            self._incr('recycled')
+            self._destroy(pooled)
+            return
+
+        if self._reset:
+            try:
+                self._reset(pooled.driver)
+            except Exception as e:
+                logger.warning(f"[{self.name}] 重置浏览器状态失败，已丢弃: {str(e)}")
+                self._incr('unhealthy')
+                self._destroy(pooled)
+                return
+
+        with self._cond:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append(pooled)
+                self._cond.notify()
+        if closed:
+            self._destroy(pooled)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        以上下文管理器方式租用浏览器
+
+        执行过程中出现异常时会做一次健康检查，浏览器崩溃则丢弃，否则正常归还。
+        """
+        pooled = self.acquire(timeout)
+        discard = False
+        try:
+            yield pooled.driver
+        except Exception:
+            discard = not self._health_check(pooled.driver)
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def close(self) -> None:
+        """关闭浏览器池及所有空闲浏览器，已租出的浏览器在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._destroy(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取浏览器池统计信息"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+        requests_total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / requests_total if requests_total else 0.0
+        stats['launch_time_avg'] = (
+            stats['launch_time_total'] / stats['launches'] if stats['launches'] else 0.0
+        )
+        return stats
+
+    def log_stats(self) -> None:
+        """输出浏览器池统计信息"""
+        stats = self.stats()
+        logger.info(
+            f"[{self.name}] 浏览器池统计: 命中 {stats['hits']}, 未命中 {stats['misses']} "
+            f"(命中率 {stats['hit_rate']:.0%}), 启动 {stats['launches']} 次 "
+            f"(平均 {stats['launch_time_avg']:.2f}s, 最长 {stats['launch_time_max']:.2f}s, "
+            f"累计 {stats['launch_time_total']:.2f}s), 回收 {stats['recycled']}, "
+            f"崩溃 {stats['crashed']}, 健康检查失败 {stats['unhealthy']}"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,202 @@
+"""
+广告提取模块：一次脚本调用提取所有广告，逐个元素查询的方式仅作为兜底
+"""
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+
+logger = logging.getLogger(__name__)
+
+# 移动端广告选择器
+AD_SELECTORS = [
+    "div.uEierd",  # 通用广告容器
+]
+
+# 广告标题选择器（按优先级排列）
+TITLE_SELECTORS = [
+    "div.CCgQ5", "div.v9i61e", "a[data-text-ad] div",
+    "div.BmP5tf", "div[role='heading']", "h3"
+]
+
+# 广告链接选择器（按优先级排列）
+LINK_SELECTORS = [
+    "a[data-rw]", "a.sVXRqc", "a[ping]",
+    "a[data-pcu]", "a"
+]
+
+# 在页面中遍历所有广告容器，一次返回标题和链接
+_EXTRACT_SCRIPT = '''
+var adSelectors = arguments[0], titleSelectors = arguments[1], linkSelectors = arguments[2];
+function firstText(ad) {
+    for (var i = 0; i < titleSelectors.length; i++) {
+        var el = ad.querySelector(titleSelectors[i]);
+        var text = el ? (el.innerText || el.textContent || '').trim() : '';
+        if (text) return text;
+    }
+    return '';
+}
+function firstHref(ad) {
+    for (var i = 0; i < linkSelectors.length; i++) {
+        var el = ad.querySelector(linkSelectors[i]);
+        if (el && el.href) return el.href;
+    }
+    return '';
+}
+for (var s = 0; s < adSelectors.length; s++) {
+    var ads = document.querySelectorAll(adSelectors[s]);
+    if (!ads.length) continue;
+    var items = [];
+    for (var j = 0; j < ads.length; j++) {
+        items.push({index: j + 1, title: firstText(ads[j]), link: firstHref(ads[j])});
+    }
+    return {selector: adSelectors[s], total: ads.length, items: items};
+}
+return {selector: null, total: 0, items: []};
+'''
+
+
+class ExtractionStats:
+    """广告提取统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot_calls = 0
+        self.script_calls = 0
+        self.fallback_calls = 0
+
+    def record(self, fallback: bool, snapshot: bool = False) -> None:
+        with self._lock:
+            if snapshot:
+                self.snapshot_calls += 1
+            elif fallback:
+                self.fallback_calls += 1
+            else:
+                self.script_calls += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.snapshot_calls + self.script_calls + self.fallback_calls
+            return {
+                'snapshot_calls': self.snapshot_calls,
+                'script_calls': self.script_calls,
+                'fallback_calls': self.fallback_calls,
+                'fallback_rate': self.fallback_calls / total if total else 0.0
+            }
+
+    def log_stats(self) -> None:
+        stats = self.snapshot()
+        logger.info(
+            f"广告提取统计: 快照解析 {stats['snapshot_calls']} 次, 脚本提取 {stats['script_calls']} 次, "
+            f"兜底提取 {stats['fallback_calls']} 次 (占比 {stats['fallback_rate']:.0%})"
+        )
+
+
+def _extract_with_script(driver: Any) -> Optional[Dict[str, Any]]:
+    """通过注入脚本一次性提取所有广告，失败时返回 None"""
+    try:
+        data = driver.execute_script(_EXTRACT_SCRIPT, AD_SELECTORS, TITLE_SELECTORS, LINK_SELECTORS)
+    except Exception as e:
+        logger.warning(f"脚本提取广告失败，改用逐个元素查询: {str(e)}")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+        logger.warning("脚本提取广告返回格式异常，改用逐个元素查询")
+        return None
+    return data
+
+
+def _extract_with_elements(driver: Any) -> Dict[str, Any]:
+    """逐个元素查询的兜底提取方式（临时关闭隐式等待，避免未命中的选择器阻塞）"""
+    try:
+        implicit_wait = driver.timeouts.implicit_wait
+        driver.implicitly_wait(0)
+    except Exception:
+        implicit_wait = None
+
+    try:
+        for selector in AD_SELECTORS:
+            ads = driver.find_elements(By.CSS_SELECTOR, selector)
+            if not ads:
+                continue
+
+            items = []
+            for index, ad in enumerate(ads, 1):
+                title = ''
+                link = ''
+                for title_selector in TITLE_SELECTORS:
+                    try:
+                        title = ad.find_element(By.CSS_SELECTOR, title_selector).text.strip()
+                        if title:
+                            break
+                    except Exception:
+                        continue
+
+                for link_selector in LINK_SELECTORS:
+                    try:
+                        link = ad.find_element(By.CSS_SELECTOR, link_selector).get_attribute("href")
+                        if link:
+                            break
+                    except Exception:
+                        continue
+
+                items.append({'index': index, 'title': title, 'link': link or ''})
+            return {'selector': selector, 'total': len(ads), 'items': items}
+
+        return {'selector': None, 'total': 0, 'items': []}
+    finally:
+        if implicit_wait is not None:
+            driver.implicitly_wait(implicit_wait)
+
+
+def collect_raw_ads(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将提取到的广告条目整理为 raw_ads：过滤缺少标题或链接的条目，按链接去重并编号
+
+    Args:
+        items: 提取到的广告条目，包含 title / link
+
+    Returns:
+        List[Dict[str, Any]]: 包含 title / link / position 的广告列表
+    """
+    raw_ads = []
+    seen_links = set()
+    for item in items:
+        title = (item.get('title') or '').strip()
+        link = item.get('link') or ''
+        if not title or not link or link in seen_links:
+            continue
+        seen_links.add(link)
+        raw_ads.append({
+            "title": title,
+            "link": link,
+            "position": len(raw_ads) + 1  # 使用实际位置
+        })
+    return raw_ads
+
+
+def extract_ads(driver: Any, stats: Optional[ExtractionStats] = None) -> Dict[str, Any]:
+    """
+    提取当前搜索结果页中的所有广告
+
+    Args:
+        driver: 浏览器驱动实例
+        stats: 可选的提取统计对象
+
+    Returns:
+        Dict[str, Any]: selector（命中的容器选择器）、total（广告容器数量）、
+        raw_ads（去重后的广告列表）、fallback（是否使用了兜底方式）
+    """
+    data = _extract_with_script(driver)
+    fallback = data is None
+    if fallback:
+        data = _extract_with_elements(driver)
+    if stats is not None:
+        stats.record(fallback)
+
+    return {
+        'selector': data.get('selector'),
+        'total': data.get('total', 0),
+        'raw_ads': collect_raw_ads(data['items']),
+        'fallback': fallback
+    }
@@ -0,0 +1,258 @@
+"""
+后台爬取任务模块：爬取在后台线程中运行，每个任务有 id、状态和进度事件序列，
+同一时间只运行一个任务，再次启动时返回正在运行的任务
+"""
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+# 进度事件类型（由 GoogleAdMonitor.monitor_keywords 和 google_monitor.main 发布）
+EVENT_STARTED = 'started'          # 开始爬取：total（任务总数）、skipped（检查点中已完成的任务数）
+EVENT_UNIT = 'unit'                # 一个关键词/市场任务完成：ads、new_records、state、timings
+EVENT_UNIT_FAILED = 'unit_failed'  # 一个任务在某个阶段失败：stage、error
+EVENT_STATUS = 'status'            # 阶段变化：phase（saving / archiving 等）
+EVENT_FINISHED = 'finished'        # 任务结束：status、result、error
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+class CrawlJob:
+    """
+    后台爬取任务
+
+    publish() 追加进度事件并更新进度计数，events_after() 等待并读取某个序号之后的事件，
+    可供多个进度流同时读取。
+    """
+
+    def __init__(self, max_events: int = CrawlerConfig.JOB_MAX_EVENTS):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = STATUS_RUNNING
+        self.started_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.phase = 'crawling'
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.progress = {
+            'total': 0,         # 任务总数（关键词数 × 市场数）
+            'skipped': 0,       # 检查点中已完成、本次跳过的任务数
+            'processed': 0,     # 本次完成的任务数（含被拦截的任务）
+            'blocked': 0,       # 被验证码拦截的任务数
+            'failed': 0,        # 处理失败的任务数
+            'ads': 0,           # 找到的广告数
+            'new_records': 0,   # 新增的落地页记录数
+        }
+        self.cancel_event = threading.Event()
+        self._events: deque = deque(maxlen=max_events)
+        self._seq = 0
+        self._started = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def percent(self) -> float:
+        """完成百分比（跳过、完成和失败的任务都计为已处理）"""
+        total = self.progress['total']
+        if not total:
+            return 100.0 if self.finished else 0.0
+        done = self.progress['skipped'] + self.progress['processed'] + self.progress['failed']
+        return round(min(100.0, done * 100.0 / total), 1)
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        发布进度事件（可在多个线程中调用）
+
+        Args:
+            event_type: 事件类型，见 EVENT_*
+            data: 事件数据
+        """
+        data = dict(data or {})
+        with self._cond:
+            progress = self.progress
+            if event_type == EVENT_STARTED:
+                progress['total'] = data.get('total', 0)
+                progress['skipped'] = data.get('skipped', 0)
+            elif event_type == EVENT_UNIT:
+                progress['processed'] += 1
+                progress['blocked'] += data.get('state') == 'blocked'
+                progress['ads'] += data.get('ads', 0)
+                progress['new_records'] += data.get('new_records', 0)
+            elif event_type == EVENT_UNIT_FAILED:
+                progress['failed'] += 1
+            elif event_type == EVENT_STATUS:
+                self.phase = data.get('phase', self.phase)
+            self._append(event_type, data)
+
+    def _append(self, event_type: str, data: Dict[str, Any]) -> None:
+        self._seq += 1
+        data['progress'] = dict(self.progress, percent=self.percent)
+        data['elapsed'] = round(time.monotonic() - self._started, 1)
+        self._events.append((self._seq, event_type, data))
+        self._cond.notify_all()
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """结束任务并发布 finished 事件"""
+        with self._cond:
+            self.status = status
+            self.phase = status
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now().isoformat()
+            self._append(EVENT_FINISHED, {'status': status, 'result': result, 'error': error})
+
+    def cancel(self) -> bool:
+        """
+        请求取消：不再提交新的关键词，正在处理的任务完成后结束，已完成部分保留在检查点中
+
+        Returns:
+            bool: 任务是否仍在运行
+        """
+        if self.finished:
+            return False
+        self.cancel_event.set()
+        self.publish(EVENT_STATUS, {'phase': 'cancelling'})
+        return True
+
+    @property
+    def last_seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def events_after(self, seq: int, timeout: Optional[float] = None) -> List[Event]:
+        """
+        读取序号大于 seq 的事件，没有新事件且任务未结束时最多等待 timeout 秒
+
+        Args:
+            seq: 已读取的最后一个事件序号（从 0 开始读取全部保留的事件）
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            List[Event]: (序号, 事件类型, 数据) 列表，等待超时或任务已结束时可能为空
+        """
+        with self._cond:
+            if self._seq <= seq and not self.finished:
+                self._cond.wait(timeout)
+            return [event for event in self._events if event[0] > seq]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """任务状态"""
+        with self._cond:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'phase': self.phase,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'progress': dict(self.progress, percent=self.percent),
+                'result': self.result,
+                'error': self.error,
+                'last_event': self._seq
+            }
+
+
+class CrawlJobManager:
+    """
+    后台爬取任务管理
+
+    start() 在后台线程中运行 target(job)；已有任务在运行时直接返回该任务。
+    target 通过 job.publish() 发布进度、通过 job.cancel_event 检查取消，返回值保存为任务结果；
+    返回值中有 error 或抛出异常时任务记为失败。
+    """
+
+    def __init__(
+        self,
+        target: Callable[[CrawlJob], Optional[Dict[str, Any]]],
+        history: int = CrawlerConfig.JOB_HISTORY
+    ):
+        """
+        Args:
+            target: 执行爬取的函数
+            history: 保留最近多少个已结束的任务
+        """
+        self.target = target
+        self.history = history
+        self._jobs: 'OrderedDict[str, CrawlJob]' = OrderedDict()
+        self._current: Optional[CrawlJob] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> Tuple[CrawlJob, bool]:
+        """
+        启动爬取任务
+
+        Returns:
+            Tuple[CrawlJob, bool]: (任务, 是否新建)，已有任务在运行时返回该任务和 False
+        """
+        with self._lock:
+            if self._current is not None and not self._current.finished:
+                return self._current, False
+            job = CrawlJob()
+            self._jobs[job.id] = job
+            self._current = job
+            self._trim()
+            thread = threading.Thread(target=self._run, args=(job,), name=f'crawl-job-{job.id}', daemon=True)
+            thread.start()
+        logger.info(f"已启动爬取任务 {job.id}")
+        return job, True
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: CrawlJob) -> None:
+        try:
+            result = self.target(job)
+        except Exception as e:
+            logger.error(f"爬取任务 {job.id} 失败: {str(e)}")
+            job.finish(STATUS_FAILED, error=str(e))
+            return
+        if result and result.get('error'):
+            job.finish(STATUS_FAILED, result=result, error=result['error'])
+        elif job.cancel_event.is_set():
+            job.finish(STATUS_CANCELLED, result=result)
+        else:
+            job.finish(STATUS_COMPLETED, result=result)
+        logger.info(f"爬取任务 {job.id} 结束: {job.status}")
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        """按 id 获取任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def current(self) -> Optional[CrawlJob]:
+        """正在运行的任务"""
+        with self._lock:
+            if self._current is not None and not self._current.finished:
+                return self._current
+            return None
+
+    def jobs(self) -> List[CrawlJob]:
+        """所有保留的任务（从新到旧）"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务
+
+        Returns:
+            bool: 任务存在且仍在运行
+        """
+        job = self.get(job_id)
+        return job is not None and job.cancel()
@@ -0,0 +1,100 @@
+"""
+市场参数模块：根据 GoogleConfig.DOMAINS 生成各市场的搜索参数和搜索地址
+"""
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from src.config import GoogleConfig
+
+# 各市场的界面语言，未列出的市场使用 en
+MARKET_LANGUAGES: Dict[str, str] = {
+    'us': 'en-US',
+    'uk': 'en-GB',
+    'in': 'en-IN',
+    'au': 'en-AU',
+    'gh': 'en-GH',
+}
+
+# 与市场代码不一致的 gl 参数（ISO 国家代码）
+MARKET_COUNTRY_CODES: Dict[str, str] = {
+    'uk': 'gb',
+}
+
+# 移动端搜索的固定参数
+MOBILE_SEARCH_PARAMS = [
+    ('source', 'mobile'),
+    ('v', 'mobile'),
+    ('mobile', '1'),
+    ('device', 'mobile'),
+    ('nfpr', '1'),
+    ('gws_rd', 'cr'),
+    ('pws', '0'),
+]
+
+
+class MarketParams(NamedTuple):
+    """单个市场的搜索参数"""
+    code: str     # 市场代码，与结果中的 market 字段一致
+    gl: str       # 搜索国家
+    hl: str       # 界面语言
+    domain: str   # Google 域名
+
+
+def build_market_table(domains: Optional[Dict[str, str]] = None) -> Dict[str, MarketParams]:
+    """
+    生成市场参数表
+
+    Args:
+        domains: 市场代码到 Google 域名的映射，默认使用 GoogleConfig.DOMAINS
+
+    Returns:
+        Dict[str, MarketParams]: 市场代码到搜索参数的映射
+    """
+    if domains is None:
+        domains = GoogleConfig.DOMAINS
+    table = {}
+    for code, domain in domains.items():
+        code = code.lower()
+        table[code] = MarketParams(
+            code=code,
+            gl=MARKET_COUNTRY_CODES.get(code, code),
+            hl=MARKET_LANGUAGES.get(code, 'en'),
+            domain=domain
+        )
+    return table
+
+
+MARKETS = build_market_table()
+
+
+def get_market_params(market: str) -> MarketParams:
+    """
+    获取市场的搜索参数，未配置的市场使用 google.com 和市场代码作为 gl
+
+    Args:
+        market: 市场代码
+
+    Returns:
+        MarketParams: 搜索参数
+    """
+    market = market.lower()
+    params = MARKETS.get(market)
+    if params is None:
+        params = MarketParams(code=market, gl=market, hl='en', domain='google.com')
+    return params
+
+
+def build_search_url(keyword: str, market: str) -> str:
+    """
+    生成移动端搜索地址
+
+    Args:
+        keyword: 关键词
+        market: 市场代码
+
+    Returns:
+        str: 搜索地址
+    """
+    params = get_market_params(market)
+    query = [('gl', params.gl), ('hl', params.hl)] + MOBILE_SEARCH_PARAMS + [('q', keyword)]
+    return f"https://www.{params.domain}/search?{urlencode(query)}"
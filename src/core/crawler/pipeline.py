@@ -0,0 +1,222 @@
+"""
+分阶段爬取流水线：各阶段通过有界队列连接，每个阶段有独立的工作线程数
+"""
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+# 通知工作线程退出的哨兵
+_STOP = object()
+
+
+class CrawlUnit:
+    """爬取单元：一个关键词在一个市场中的处理状态"""
+
+    def __init__(self, keyword: str, index: int = 0, total: int = 0, market: str = 'in'):
+        self.keyword = keyword
+        self.market = market
+        self.index = index
+        self.total = total
+        self.raw_ads: List[Dict[str, Any]] = []   # SERP 阶段提取的广告
+        self.ads: List[Dict[str, Any]] = []       # 跳转阶段解析后的广告（含 final_url / domain）
+        self.results: List[Dict[str, Any]] = []   # 落地页阶段生成的新记录
+        self.timings: Dict[str, float] = {}       # 各阶段耗时（秒）
+        self.serp_state: Optional[str] = None     # 搜索结果页就绪状态（ads / no_ads / blocked 等）
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return f"CrawlUnit({self.keyword!r}, {self.market!r})"
+
+
+class PipelineStage:
+    """流水线阶段"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = CrawlerConfig.PIPELINE_QUEUE_SIZE
+    ):
+        """
+        Args:
+            name: 阶段名称
+            handler: 处理函数，返回值交给下一阶段，返回 None 表示不再向下传递
+            workers: 工作线程数
+            queue_size: 输入队列容量，队列满时上游阻塞（背压）
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue: 'queue.Queue[Any]' = queue.Queue(maxsize=max(1, int(queue_size)))
+
+        self._lock = threading.Lock()
+        self._alive = 0
+        self.in_flight = 0
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.processed += 1
+            self.busy_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+            if failed:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'queue_size': self.queue.maxsize,
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'processed': self.processed,
+                'errors': self.errors,
+                'avg_time': self.busy_time / self.processed if self.processed else 0.0,
+                'max_time': self.max_time,
+            }
+
+
+class StagedPipeline:
+    """
+    分阶段流水线
+
+    submit() 把任务放入第一阶段的队列；每个阶段的处理结果放入下一阶段的队列，
+    最后一个阶段的结果交给 on_result，处理失败的任务交给 on_error(阶段名, 任务, 异常)。
+    队列有界，下游处理慢时上游自动阻塞。
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None,
+        report_interval: float = CrawlerConfig.PIPELINE_REPORT_INTERVAL,
+        name: str = 'pipeline'
+    ):
+        if not stages:
+            raise ValueError('流水线至少需要一个阶段')
+        self.stages = stages
+        self.on_result = on_result
+        self.on_error = on_error
+        self.report_interval = report_interval
+        self.name = name
+        self._threads: List[threading.Thread] = []
+        self._stop_reporter = threading.Event()
+        self._started_at: Optional[float] = None
+
+    def start(self) -> None:
+        """启动所有阶段的工作线程"""
+        self._started_at = time.monotonic()
+        for position, stage in enumerate(self.stages):
+            stage._alive = stage.workers
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(position,),
+                    name=f'{self.name}-{stage.name}-{i + 1}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+        if self.report_interval and self.report_interval > 0:
+            reporter = threading.Thread(target=self._reporter, name=f'{self.name}-reporter', daemon=True)
+            reporter.start()
+
+    def submit(self, item: Any) -> None:
+        """提交任务到第一阶段，队列满时阻塞"""
+        self.stages[0].queue.put(item)
+
+    def close(self) -> None:
+        """所有任务提交完毕，通知第一阶段在处理完队列后退出"""
+        first = self.stages[0]
+        for _ in range(first.workers):
+            first.queue.put(_STOP)
+
+    def join(self) -> None:
+        """关闭输入并等待所有阶段处理完成"""
+        self.close()
+        for thread in self._threads:
+            thread.join()
+        self._stop_reporter.set()
+        self.log_snapshot()
+
+    def _worker(self, position: int) -> None:
+        stage = self.stages[position]
+        next_stage = self.stages[position + 1] if position + 1 < len(self.stages) else None
+
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                with stage._lock:
+                    stage._alive -= 1
+                    last = stage._alive == 0
+                # 本阶段最后一个线程退出时，通知下一阶段
+                if last and next_stage is not None:
+                    for _ in range(next_stage.workers):
+                        next_stage.queue.put(_STOP)
+                return
+
+            with stage._lock:
+                stage.in_flight += 1
+            start = time.perf_counter()
+            failed = False
+            output = None
+            try:
+                output = stage.handler(item)
+            except Exception as e:
+                failed = True
+                logger.error(f"[{self.name}] 阶段 {stage.name} 处理 {item!r} 失败: {str(e)}")
+                if self.on_error is not None:
+                    try:
+                        self.on_error(stage.name, item, e)
+                    except Exception as callback_error:
+                        logger.error(f"[{self.name}] 处理失败回调失败: {str(callback_error)}")
+            finally:
+                stage.record(time.perf_counter() - start, failed)
+                with stage._lock:
+                    stage.in_flight -= 1
+
+            if output is None:
+                continue
+            if next_stage is not None:
+                next_stage.queue.put(output)
+            elif self.on_result is not None:
+                try:
+                    self.on_result(output)
+                except Exception as e:
+                    logger.error(f"[{self.name}] 处理结果回调失败: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取各阶段的队列深度和耗时统计"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'elapsed': elapsed,
+            'stages': {stage.name: stage.snapshot() for stage in self.stages}
+        }
+
+    def log_snapshot(self) -> None:
+        """输出各阶段状态"""
+        snapshot = self.snapshot()
+        parts = []
+        for name, stats in snapshot['stages'].items():
+            parts.append(
+                f"{name}: 队列 {stats['queue_depth']}/{stats['queue_size']}, 处理中 {stats['in_flight']}, "
+                f"完成 {stats['processed']}, 失败 {stats['errors']}, "
+                f"平均 {stats['avg_time']:.2f}s, 最长 {stats['max_time']:.2f}s"
+            )
+        logger.info(f"[{self.name}] 已运行 {snapshot['elapsed']:.0f}s | " + " | ".join(parts))
+
+    def _reporter(self) -> None:
+        while not self._stop_reporter.wait(self.report_interval):
+            self.log_snapshot()
@@ -0,0 +1,221 @@
+"""
+跳转缓存模块：缓存广告目标 URL 到最终落地页 URL 的解析结果，并持久化到本地
+"""
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from src.config import CrawlerConfig
+
+logger = logging.getLogger(__name__)
+
+# 不影响落地页的跟踪参数，生成缓存键时去掉
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_content', 'utm_term', 'utm_id',
+    'gclid', 'gclsrc', 'gbraid', 'wbraid', 'gad_source', 'gad_campaignid',
+    'fbclid', 'msclkid', '_ga'
+}
+
+
+def normalize_cache_key(url: str) -> str:
+    """
+    生成缓存键：协议和域名小写、去掉默认端口和锚点、移除跟踪参数并对其余参数排序
+
+    Args:
+        url: 广告目标 URL（已从 aclk 链接中提取）
+
+    Returns:
+        str: 规范化后的缓存键
+    """
+    try:
+        parsed = urlparse(url.strip())
+        scheme = (parsed.scheme or 'https').lower()
+        netloc = parsed.netloc.lower()
+        if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+            netloc = netloc.rsplit(':', 1)[0]
+        query = sorted(
+            (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS
+        )
+        return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, urlencode(query), ''))
+    except Exception:
+        return url
+
+
+class RedirectCache:
+    """
+    跳转解析结果缓存
+
+    - 内存中按最近使用顺序保存，超过 max_entries 时淘汰最久未使用的条目
+    - 成功结果和失败结果（超时、连接错误等）使用不同的有效期
+    - 写入时同步落盘到 SQLite，重启后自动加载未过期的条目
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = CrawlerConfig.REDIRECT_CACHE_FILE,
+        max_entries: int = CrawlerConfig.REDIRECT_CACHE_MAX_ENTRIES,
+        ttl: float = CrawlerConfig.REDIRECT_CACHE_TTL,
+        negative_ttl: float = CrawlerConfig.REDIRECT_CACHE_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: 缓存文件路径，为 None 时只使用内存
+            max_entries: 最多缓存的条目数
+            ttl: 成功结果的有效期（秒）
+            negative_ttl: 失败结果的有效期（秒）
+            clock: 时间函数，便于测试
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (final_url, expires_at)，final_url 为 None 表示失败结果
+        self._entries: 'OrderedDict[str, Tuple[Optional[str], float]]' = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'stores': 0,
+            'negative_stores': 0,
+        }
+
+        self._conn = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS redirects (
+                    key TEXT PRIMARY KEY,
+                    final_url TEXT,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._conn.commit()
+            self._load()
+
+    def _load(self) -> None:
+        """从磁盘加载未过期的条目（按最近使用顺序）"""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute('DELETE FROM redirects WHERE expires_at <= ?', (now,))
+            rows = self._conn.execute(
+                'SELECT key, final_url, expires_at FROM redirects ORDER BY accessed_at DESC LIMIT ?',
+                (self.max_entries,)
+            ).fetchall()
+            self._conn.commit()
+            for key, final_url, expires_at in reversed(rows):
+                self._entries[key] = (final_url, expires_at)
+        logger.info(f"已加载 {len(rows)} 条跳转缓存")
+
+    def get(self, url: str) -> Tuple[bool, Optional[str]]:
+        """
+        查询缓存
+
+        Args:
+            url: 广告目标 URL
+
+        Returns:
+            Tuple[bool, Optional[str]]: (是否命中, 最终 URL)，命中失败结果时最终 URL 为 None
+        """
+        key = normalize_cache_key(url)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+
+            final_url, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                if self._conn is not None:
+                    self._conn.execute('DELETE FROM redirects WHERE key = ?', (key,))
+                    self._conn.commit()
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._stats['hits' if final_url is not None else 'negative_hits'] += 1
+            return True, final_url
+
+    def _put(self, url: str, final_url: Optional[str], ttl: float) -> None:
+        key = normalize_cache_key(url)
+        now = self._clock()
+        expires_at = now + ttl
+        with self._lock:
+            self._entries[key] = (final_url, expires_at)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                evicted.append((evicted_key,))
+            self._stats['evictions'] += len(evicted)
+
+            if self._conn is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO redirects (key, final_url, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, final_url, expires_at, now)
+                )
+                if evicted:
+                    self._conn.executemany('DELETE FROM redirects WHERE key = ?', evicted)
+                self._conn.commit()
+
+    def set(self, url: str, final_url: str) -> None:
+        """缓存成功解析的结果"""
+        self._put(url, final_url, self.ttl)
+        with self._lock:
+            self._stats['stores'] += 1
+
+    def set_negative(self, url: str) -> None:
+        """缓存解析失败的结果（超时、连接错误等），有效期较短"""
+        self._put(url, None, self.negative_ttl)
+        with self._lock:
+            self._stats['negative_stores'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def log_stats(self) -> None:
+        """输出缓存统计信息"""
+        stats = self.stats()
+        logger.info(
+            f"跳转缓存统计: 命中 {stats['hits']}, 失败结果命中 {stats['negative_hits']}, "
+            f"未命中 {stats['misses']} (命中率 {stats['hit_rate']:.0%}), 过期 {stats['expired']}, "
+            f"淘汰 {stats['evictions']}, 当前条目 {stats['entries']}"
+        )
+
+    def close(self) -> None:
+        """保存最近使用顺序并关闭缓存文件"""
+        if self._conn is None:
+            return
+        with self._lock:
+            now = self._clock()
+            # 按内存中的使用顺序写回访问时间，保证重启后淘汰顺序一致
+            count = len(self._entries)
+            self._conn.executemany(
+                'UPDATE redirects SET accessed_at = ? WHERE key = ?',
+                ((now - (count - i) * 1e-6, key) for i, key in enumerate(self._entries))
+            )
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
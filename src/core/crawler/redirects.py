@@ -0,0 +1,210 @@
+"""
+跳转解析模块：解析广告链接的最终落地页 URL，支持并发解析
+"""
+import re
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import CrawlerConfig
+from .redirect_cache import RedirectCache, normalize_cache_key
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 解析跳转时使用的移动端请求头
+MOBILE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Google 广告链接中携带目标 URL 的参数
+AD_TARGET_PARAMS = ['adurl', 'dest', 'url']
+
+# Google 各市场的搜索域名（google.com、www.google.co.in、google.com.gh 等）
+_GOOGLE_HOST = re.compile(r'^(?:www\.)?google\.(?:com?\.)?[a-z]{2,3}$')
+_AD_SERVICES_HOSTS = ('googleadservices.com', 'www.googleadservices.com')
+
+
+def is_ad_click_url(url: str) -> bool:
+    """是否为 Google 广告点击链接：任意 Google 搜索域名下的 /aclk，或 googleadservices.com/pagead/aclk"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return False
+    host = (parsed.hostname or '').lower()
+    if _GOOGLE_HOST.match(host):
+        return parsed.path == '/aclk'
+    return host in _AD_SERVICES_HOSTS and parsed.path == '/pagead/aclk'
+
+
+def extract_ad_target(url: str) -> Optional[str]:
+    """
+    从 Google 广告点击链接（aclk）中提取目标 URL
+
+    Args:
+        url: 广告链接
+
+    Returns:
+        Optional[str]: 目标 URL，不是广告链接或没有目标参数时返回 None
+    """
+    if not is_ad_click_url(url):
+        return None
+    try:
+        params = parse_qs(urlparse(url).query)
+        for param in AD_TARGET_PARAMS:
+            if param in params:
+                return params[param][0]
+    except Exception as e:
+        logger.error(f"处理 Google Ads URL 时出错: {str(e)}")
+    return None
+
+
+class RedirectResolver:
+    """
+    跳转解析器
+
+    所有解析共享同一个带连接池的 requests 会话，resolve_many 在有界线程池中并发解析，
+    结果按输入顺序返回。提供 cache 时先查缓存，命中则不再发送请求；多个市场同时解析
+    同一个链接时只发送一次请求。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = CrawlerConfig.REDIRECT_WORKERS,
+        timeout: float = CrawlerConfig.REDIRECT_TIMEOUT,
+        max_retries: int = CrawlerConfig.REDIRECT_MAX_RETRIES,
+        backoff_factor: float = 0.3,
+        cache: Optional[RedirectCache] = None
+    ):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_workers = max(1, int(max_workers))
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=False,
+            redirect=False,
+            status=False,
+            backoff_factor=backoff_factor
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.verify = False  # 禁用SSL验证
+        self.session.max_redirects = 5
+        self.session.headers.update(MOBILE_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='redirect')
+        self._inflight = SingleFlight()
+
+    def resolve(self, url: str) -> Optional[str]:
+        """
+        获取最终的重定向URL
+
+        Args:
+            url: 广告链接或落地页链接
+
+        Returns:
+            Optional[str]: 最终 URL，请求失败时返回原 URL，url 为空时返回 None
+        """
+        if not url:
+            return None
+
+        # 特殊处理 Google Ads URL，直接解析目标 URL
+        target_url = extract_ad_target(url)
+        if target_url:
+            return self.resolve(target_url)
+
+        # 处理 App Store URLs
+        if 'apps.apple.com' in url:
+            if urlparse(url).scheme == 'itms-apps':
+                return url.replace('itms-apps://', 'https://')
+            return url
+
+        if self.cache is not None:
+            hit, cached_url = self.cache.get(url)
+            if hit:
+                # 失败结果命中时与请求失败的处理一致，返回原 URL
+                return cached_url or url
+
+        return self._inflight.do(normalize_cache_key(url), lambda: self._fetch(url))
+
+    def _fetch(self, url: str) -> str:
+        """请求链接并返回最终 URL，失败时返回原 URL"""
+        try:
+            # 只需要最终 URL：先用 HEAD 跟随跳转，不支持 HEAD（非 200）时改用 GET
+            final_url = self._final_url('HEAD', url) or self._final_url('GET', url)
+            if final_url:
+                if self.cache is not None:
+                    self.cache.set(url, final_url)
+                return final_url
+        except Exception as e:
+            logger.error(f"获取最终URL失败: {url}, 错误: {str(e)}")
+
+        if self.cache is not None:
+            self.cache.set_negative(url)
+        return url
+
+    def _final_url(self, method: str, url: str) -> Optional[str]:
+        """
+        发送请求并跟随跳转，状态码为 200 时返回最终 URL
+
+        响应正文不超过 REDIRECT_DRAIN_BYTES 时读完，连接归还连接池复用；更大的正文不再下载，直接关闭连接
+        """
+        response = self.session.request(method, url, allow_redirects=True, timeout=self.timeout, stream=True)
+        try:
+            drained = 0
+            for chunk in response.iter_content(8192):
+                drained += len(chunk)
+                if drained > CrawlerConfig.REDIRECT_DRAIN_BYTES:
+                    break
+            return response.url if response.status_code == 200 else None
+        finally:
+            response.close()
+
+    def resolve_many(self, urls: Iterable[str]) -> List[Optional[str]]:
+        """
+        并发解析多个链接
+
+        Args:
+            urls: 链接列表
+
+        Returns:
+            List[Optional[str]]: 与输入顺序一致的最终 URL 列表
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+
+        start = time.perf_counter()
+        if len(urls) == 1:
+            final_urls = [self.resolve(urls[0])]
+        else:
+            final_urls = list(self._executor.map(self.resolve, urls))
+        logger.info(f"并发解析 {len(urls)} 个跳转链接耗时 {time.perf_counter() - start:.2f}s")
+        return final_urls
+
+    def close(self) -> None:
+        """关闭线程池、连接池和缓存"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
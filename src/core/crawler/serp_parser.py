@@ -0,0 +1,160 @@
+"""
+搜索结果页快照解析模块：一次性获取页面源码后在进程内解析广告，
+避免逐个元素查询的 WebDriver 往返，并支持对保存的快照重新解析
+"""
+import gzip
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from src.config import CrawlerConfig
+from .extraction import AD_SELECTORS, TITLE_SELECTORS, LINK_SELECTORS, collect_raw_ads
+
+logger = logging.getLogger(__name__)
+
+# 安装了 lxml 时使用更快的 lxml 解析器，否则使用内置解析器
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 页面中相对链接的基准地址
+DEFAULT_BASE_URL = 'https://www.google.com/'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _first_text(ad: Any) -> str:
+    for selector in TITLE_SELECTORS:
+        el = ad.select_one(selector)
+        if el is None:
+            continue
+        text = _WHITESPACE.sub(' ', el.get_text(' ')).strip()
+        if text:
+            return text
+    return ''
+
+
+def _first_href(ad: Any, base_url: str) -> str:
+    for selector in LINK_SELECTORS:
+        el = ad.select_one(selector)
+        href = el.get('href') if el is not None else None
+        if href:
+            # 与浏览器中 element.href 一致，返回绝对地址
+            return urljoin(base_url, href)
+    return ''
+
+
+def parse_serp_html(html: str, base_url: str = DEFAULT_BASE_URL) -> Dict[str, Any]:
+    """
+    解析搜索结果页源码中的广告
+
+    Args:
+        html: 页面源码（driver.page_source 或保存的快照）
+        base_url: 相对链接的基准地址
+
+    Returns:
+        Dict[str, Any]: 与 extract_ads 相同的结构：selector、total、raw_ads、fallback
+    """
+    soup = BeautifulSoup(html or '', HTML_PARSER)
+    for selector in AD_SELECTORS:
+        ads = soup.select(selector)
+        if not ads:
+            continue
+        items = [
+            {'index': index, 'title': _first_text(ad), 'link': _first_href(ad, base_url)}
+            for index, ad in enumerate(ads, 1)
+        ]
+        return {
+            'selector': selector,
+            'total': len(ads),
+            'raw_ads': collect_raw_ads(items),
+            'fallback': False
+        }
+    return {'selector': None, 'total': 0, 'raw_ads': [], 'fallback': False}
+
+
+def snapshot_path(
+    keyword: str,
+    market: str,
+    snapshot_dir: Union[str, Path] = CrawlerConfig.SERP_SNAPSHOT_DIR
+) -> Path:
+    """
+    生成快照文件路径：<snapshot_dir>/<日期>/<市场>_<关键词>_<时间>.html.gz
+
+    Args:
+        keyword: 关键词
+        market: 市场代码
+        snapshot_dir: 快照根目录
+
+    Returns:
+        Path: 快照文件路径
+    """
+    slug = re.sub(r'[^\w\-]+', '_', keyword.strip().lower()).strip('_')[:80] or 'keyword'
+    return Path(snapshot_dir) / time.strftime('%Y%m%d') / f"{market.lower()}_{slug}_{time.strftime('%H%M%S')}.html.gz"
+
+
+def save_serp_snapshot(
+    html: str,
+    keyword: str,
+    market: str,
+    snapshot_dir: Union[str, Path] = CrawlerConfig.SERP_SNAPSHOT_DIR
+) -> Optional[Path]:
+    """
+    压缩保存搜索结果页源码，便于 Google 改版后重新解析
+
+    Args:
+        html: 页面源码
+        keyword: 关键词
+        market: 市场代码
+        snapshot_dir: 快照根目录
+
+    Returns:
+        Optional[Path]: 快照文件路径，保存失败时返回 None
+    """
+    path = snapshot_path(keyword, market, snapshot_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(html)
+        return path
+    except Exception as e:
+        logger.error(f"保存搜索结果页快照失败: {path}, 错误: {str(e)}")
+        return None
+
+
+def load_serp_snapshot(path: Union[str, Path]) -> str:
+    """
+    读取快照文件，支持 .html.gz 和未压缩的 .html
+
+    Args:
+        path: 快照文件路径
+
+    Returns:
+        str: 页面源码
+    """
+    path = Path(path)
+    if path.suffix == '.gz':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    return path.read_text(encoding='utf-8')
+
+
+def parse_serp_snapshot(path: Union[str, Path], base_url: str = DEFAULT_BASE_URL) -> Dict[str, Any]:
+    """
+    重新解析保存的快照文件
+
+    Args:
+        path: 快照文件路径
+        base_url: 相对链接的基准地址
+
+    Returns:
+        Dict[str, Any]: 与 parse_serp_html 相同的结构
+    """
+    return parse_serp_html(load_serp_snapshot(path), base_url)
@@ -0,0 +1,89 @@
+"""
+重复任务合并模块：同一个键同时只执行一次，其他调用方等待并共享结果
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次正在执行的任务"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    重复任务合并
+
+    do(key, fn) 在没有相同 key 的任务执行时调用 fn，否则等待正在执行的任务并返回其结果。
+    remember=True 时保留已完成的结果，之后相同 key 的调用直接返回（适用于一次爬取内
+    的截图等只需要做一次的工作）。
+    """
+
+    def __init__(self, remember: bool = False):
+        self.remember = remember
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        执行或等待任务
+
+        Args:
+            key: 任务键
+            fn: 任务函数
+
+        Returns:
+            Any: 任务结果，任务抛出的异常会传给所有等待方
+        """
+        result, _ = self.do_shared(key, fn)
+        return result
+
+    def do_shared(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行或等待任务，同时返回结果是否来自其他调用方
+
+        Returns:
+            Tuple[Any, bool]: (任务结果, 是否共享了其他调用方的结果)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if owner:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                call.done.set()
+                # 失败的任务不保留，之后可以重试
+                if not self.remember or call.error is not None:
+                    with self._lock:
+                        self._calls.pop(key, None)
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not owner
+
+    def forget(self) -> None:
+        """清空已保留的结果"""
+        with self._lock:
+            self._calls = {key: call for key, call in self._calls.items() if not call.done.is_set()}
+
+    def stats(self) -> Dict[str, int]:
+        """获取执行和共享次数"""
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared}
@@ -0,0 +1,112 @@
+"""
+页面就绪等待模块：用事件驱动的方式等待搜索结果页渲染完成，替代固定的 sleep
+"""
+import time
+import logging
+from typing import Any, NamedTuple
+
+from src.config import CrawlerConfig
+from .extraction import AD_SELECTORS
+
+logger = logging.getLogger(__name__)
+
+# 广告容器选择器
+AD_CONTAINER_SELECTOR = ', '.join(AD_SELECTORS)
+
+# 自然搜索结果已渲染的标记，出现后仍没有广告容器即视为“无广告”
+RESULTS_MARKER_SELECTOR = '#rso, #botstuff'
+
+# 被 Google 拦截（验证码页面）的标记
+BLOCKED_MARKER_SELECTOR = '#captcha-form, form[action*="sorry"]'
+
+# 在页面中安装 MutationObserver 并返回当前页面状态，每次轮询只需一次 WebDriver 调用
+_PROBE_SCRIPT = '''
+if (!window.__ggkwObserver && document.documentElement) {
+    window.__ggkwLastMutation = performance.now();
+    window.__ggkwObserver = new MutationObserver(function() {
+        window.__ggkwLastMutation = performance.now();
+    });
+    window.__ggkwObserver.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+var last = window.__ggkwLastMutation || performance.now();
+return {
+    ads: document.querySelectorAll(arguments[0]).length,
+    results: !!document.querySelector(arguments[1]),
+    blocked: !!document.querySelector(arguments[2]) || location.pathname.indexOf('/sorry/') === 0,
+    ready: document.readyState,
+    quiet: (performance.now() - last) / 1000
+};
+'''
+
+
+class SerpReadiness(NamedTuple):
+    """搜索结果页就绪状态"""
+    state: str      # ads / no_ads / quiet / blocked / timeout
+    waited: float   # 实际等待时间（秒）
+    ads: int        # 检测到的广告容器数量
+
+
+# 搜索结果页完整渲染的状态（出现广告或确认无广告），其他状态下看到的广告可能不完整
+SERP_READY_STATES = ('ads', 'no_ads')
+
+
+def wait_for_serp_ready(
+    driver: Any,
+    timeout: float = CrawlerConfig.SERP_WAIT_TIMEOUT,
+    quiet_period: float = CrawlerConfig.SERP_QUIET_PERIOD,
+    poll_interval: float = CrawlerConfig.SERP_POLL_INTERVAL
+) -> SerpReadiness:
+    """
+    等待搜索结果页就绪
+
+    满足以下任一条件即返回：
+    - 文档解析完成且出现了广告容器
+    - 文档解析完成、自然结果已渲染且 DOM 在 quiet_period 内没有变化（无广告）
+    - 页面加载完成且 DOM 在 quiet_period 内没有变化
+    - 出现验证码拦截页面
+    - 等待时间达到 timeout
+
+    Args:
+        driver: 浏览器驱动实例
+        timeout: 最长等待时间（秒）
+        quiet_period: DOM 静默多久视为渲染完成（秒）
+        poll_interval: 轮询间隔（秒）
+
+    Returns:
+        SerpReadiness: 就绪状态、实际等待时间和广告数量
+    """
+    start = time.monotonic()
+    ads = 0
+
+    while True:
+        waited = time.monotonic() - start
+        try:
+            probe = driver.execute_script(
+                _PROBE_SCRIPT,
+                AD_CONTAINER_SELECTOR,
+                RESULTS_MARKER_SELECTOR,
+                BLOCKED_MARKER_SELECTOR
+            ) or {}
+        except Exception as e:
+            # 页面仍在跳转时脚本可能执行失败，继续轮询
+            logger.debug(f"页面状态检测失败: {str(e)}")
+            probe = {}
+
+        ads = probe.get('ads', 0) or 0
+        parsed = probe.get('ready') in ('interactive', 'complete')
+        quiet = (probe.get('quiet') or 0) >= quiet_period
+
+        if probe.get('blocked'):
+            return SerpReadiness('blocked', waited, ads)
+        if parsed and ads:
+            return SerpReadiness('ads', waited, ads)
+        if parsed and quiet and probe.get('results'):
+            return SerpReadiness('no_ads', waited, ads)
+        if probe.get('ready') == 'complete' and quiet:
+            return SerpReadiness('quiet', waited, ads)
+        if waited >= timeout:
+            return SerpReadiness('timeout', waited, ads)
+
+        time.sleep(min(poll_interval, max(timeout - waited, 0)))
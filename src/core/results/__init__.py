@@ -0,0 +1,35 @@
+"""
+结果处理模块
+"""
+from .store import ResultStore, get_result_store
+from .index import DomainIndex
+from .committer import ResultsCommitter, get_results_committer
+from .deduplication import deduplicate_keyword_records, deduplicate_results, merge_and_deduplicate
+from .serialization import ResultsWriter, dump_results, iter_results, load_results
+from .analytics import KeywordRecordExporter
+from .archive import KeywordArchive
+from .diff import CrawlDiff
+from .browse import browse_results
+from .cache import PayloadCache
+from .search import search_pages
+
+__all__ = [
+    'ResultStore',
+    'get_result_store',
+    'DomainIndex',
+    'ResultsCommitter',
+    'get_results_committer',
+    'deduplicate_keyword_records',
+    'deduplicate_results',
+    'merge_and_deduplicate',
+    'ResultsWriter',
+    'dump_results',
+    'iter_results',
+    'load_results',
+    'KeywordRecordExporter',
+    'KeywordArchive',
+    'CrawlDiff',
+    'browse_results',
+    'PayloadCache',
+    'search_pages'
+]
@@ -0,0 +1,267 @@
+"""
+分析导出模块：把关键词记录展开为 (timestamp, market, keyword, title, domain) 并写入列式文件，
+字符串列按字典编码，时间列为 datetime64[us]；重复导出时只追加上次导出之后提交的记录
+"""
+import os
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.config import StorageConfig
+from .serialization import FORMAT_JSON, atomic_write, dump_results, load_results
+from .store import ResultStore
+
+try:
+    import numpy as np
+except ImportError:  # 没有安装 numpy 时不能导出
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 没有安装 pyarrow 时使用 NumPy 格式
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('timestamp', 'market', 'keyword', 'title', 'domain')
+STRING_COLUMNS = COLUMNS[1:]
+
+FORMAT_PARQUET = 'parquet'
+FORMAT_NPZ = 'npz'
+FORMAT_AUTO = 'auto'
+
+MANIFEST_FILE = '_manifest.json'
+
+
+def resolve_format(fmt: str = StorageConfig.ANALYTICS_EXPORT_FORMAT) -> str:
+    """选择导出格式：auto 时安装了 pyarrow 用 parquet，否则用 npz"""
+    if fmt == FORMAT_AUTO:
+        return FORMAT_PARQUET if pa is not None else FORMAT_NPZ
+    if fmt == FORMAT_PARQUET and pa is None:
+        raise RuntimeError('Parquet 格式需要安装 pyarrow')
+    if fmt not in (FORMAT_PARQUET, FORMAT_NPZ):
+        raise ValueError(f'未知的导出格式: {fmt}')
+    return fmt
+
+
+def dictionary_encode(values: Sequence[Optional[str]]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    字典编码：返回 (int32 编码, 按首次出现顺序排列的取值)，None 编码为空字符串
+
+    Args:
+        values: 字符串列
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (codes, dictionary)
+    """
+    mapping: Dict[str, int] = {}
+    codes = np.fromiter(
+        (mapping.setdefault(value or '', len(mapping)) for value in values),
+        dtype=np.int32,
+        count=len(values)
+    )
+    dictionary = np.array(list(mapping), dtype=str) if mapping else np.array([], dtype=str)
+    return codes, dictionary
+
+
+def parse_timestamps(values: Sequence[Optional[str]]) -> 'np.ndarray':
+    """把 ISO 格式的时间字符串转换为 datetime64[us]，无法解析的值为 NaT"""
+    cleaned = [value or 'NaT' for value in values]
+    try:
+        return np.array(cleaned, dtype='datetime64[us]')
+    except ValueError:
+        parsed = np.empty(len(cleaned), dtype='datetime64[us]')
+        for i, value in enumerate(cleaned):
+            try:
+                parsed[i] = np.datetime64(value[:26], 'us')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+
+class KeywordRecordExporter:
+    """
+    关键词记录列式导出
+
+    导出目录中每次导出追加一个或多个分片文件（part-00001.parquet / .npz），
+    _manifest.json 记录分片列表和水位线（已导出记录的最大提交序号 updated_seq，见
+    ResultStore.iter_keyword_rows）。修改过的关键词记录会再次导出。
+    分片先写入，再原子更新清单，中途失败时未记入清单的分片会被忽略并在下次导出时覆盖。
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        out_dir: Union[str, Path] = StorageConfig.ANALYTICS_EXPORT_DIR,
+        fmt: str = StorageConfig.ANALYTICS_EXPORT_FORMAT,
+        part_rows: int = StorageConfig.ANALYTICS_PART_ROWS
+    ):
+        """
+        Args:
+            store: 结果存储
+            out_dir: 导出目录
+            fmt: 导出格式，parquet / npz / auto
+            part_rows: 每个分片文件最多的行数
+        """
+        if np is None:
+            raise RuntimeError('分析导出需要安装 numpy')
+        self.store = store
+        self.out_dir = Path(out_dir)
+        self.fmt = resolve_format(fmt)
+        self.part_rows = max(1, int(part_rows))
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.out_dir / MANIFEST_FILE
+
+    def manifest(self) -> Dict[str, Any]:
+        """读取导出清单，没有导出过时返回空清单"""
+        try:
+            return load_results(self.manifest_path)
+        except FileNotFoundError:
+            return {'format': self.fmt, 'watermark': None, 'rows': 0, 'parts': []}
+
+    def export(self, full: bool = False) -> Dict[str, Any]:
+        """
+        导出上次水位线之后的关键词记录
+
+        Args:
+            full: 是否删除已有分片并重新导出全部记录
+
+        Returns:
+            Dict[str, Any]: 本次导出的行数、分片、耗时和新的水位线
+        """
+        start = time.perf_counter()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self.manifest()
+        if manifest.get('watermark') is not None and not isinstance(manifest['watermark'], int):
+            # 旧版本的清单以 timestamp 为水位线，无法换算为提交序号
+            logger.info("导出清单使用旧的时间水位线，重新导出全部记录")
+            full = True
+        if full or manifest.get('format') != self.fmt:
+            if not full:
+                logger.info(f"导出格式由 {manifest.get('format')} 改为 {self.fmt}，重新导出全部记录")
+            self._remove_parts(manifest)
+            manifest = {'format': self.fmt, 'watermark': None, 'rows': 0, 'parts': []}
+
+        since = manifest['watermark']
+        new_parts = []
+        rows_exported = 0
+        for rows in self._chunks(self.store.iter_keyword_rows(after_seq=since)):
+            part = self._write_part(rows, len(manifest['parts']) + 1)
+            manifest['parts'].append(part)
+            manifest['rows'] += part['rows']
+            manifest['watermark'] = part['max_seq']
+            # 每个分片写完后更新清单，中途失败时已完成的分片仍然有效
+            dump_results(manifest, self.manifest_path, fmt=FORMAT_JSON)
+            new_parts.append(part['file'])
+            rows_exported += part['rows']
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"关键词记录导出: {rows_exported} 行, {len(new_parts)} 个分片, 共 {manifest['rows']} 行, "
+            f"水位线 {manifest['watermark']}, 耗时 {elapsed:.2f}s"
+        )
+        return {
+            'rows': rows_exported,
+            'parts': new_parts,
+            'total_rows': manifest['rows'],
+            'watermark': manifest['watermark'],
+            'previous_watermark': since,
+            'format': self.fmt,
+            'path': str(self.out_dir),
+            'elapsed': round(elapsed, 3)
+        }
+
+    def _chunks(self, rows: Iterable[tuple]) -> Iterator[List[tuple]]:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.part_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _remove_parts(self, manifest: Dict[str, Any]) -> None:
+        for part in manifest.get('parts', []):
+            try:
+                os.unlink(self.out_dir / part['file'])
+            except FileNotFoundError:
+                pass
+
+    def _write_part(self, rows: List[tuple], number: int) -> Dict[str, Any]:
+        # 行按提交序号递增排列，最后一列为提交序号
+        columns = list(zip(*rows))[:len(COLUMNS)]
+        timestamps = [value for value in columns[0] if value]
+        encoded = {name: dictionary_encode(values) for name, values in zip(STRING_COLUMNS, columns[1:])}
+        ts = parse_timestamps(columns[0])
+
+        filename = f'part-{number:05d}.{self.fmt}'
+        path = self.out_dir / filename
+        if self.fmt == FORMAT_PARQUET:
+            arrays = {'timestamp': pa.array(ts, type=pa.timestamp('us'))}
+            for name, (codes, dictionary) in encoded.items():
+                arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(dictionary, type=pa.string()))
+            sink = pa.BufferOutputStream()
+            pq.write_table(pa.table(arrays), sink)
+            atomic_write(path, sink.getvalue().to_pybytes())
+        else:
+            arrays = {'timestamp': ts}
+            for name, (codes, dictionary) in encoded.items():
+                arrays[f'{name}_codes'] = codes
+                arrays[f'{name}_dictionary'] = dictionary
+            tmp_path = path.with_name(f'.{filename}.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+        return {
+            'file': filename,
+            'rows': len(rows),
+            'min_timestamp': min(timestamps) if timestamps else None,
+            'max_timestamp': max(timestamps) if timestamps else None,
+            'max_seq': rows[-1][-1]
+        }
+
+    def read(self):
+        """
+        读取所有分片为 pandas DataFrame（字符串列为 category 类型）
+
+        Returns:
+            pandas.DataFrame: 列为 COLUMNS
+        """
+        import pandas as pd
+        from pandas.api.types import union_categoricals
+
+        manifest = self.manifest()
+        files = [self.out_dir / part['file'] for part in manifest['parts']]
+        if not files:
+            return pd.DataFrame({
+                'timestamp': pd.Series([], dtype='datetime64[us]'),
+                **{name: pd.Categorical([]) for name in STRING_COLUMNS}
+            })
+
+        if manifest['format'] == FORMAT_PARQUET:
+            if pq is None:
+                raise RuntimeError('读取 Parquet 格式需要安装 pyarrow')
+            return pd.concat([pq.read_table(path).to_pandas() for path in files], ignore_index=True)
+
+        timestamps = []
+        categoricals: Dict[str, list] = {name: [] for name in STRING_COLUMNS}
+        for path in files:
+            with np.load(path, allow_pickle=False) as data:
+                timestamps.append(data['timestamp'])
+                for name in STRING_COLUMNS:
+                    categoricals[name].append(
+                        pd.Categorical.from_codes(data[f'{name}_codes'], categories=data[f'{name}_dictionary'])
+                    )
+        return pd.DataFrame({
+            'timestamp': np.concatenate(timestamps),
+            **{name: union_categoricals(values) for name, values in categoricals.items()}
+        })
@@ -0,0 +1,233 @@
+"""
+关键词记录归档模块：早于保留期的关键词记录移入按月分表的归档（keyword_archive_YYYY_MM），
+落地页记录只保留近期的关键词记录和归档汇总，查询历史时按需读取归档
+"""
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import StorageConfig
+from .store import KEYWORD_FIELDS, ResultStore, _join
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLE_PREFIX = 'keyword_archive_'
+
+# 落地页记录中的归档汇总字段
+SUMMARY_FIELD = 'keyword_archive'
+
+# 在事务中逐条执行（executescript 会先提交当前事务）
+_ARCHIVE_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        page_id INTEGER,
+        domain TEXT,
+        keyword TEXT,
+        market TEXT,
+        title TEXT,
+        timestamp TEXT,
+        extra TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_{table}_domain ON {table}(domain, timestamp)',
+)
+
+_MONTH_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+
+def archive_table(month: str) -> str:
+    """
+    月份对应的归档表名
+
+    Args:
+        month: YYYY-MM
+
+    Returns:
+        str: keyword_archive_YYYY_MM
+    """
+    if not _MONTH_PATTERN.match(month or ''):
+        raise ValueError(f'无效的归档月份: {month}')
+    return ARCHIVE_TABLE_PREFIX + month.replace('-', '_')
+
+
+class KeywordArchive:
+    """
+    关键词记录归档
+
+    - archive() 把 timestamp 早于保留期的关键词记录按月移入归档表，并在落地页记录的
+      keyword_archive 字段中累计归档数量、最早/最晚时间和月份
+    - iter_records() / history() 只在需要历史时读取，按月份从新到旧逐表读取
+
+    归档会改写落地页记录，应在爬取结束、DomainIndex 写回之后执行。
+    """
+
+    def __init__(self, store: ResultStore, hot_days: int = StorageConfig.KEYWORD_HOT_DAYS):
+        """
+        Args:
+            store: 结果存储
+            hot_days: 落地页记录中保留多少天内的关键词记录
+        """
+        self.store = store
+        self.hot_days = hot_days
+
+    def horizon(self, now: Optional[datetime] = None) -> str:
+        """保留期的起点（ISO 格式），早于该时间的关键词记录会被归档"""
+        return ((now or datetime.now()) - timedelta(days=self.hot_days)).isoformat()
+
+    def months(self) -> List[str]:
+        """已有的归档月份（YYYY-MM，从旧到新）"""
+        rows = self.store.query(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+            (ARCHIVE_TABLE_PREFIX + '%',)
+        )
+        months = []
+        for (name,) in rows:
+            month = name[len(ARCHIVE_TABLE_PREFIX):].replace('_', '-')
+            if _MONTH_PATTERN.match(month):
+                months.append(month)
+        return sorted(months)
+
+    def archive(self, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        归档 timestamp 早于 before 的关键词记录
+
+        Args:
+            before: ISO 格式的时间，默认为 horizon()
+
+        Returns:
+            Dict[str, Any]: 归档的记录数、涉及的落地页数和月份
+        """
+        before = before or self.horizon()
+        summaries: Dict[int, Dict[str, Any]] = {}
+        rows_by_month: Dict[str, List[tuple]] = {}
+
+        with self.store.transaction() as conn:
+            for row in conn.execute(
+                'SELECT k.page_id, p.domain, k.keyword, k.market, k.title, k.timestamp, k.extra '
+                'FROM keyword_records k JOIN landing_pages p ON p.id = k.page_id '
+                "WHERE k.timestamp < ? AND k.timestamp != '' ORDER BY k.timestamp",
+                (before,)
+            ):
+                page_id, timestamp = row[0], row[5]
+                month = timestamp[:7]
+                if not _MONTH_PATTERN.match(month):
+                    continue
+                rows_by_month.setdefault(month, []).append(row)
+
+                summary = summaries.setdefault(page_id, {'count': 0, 'first': timestamp, 'last': timestamp, 'months': set()})
+                summary['count'] += 1
+                summary['first'] = min(summary['first'], timestamp)
+                summary['last'] = max(summary['last'], timestamp)
+                summary['months'].add(month)
+
+            if not rows_by_month:
+                return {'rows': 0, 'pages': 0, 'months': [], 'before': before}
+
+            for month, rows in rows_by_month.items():
+                table = archive_table(month)
+                for statement in _ARCHIVE_SCHEMA:
+                    conn.execute(statement.format(table=table))
+                conn.executemany(
+                    f'INSERT INTO {table} (page_id, domain, keyword, market, title, timestamp, extra) '
+                    f'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+            conn.execute(
+                "DELETE FROM keyword_records WHERE timestamp < ? AND timestamp != '' AND substr(timestamp, 1, 7) IN "
+                f"({','.join('?' * len(rows_by_month))})",
+                (before, *rows_by_month)
+            )
+
+            # 在落地页记录中累计归档汇总
+            for page_id, summary in summaries.items():
+                record = self.store.get(page_id)
+                if record is None:
+                    continue
+                existing = record.get(SUMMARY_FIELD) or {}
+                record[SUMMARY_FIELD] = {
+                    'count': existing.get('count', 0) + summary['count'],
+                    'first_timestamp': min(filter(None, [existing.get('first_timestamp'), summary['first']])),
+                    'last_timestamp': max(filter(None, [existing.get('last_timestamp'), summary['last']])),
+                    'months': sorted(set(existing.get('months', [])) | summary['months'])
+                }
+                self.store.update(page_id, record)
+
+        total = sum(len(rows) for rows in rows_by_month.values())
+        months = sorted(rows_by_month)
+        logger.info(f"已归档 {total} 条关键词记录 ({len(summaries)} 个落地页, 月份 {', '.join(months)})")
+        return {'rows': total, 'pages': len(summaries), 'months': months, 'before': before}
+
+    def iter_records(
+        self,
+        domain: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        按时间从新到旧读取归档的关键词记录，只读取时间范围内的月份表
+
+        Args:
+            domain: 只读取该域名的记录
+            since: 只读取 timestamp 不早于该值的记录
+            until: 只读取 timestamp 早于该值的记录
+
+        Returns:
+            Iterator[Dict[str, Any]]: 关键词记录（附带 domain 字段）
+        """
+        for month in reversed(self.months()):
+            if since and month < since[:7]:
+                break
+            if until and month > until[:7]:
+                continue
+            conditions, params = [], []
+            if domain is not None:
+                conditions.append('domain = ?')
+                params.append(domain)
+            if since:
+                conditions.append('timestamp >= ?')
+                params.append(since)
+            if until:
+                conditions.append('timestamp < ?')
+                params.append(until)
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+            rows = self.store.query(
+                f'SELECT domain, keyword, market, title, timestamp, extra FROM {archive_table(month)} '
+                f'{where}ORDER BY timestamp DESC, id DESC',
+                params
+            )
+            for row_domain, keyword, market, title, timestamp, extra in rows:
+                record = _join(KEYWORD_FIELDS, (keyword, market, title, timestamp), extra)
+                record['domain'] = row_domain
+                yield record
+
+    def history(
+        self,
+        domain: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        域名的完整关键词记录历史：落地页记录中的近期记录加上归档记录，按时间倒序
+
+        Args:
+            domain: 域名
+            since: 只返回 timestamp 不早于该值的记录
+            until: 只返回 timestamp 早于该值的记录
+
+        Returns:
+            List[Dict[str, Any]]: 关键词记录（附带 domain 字段，归档记录带 archived=True）
+        """
+        records = []
+        for _, record in self.store.find('domain', domain):
+            for keyword_record in record.get('keyword_records', []):
+                timestamp = keyword_record.get('timestamp') or ''
+                if (since and timestamp < since) or (until and timestamp >= until):
+                    continue
+                records.append(dict(keyword_record, domain=domain))
+        for keyword_record in self.iter_records(domain, since, until):
+            keyword_record['archived'] = True
+            records.append(keyword_record)
+        records.sort(key=lambda r: r.get('timestamp') or '', reverse=True)
+        return records
@@ -0,0 +1,163 @@
+"""
+结果浏览模块：按市场、关键词、文本、时间范围筛选落地页，排序后按游标分页返回，
+筛选和排序在数据库中完成，每次只读取一页记录
+"""
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import StorageConfig
+from .search import build_match_query
+from .store import KEYWORD_FIELDS, PAGE_FIELDS, ResultStore, _join
+
+logger = logging.getLogger(__name__)
+
+SORT_LATEST = 'latest'  # 按落地页时间（最近一次看到该广告的时间）倒序
+SORT_OLDEST = 'oldest'  # 按落地页时间正序
+SORT_DOMAIN = 'domain'  # 按域名正序
+SORTS = (SORT_LATEST, SORT_OLDEST, SORT_DOMAIN)
+
+# 排序值表达式和方向（id 作为相同排序值时的次序），表达式与 store._SCHEMA 中的表达式索引一致
+_SORT_KEYS = {
+    SORT_LATEST: ("COALESCE(p.timestamp, '')", 'DESC'),
+    SORT_OLDEST: ("COALESCE(p.timestamp, '')", 'ASC'),
+    SORT_DOMAIN: ("COALESCE(p.domain, '')", 'ASC'),
+}
+
+_PAGE_COLUMNS = 'id, ' + ', '.join(PAGE_FIELDS) + ', extra'
+
+
+def encode_cursor(sort_value: str, page_id: int) -> str:
+    """把上一页最后一条记录的 (排序值, id) 编码为游标"""
+    raw = json.dumps([sort_value, page_id], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """解析游标，无效时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, page_id = json.loads(raw.decode('utf-8'))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError(f'无效的分页游标: {cursor}')
+    if not isinstance(sort_value, str) or not isinstance(page_id, int):
+        raise ValueError(f'无效的分页游标: {cursor}')
+    return sort_value, page_id
+
+
+def browse_results(
+    store: ResultStore,
+    market: Optional[str] = None,
+    keyword: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    sort: str = SORT_LATEST,
+    cursor: Optional[str] = None,
+    limit: int = StorageConfig.BROWSE_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    按条件分页查询落地页记录
+
+    查询从落地页出发，没有关键词记录（如已归档）的落地页也会返回。指定市场、关键词或时间范围时，
+    落地页至少有一条匹配的关键词记录才会返回，返回的记录中 keyword_records 只包含匹配的关键词记录。
+
+    Args:
+        store: 结果存储
+        market: 市场代码
+        keyword: 关键词（精确匹配）
+        q: 文本，通过搜索索引匹配域名、关键词和标题（所有词都需匹配，英文按前缀，见 search.build_match_query）
+        since: 只匹配 timestamp 不早于该值的关键词记录
+        until: 只匹配 timestamp 早于该值的关键词记录
+        sort: 排序方式，见 SORTS
+        cursor: 上一页返回的 next_cursor，为 None 时返回第一页
+        limit: 每页的落地页数，不超过 StorageConfig.BROWSE_MAX_PAGE_SIZE
+
+    Returns:
+        Dict[str, Any]: results（本页记录）、next_cursor（没有下一页时为 None），
+        第一页还包含 total（匹配的落地页数）、markets（所有市场）和 last_updated（最新的关键词记录时间）
+    """
+    if sort not in SORTS:
+        raise ValueError(f'未知的排序方式: {sort}')
+    limit = max(1, min(int(limit), StorageConfig.BROWSE_MAX_PAGE_SIZE))
+
+    # 关键词记录的筛选条件
+    record_conditions, record_params = [], []
+    if market:
+        record_conditions.append('k.market = ?')
+        record_params.append(market)
+    if keyword:
+        record_conditions.append('k.keyword = ?')
+        record_params.append(keyword)
+    if since:
+        record_conditions.append('k.timestamp >= ?')
+        record_params.append(since)
+    if until:
+        record_conditions.append('k.timestamp < ?')
+        record_params.append(until)
+
+    # 落地页的筛选条件：只有指定了关键词记录的条件时才查询关键词记录
+    conditions, params = [], []
+    if record_conditions:
+        conditions.append(
+            'EXISTS (SELECT 1 FROM keyword_records k WHERE k.page_id = p.id AND '
+            f"{' AND '.join(record_conditions)})"
+        )
+        params.extend(record_params)
+    match_query = build_match_query(q) if q else None
+    if match_query is not None:
+        conditions.append('p.id IN (SELECT rowid FROM search_index WHERE search_index MATCH ?)')
+        params.append(match_query)
+
+    sort_expr, direction = _SORT_KEYS[sort]
+    page_conditions, page_params = list(conditions), list(params)
+    if cursor:
+        sort_value, page_id = decode_cursor(cursor)
+        op = '<' if direction == 'DESC' else '>'
+        page_conditions.append(f'({sort_expr} {op} ? OR ({sort_expr} = ? AND p.id {op} ?))')
+        page_params.extend([sort_value, sort_value, page_id])
+    where = f"WHERE {' AND '.join(page_conditions)} " if page_conditions else ''
+
+    rows = store.query(
+        f'SELECT p.id, {sort_expr} AS sort_value FROM landing_pages p {where}'
+        f'ORDER BY sort_value {direction}, p.id {direction} LIMIT ?',
+        page_params + [limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    page_ids = [row[0] for row in rows]
+
+    results = []
+    if page_ids:
+        placeholders = ','.join('?' * len(page_ids))
+        keyword_records: Dict[int, List[Dict[str, Any]]] = {page_id: [] for page_id in page_ids}
+        for page_id, *values, extra in store.query(
+            'SELECT k.page_id, k.keyword, k.market, k.title, k.timestamp, k.extra FROM keyword_records k '
+            f"WHERE {' AND '.join([f'k.page_id IN ({placeholders})'] + record_conditions)} "
+            'ORDER BY k.page_id, k.seq',
+            page_ids + record_params
+        ):
+            keyword_records[page_id].append(_join(KEYWORD_FIELDS, values, extra))
+
+        pages = {}
+        for page_id, *values, extra in store.query(
+            f'SELECT {_PAGE_COLUMNS} FROM landing_pages WHERE id IN ({placeholders})', page_ids
+        ):
+            record = _join(PAGE_FIELDS, values, extra)
+            record['keyword_records'] = keyword_records[page_id]
+            pages[page_id] = record
+        results = [pages[page_id] for page_id in page_ids if page_id in pages]
+
+    response: Dict[str, Any] = {
+        'results': results,
+        'next_cursor': encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None,
+    }
+    if not cursor:
+        count_where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+        response['total'] = store.query(f'SELECT COUNT(*) FROM landing_pages p {count_where}', params)[0][0]
+        response['markets'] = sorted(
+            row[0] for row in store.query('SELECT DISTINCT market FROM keyword_records') if row[0]
+        )
+        response['last_updated'] = store.query('SELECT MAX(timestamp) FROM keyword_records')[0][0]
+    return response
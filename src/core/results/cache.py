@@ -0,0 +1,153 @@
+"""
+响应缓存模块：按查询参数缓存序列化后的结果，结果存储的版本变化时失效；
+每个版本只序列化一次，gzip / brotli 压缩在第一次被请求时生成并缓存
+"""
+import gzip
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+from src.config import StorageConfig
+from .serialization import FORMAT_COMPACT, encode
+
+try:
+    import brotli
+except ImportError:  # 没有安装 brotli 时只支持 gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_IDENTITY = 'identity'
+ENCODING_GZIP = 'gzip'
+ENCODING_BROTLI = 'br'
+
+
+def supported_encodings() -> Sequence[str]:
+    """可用的压缩编码，按优先级排列"""
+    if brotli is not None:
+        return (ENCODING_BROTLI, ENCODING_GZIP)
+    return (ENCODING_GZIP,)
+
+
+class CachedPayload:
+    """一个版本的序列化结果及其压缩版本"""
+
+    def __init__(self, version: str, key: Hashable, body: bytes, min_compress_size: int):
+        self.version = version
+        self.body = body
+        digest = hashlib.sha1(repr((version, key)).encode('utf-8')).hexdigest()[:16]
+        # 弱 ETag：内容相同的各压缩版本共用
+        self.etag = f'{version}-{digest}'
+        self.min_compress_size = min_compress_size
+        self._encoded: Dict[str, bytes] = {ENCODING_IDENTITY: body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        """
+        指定编码的内容，第一次请求时压缩并缓存
+
+        Args:
+            encoding: identity / gzip / br
+        """
+        with self._lock:
+            content = self._encoded.get(encoding)
+            if content is None:
+                if encoding == ENCODING_GZIP:
+                    content = gzip.compress(self.body, compresslevel=6, mtime=0)
+                elif encoding == ENCODING_BROTLI and brotli is not None:
+                    content = brotli.compress(self.body, quality=5)
+                else:
+                    raise ValueError(f'不支持的压缩编码: {encoding}')
+                self._encoded[encoding] = content
+            return content
+
+    def choose_encoding(self, accepted: Callable[[str], bool]) -> str:
+        """
+        选择压缩编码
+
+        Args:
+            accepted: 判断客户端是否接受某个编码
+
+        Returns:
+            str: 内容太小或客户端不接受压缩时为 identity
+        """
+        if len(self.body) >= self.min_compress_size:
+            for encoding in supported_encodings():
+                if accepted(encoding):
+                    return encoding
+        return ENCODING_IDENTITY
+
+
+class PayloadCache:
+    """
+    按 key 缓存序列化后的结果，最多保留 max_entries 个（最近最少使用的先淘汰）
+
+    用法:
+        payload = cache.get(key, store.version(), lambda: build_response())
+    """
+
+    def __init__(
+        self,
+        max_entries: int = StorageConfig.BROWSE_CACHE_ENTRIES,
+        min_compress_size: int = StorageConfig.BROWSE_COMPRESS_MIN_SIZE
+    ):
+        """
+        Args:
+            max_entries: 最多缓存的条目数
+            min_compress_size: 超过该字节数的内容才压缩
+        """
+        self.max_entries = max(1, max_entries)
+        self.min_compress_size = min_compress_size
+        self._entries: 'OrderedDict[Hashable, CachedPayload]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: str, build: Callable[[], Any]) -> CachedPayload:
+        """
+        获取缓存的结果，版本不一致或没有缓存时调用 build() 生成并序列化
+
+        Args:
+            key: 缓存键（如规范化后的查询参数）
+            version: 数据版本，见 ResultStore.version()
+            build: 生成结果数据的函数，异常会直接抛出且不缓存
+
+        Returns:
+            CachedPayload: 序列化后的结果
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None and payload.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            self.misses += 1
+
+        # 在锁外生成，生成期间不阻塞其他查询
+        payload = CachedPayload(version, key, encode(build(), FORMAT_COMPACT), self.min_compress_size)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current.version != version:
+                self._entries[key] = payload
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """命中次数、未命中次数和缓存条目数"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / total if total else None
+            }
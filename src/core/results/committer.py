@@ -0,0 +1,294 @@
+"""
+结果写入模块：所有爬取线程的修改通过队列交给单独的写入线程，按批次在一个事务中提交
+"""
+import atexit
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from src.config import StorageConfig
+from .store import ResultStore, get_result_store
+
+logger = logging.getLogger(__name__)
+
+# 修改类型
+OP_UPSERT = 'upsert'              # 按 original_url 新增或合并落地页记录
+OP_ADD_KEYWORD = 'add_keyword'    # 为域名记录添加关键词记录
+OP_SET_SCREENSHOT = 'screenshot'  # 更新主机名下所有记录的截图
+OP_REPLACE = 'replace'            # 用记录整体替换
+OP_FLUSH = 'flush'                # 提交之前的所有修改后通知等待方
+
+_STOP = object()
+
+
+class Mutation(NamedTuple):
+    """一次修改"""
+    op: str
+    args: Tuple[Any, ...]
+    enqueued_at: float
+    done: Optional[threading.Event] = None
+
+
+def merge_keyword_records(record: Dict[str, Any], keyword_records: List[Dict[str, Any]]) -> bool:
+    """
+    追加记录中还没有的关键词记录（按关键词、标题、市场判断，没有市场的旧记录与任意市场相同）
+
+    Returns:
+        bool: 是否追加了记录
+    """
+    existing_keys = {
+        (r.get('keyword'), r.get('title'), r.get('market')) for r in record.get('keyword_records', [])
+    }
+    added = False
+    for keyword_record in keyword_records:
+        key = (keyword_record.get('keyword'), keyword_record.get('title'), keyword_record.get('market'))
+        if key in existing_keys or (key[0], key[1], None) in existing_keys:
+            continue
+        existing_keys.add(key)
+        record.setdefault('keyword_records', []).append(keyword_record)
+        added = True
+    return added
+
+
+class ResultsCommitter:
+    """
+    结果写入线程
+
+    upsert / add_keyword_record / set_screenshot / replace 只把修改放入队列并立即返回。
+    写入线程收到第一条修改后，最多等待 max_delay 秒或攒满 batch_size 条，
+    然后在一个事务中提交整批修改（每条修改在单独的保存点中执行，失败的修改整条撤销）。
+    flush() 等待之前放入的修改全部提交。
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        batch_size: int = StorageConfig.COMMIT_BATCH_SIZE,
+        max_delay: float = StorageConfig.COMMIT_MAX_DELAY,
+        queue_size: int = StorageConfig.COMMIT_QUEUE_SIZE,
+        name: str = 'results'
+    ):
+        """
+        Args:
+            store: 结果存储
+            batch_size: 每批最多提交的修改数
+            max_delay: 修改最多等待多久提交(秒)
+            queue_size: 队列容量，满时提交方阻塞
+            name: 名称，用于线程名和日志
+        """
+        self.store = store
+        self.batch_size = max(1, int(batch_size))
+        self.max_delay = max_delay
+        self.name = name
+        self._queue: 'queue.Queue[Any]' = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._stats = {
+            'events': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_batch_size': 0,
+            'latency_total': 0.0,
+            'max_latency': 0.0,
+            'commit_time_total': 0.0,
+        }
+
+    # ---------- 提交方 ----------
+
+    def start(self) -> 'ResultsCommitter':
+        """启动写入线程（重复调用无副作用）"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f'{self.name}-committer', daemon=True)
+                self._thread.start()
+        return self
+
+    def _submit(self, op: str, *args: Any, done: Optional[threading.Event] = None) -> None:
+        self.start()
+        self._queue.put(Mutation(op, args, time.monotonic(), done))
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """按 original_url 新增记录；已存在时更新截图和 final_url，并追加新的关键词记录"""
+        self._submit(OP_UPSERT, record)
+
+    def add_keyword_record(self, domain: str, keyword_record: Dict[str, Any]) -> None:
+        """为域名记录添加关键词记录（规则见 ResultStore.add_keyword_record）"""
+        self._submit(OP_ADD_KEYWORD, domain, keyword_record)
+
+    def set_screenshot(self, host: str, screenshot_path: str) -> None:
+        """更新主机名下所有记录的截图"""
+        self._submit(OP_SET_SCREENSHOT, host, screenshot_path)
+
+    def replace(self, page_id: int, record: Dict[str, Any]) -> None:
+        """用 record 整体替换指定记录"""
+        self._submit(OP_REPLACE, page_id, record)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待之前放入的修改全部提交
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        done = threading.Event()
+        self._submit(OP_FLUSH, done=done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """提交剩余的修改并停止写入线程"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self.log_stats()
+
+    # ---------- 写入线程 ----------
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            # flush 标记到达时立即提交
+            while item.op != OP_FLUSH and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Mutation]) -> None:
+        mutations = [m for m in batch if m.op != OP_FLUSH]
+        start = time.perf_counter()
+        errors = 0
+        if mutations:
+            try:
+                with self.store.transaction():
+                    for mutation in self._coalesce(mutations):
+                        try:
+                            # 每条修改使用保存点，失败时撤销该修改已执行的部分，不影响同批次的其他修改
+                            with self.store.savepoint():
+                                self._apply(mutation)
+                        except Exception as e:
+                            errors += 1
+                            logger.error(f"[{self.name}] 应用修改 {mutation.op} 失败: {str(e)}")
+            except Exception as e:
+                errors = len(mutations)
+                logger.error(f"[{self.name}] 提交 {len(mutations)} 条修改失败: {str(e)}")
+        committed_at = time.monotonic()
+        commit_time = time.perf_counter() - start
+
+        if mutations:
+            with self._stats_lock:
+                self._stats['events'] += len(mutations)
+                self._stats['batches'] += 1
+                self._stats['errors'] += errors
+                self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(mutations))
+                self._stats['commit_time_total'] += commit_time
+                for mutation in mutations:
+                    latency = committed_at - mutation.enqueued_at
+                    self._stats['latency_total'] += latency
+                    self._stats['max_latency'] = max(self._stats['max_latency'], latency)
+                    self._latencies.append(latency)
+
+        for mutation in batch:
+            if mutation.done is not None:
+                mutation.done.set()
+
+    @staticmethod
+    def _coalesce(mutations: List[Mutation]) -> List[Mutation]:
+        """同一批次中对同一记录的多次整体替换只保留最后一次"""
+        last_replace = {}
+        for position, mutation in enumerate(mutations):
+            if mutation.op == OP_REPLACE:
+                last_replace[mutation.args[0]] = position
+        return [
+            mutation for position, mutation in enumerate(mutations)
+            if mutation.op != OP_REPLACE or last_replace[mutation.args[0]] == position
+        ]
+
+    def _apply(self, mutation: Mutation) -> None:
+        if mutation.op == OP_UPSERT:
+            record = mutation.args[0]
+            existing = self.store.find_one('original_url', record.get('original_url'))
+            if existing is None:
+                self.store.insert(record)
+                return
+            page_id, existing_record = existing
+            existing_record.pop('landing_page', None)
+            if record.get('screenshot_path'):
+                existing_record['screenshot_path'] = record['screenshot_path']
+            merge_keyword_records(existing_record, record.get('keyword_records') or [])
+            existing_record['final_url'] = record.get('final_url', existing_record.get('final_url', ''))
+            self.store.update(page_id, existing_record)
+        elif mutation.op == OP_ADD_KEYWORD:
+            domain, keyword_record = mutation.args
+            existing = self.store.find_one('domain', domain)
+            if existing is None:
+                logger.warning(f"[{self.name}] 未找到域名记录: {domain}")
+                return
+            self.store.add_keyword_record(existing[0], keyword_record)
+        elif mutation.op == OP_SET_SCREENSHOT:
+            host, screenshot_path = mutation.args
+            if not self.store.update_screenshot(host, screenshot_path):
+                logger.warning(f"[{self.name}] 未找到匹配的域名记录: {host}")
+        elif mutation.op == OP_REPLACE:
+            page_id, record = mutation.args
+            self.store.update(page_id, record)
+        else:
+            raise ValueError(f'未知的修改类型: {mutation.op}')
+
+    # ---------- 统计 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """获取提交延迟和批次大小统计"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        events, batches = stats['events'], stats['batches']
+        stats['pending'] = self._queue.qsize()
+        stats['avg_batch_size'] = events / batches if batches else 0.0
+        stats['avg_latency'] = stats.pop('latency_total') / events if events else 0.0
+        stats['p95_latency'] = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        stats['avg_commit_time'] = stats.pop('commit_time_total') / batches if batches else 0.0
+        return stats
+
+    def log_stats(self) -> None:
+        """输出提交统计"""
+        stats = self.stats()
+        logger.info(
+            f"[{self.name}] 结果提交统计: {stats['events']} 条修改, {stats['batches']} 批 "
+            f"(平均 {stats['avg_batch_size']:.1f} 条, 最多 {stats['max_batch_size']} 条), "
+            f"提交延迟 平均 {stats['avg_latency'] * 1000:.0f}ms / p95 {stats['p95_latency'] * 1000:.0f}ms / "
+            f"最长 {stats['max_latency'] * 1000:.0f}ms, 失败 {stats['errors']}, 待提交 {stats['pending']}"
+        )
+
+
+_default_committer: Optional[ResultsCommitter] = None
+_default_lock = threading.Lock()
+
+
+def get_results_committer() -> ResultsCommitter:
+    """获取进程内共享的结果写入线程（写入共享的默认结果存储，进程退出前提交剩余修改）"""
+    global _default_committer
+    with _default_lock:
+        if _default_committer is None:
+            _default_committer = ResultsCommitter(get_result_store()).start()
+            atexit.register(_default_committer.close)
+        return _default_committer
@@ -0,0 +1,172 @@
+"""
+结果去重模块：按规范化的落地页 URL 一次遍历合并重复的结果，关键词记录按 (关键词, 市场) 保留最新的一条
+"""
+import logging
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# 不影响落地页内容的跟踪参数，生成去重键时移除
+TRACKING_PARAMS = {'gclid', 'gclsrc', 'gbraid', 'wbraid', 'gad_source', 'gad_campaignid', 'fbclid', 'msclkid', '_ga'}
+
+# 合并时取自最新结果的字段
+LATEST_FIELDS = ('screenshot_path', 'final_url')
+
+
+def normalize_result_url(url: str) -> str:
+    """
+    规范化落地页 URL：忽略协议、www 前缀、默认端口、锚点、末尾斜杠和跟踪参数，其余参数排序
+
+    Args:
+        url: 落地页 URL
+
+    Returns:
+        str: 规范化后的 URL，无法解析时返回去掉首尾空白的原 URL
+    """
+    try:
+        parsed = urlsplit(url.strip())
+        host = (parsed.hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        if parsed.port and parsed.port not in (80, 443):
+            host = f'{host}:{parsed.port}'
+        query = ''
+        if parsed.query:
+            query = urlencode(sorted(
+                (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')
+            ))
+        return urlunsplit(('', host, parsed.path.rstrip('/'), query, ''))
+    except ValueError:
+        return url.strip()
+
+
+def result_key(result: Dict[str, Any]) -> Optional[str]:
+    """
+    结果的去重键：优先使用规范化的 final_url，没有时依次使用域名和 original_url
+
+    Returns:
+        Optional[str]: 去重键，三者都没有时返回 None（该结果不参与合并）
+    """
+    final_url = result.get('final_url') or result.get('landing_page')
+    if final_url:
+        return normalize_result_url(final_url)
+    if result.get('domain'):
+        return 'domain:' + result['domain'].lower()
+    if result.get('original_url'):
+        return 'original:' + normalize_result_url(result['original_url'])
+    return None
+
+
+def result_freshness(result: Dict[str, Any]) -> str:
+    """结果的新旧：结果的 timestamp 和其关键词记录中最新的时间"""
+    return max(
+        [result.get('timestamp') or '']
+        + [record.get('timestamp') or '' for record in result.get('keyword_records') or []]
+    )
+
+
+def deduplicate_keyword_records(records: Optional[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    关键词记录去重：相同 (关键词, 市场) 只保留时间最新的一条，跳过没有关键词的记录
+
+    Args:
+        records: 关键词记录
+
+    Returns:
+        List[Dict[str, Any]]: 按时间倒序排列的关键词记录
+    """
+    if not records:
+        return []
+
+    latest: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+    for record in records:
+        keyword = record.get('keyword', '')
+        if not keyword:
+            continue
+        key = (keyword, record.get('market'))
+        current = latest.get(key)
+        # 时间相同时后出现的记录优先
+        if current is None or (record.get('timestamp') or '') >= (current.get('timestamp') or ''):
+            latest[key] = record
+
+    return sorted(latest.values(), key=lambda r: r.get('timestamp') or '', reverse=True)
+
+
+def deduplicate_results(results: Iterable[Dict[str, Any]], sort: bool = True) -> List[Dict[str, Any]]:
+    """
+    合并重复的结果（一次遍历，按 result_key 分组）
+
+    同一分组内：关键词记录合并后去重，截图和 final_url 使用最新结果（见 result_freshness）中的非空值，
+    时间相同时后出现的结果优先；其余字段保留首次出现的值，timestamp 为最新关键词记录的时间。
+    输入的记录不会被修改。
+
+    Args:
+        results: 结果列表
+        sort: 是否按 timestamp 倒序排列，为 False 时保持首次出现的顺序
+
+    Returns:
+        List[Dict[str, Any]]: 去重后的结果
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    # 各分组中 LATEST_FIELDS 当前取值来源结果的新旧
+    field_freshness: Dict[str, Dict[str, str]] = {}
+    unkeyed: List[Dict[str, Any]] = []
+    total = 0
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        total += 1
+        key = result_key(result)
+        if key is None:
+            unkeyed.append(dict(result))
+            continue
+
+        freshness = result_freshness(result)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = dict(result, keyword_records=list(result.get('keyword_records') or []))
+            field_freshness[key] = {field: freshness for field in LATEST_FIELDS if result.get(field)}
+            continue
+
+        existing['keyword_records'].extend(result.get('keyword_records') or [])
+        sources = field_freshness[key]
+        for field in LATEST_FIELDS:
+            if result.get(field) and freshness >= sources.get(field, ''):
+                existing[field] = result[field]
+                sources[field] = freshness
+        if (result.get('timestamp') or '') > (existing.get('timestamp') or ''):
+            existing['timestamp'] = result['timestamp']
+
+    deduped = list(merged.values())
+    for result in deduped:
+        result['keyword_records'] = deduplicate_keyword_records(result['keyword_records'])
+        if result['keyword_records']:
+            result['timestamp'] = result['keyword_records'][0].get('timestamp') or result.get('timestamp', '')
+    deduped.extend(unkeyed)
+
+    if sort:
+        deduped.sort(key=lambda r: r.get('timestamp') or '', reverse=True)
+    logger.debug(f"结果去重: {total} -> {len(deduped)}")
+    return deduped
+
+
+def merge_and_deduplicate(
+    existing_results: Iterable[Dict[str, Any]],
+    new_results: Iterable[Dict[str, Any]],
+    sort: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    把新结果合并到已有结果中并去重，截图和 final_url 取自最新的结果，时间相同时新结果优先
+
+    Args:
+        existing_results: 已有结果
+        new_results: 新结果
+        sort: 是否按 timestamp 倒序排列
+
+    Returns:
+        List[Dict[str, Any]]: 合并去重后的结果
+    """
+    return deduplicate_results(chain(existing_results or [], new_results or []), sort=sort)
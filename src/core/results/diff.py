@@ -0,0 +1,257 @@
+"""
+爬取差异模块：每个关键词/市场的任务完成时，与上次看到的广告比较，记录新出现、消失和标题变化的广告，
+差异按爬取批次保存，比较只读取该关键词/市场的可见性记录，不需要对比整份结果
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+CHANGE_ADDED = 'added'                  # 新出现的广告
+CHANGE_REMOVED = 'removed'              # 上次出现、本次没有出现的广告
+CHANGE_TITLE = 'title_changed'          # 标题变化的广告
+CHANGES = (CHANGE_ADDED, CHANGE_REMOVED, CHANGE_TITLE)
+
+# 在事务中逐条执行（executescript 会先提交当前事务）
+_DIFF_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT,
+        finished_at TEXT,
+        units INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS serp_visibility (
+        keyword TEXT NOT NULL,
+        market TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        title TEXT,
+        first_seen_run INTEGER,
+        last_seen_run INTEGER,
+        PRIMARY KEY (keyword, market, domain)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS crawl_diffs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        keyword TEXT,
+        market TEXT,
+        domain TEXT,
+        change TEXT,
+        old_title TEXT,
+        new_title TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_crawl_diffs_run ON crawl_diffs(run_id, change)',
+)
+
+_DIFF_FIELDS = ('keyword', 'market', 'domain', 'change', 'old_title', 'new_title')
+
+
+class CrawlDiff:
+    """
+    爬取差异
+
+    serp_visibility 保存每个 (关键词, 市场, 域名) 最近一次看到的标题，record_unit() 在任务完成时
+    按主键读取该关键词/市场的可见性记录，计算差异并在同一事务中写入差异和新的可见性。
+    被拦截、失败或搜索结果页不完整的任务不应调用 record_unit()，否则上次看到的广告都会被记为消失；
+    部分广告跳转解析失败（无法得知其域名）时传入 partial=True，本次没有看到的广告保持原有可见性记录。
+    """
+
+    def __init__(self, store: ResultStore):
+        """
+        Args:
+            store: 结果存储，差异表和结果表保存在同一个数据库中
+        """
+        self.store = store
+        with self.store.transaction() as conn:
+            for statement in _DIFF_SCHEMA:
+                conn.execute(statement)
+
+    def start_run(self, resume: bool = False) -> int:
+        """
+        开始一个爬取批次
+
+        Args:
+            resume: 是否继续最近一个未完成的批次（从检查点恢复时使用）
+
+        Returns:
+            int: 批次 ID
+        """
+        with self.store.transaction() as conn:
+            if resume:
+                row = conn.execute(
+                    'SELECT id FROM crawl_runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1'
+                ).fetchone()
+                if row is not None:
+                    logger.info(f"继续爬取批次 {row[0]} 的差异记录")
+                    return row[0]
+            cursor = conn.execute('INSERT INTO crawl_runs (started_at) VALUES (?)', (datetime.now().isoformat(),))
+            return cursor.lastrowid
+
+    def record_unit(
+        self,
+        run_id: int,
+        keyword: str,
+        market: str,
+        ads: Iterable[Tuple[Optional[str], Optional[str]]],
+        partial: bool = False
+    ) -> Dict[str, int]:
+        """
+        记录一个关键词/市场任务看到的广告并计算差异
+
+        Args:
+            run_id: 批次 ID
+            keyword: 关键词
+            market: 市场代码
+            ads: 本次看到的 (域名, 标题)，同一域名出现多次时以第一次为准，没有域名的广告被忽略
+            partial: ads 是否只包含本次看到的部分广告，为 True 时不记录消失的广告
+
+        Returns:
+            Dict[str, int]: 各类变化的数量
+        """
+        seen: Dict[str, Optional[str]] = {}
+        for domain, title in ads:
+            if domain:
+                seen.setdefault(domain, title)
+
+        diffs: List[tuple] = []
+        with self.store.transaction() as conn:
+            previous = dict(conn.execute(
+                'SELECT domain, title FROM serp_visibility WHERE keyword = ? AND market = ?',
+                (keyword, market)
+            ).fetchall())
+
+            for domain, title in seen.items():
+                if domain not in previous:
+                    diffs.append((run_id, keyword, market, domain, CHANGE_ADDED, None, title))
+                elif (previous[domain] or '') != (title or ''):
+                    diffs.append((run_id, keyword, market, domain, CHANGE_TITLE, previous[domain], title))
+            removed = [] if partial else [domain for domain in previous if domain not in seen]
+            for domain in removed:
+                diffs.append((run_id, keyword, market, domain, CHANGE_REMOVED, previous[domain], None))
+
+            conn.executemany(
+                'INSERT INTO crawl_diffs (run_id, keyword, market, domain, change, old_title, new_title) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                diffs
+            )
+            conn.executemany(
+                'INSERT INTO serp_visibility (keyword, market, domain, title, first_seen_run, last_seen_run) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (keyword, market, domain) DO UPDATE SET '
+                'title = excluded.title, last_seen_run = excluded.last_seen_run',
+                [(keyword, market, domain, title, run_id, run_id) for domain, title in seen.items()]
+            )
+            conn.executemany(
+                'DELETE FROM serp_visibility WHERE keyword = ? AND market = ? AND domain = ?',
+                [(keyword, market, domain) for domain in removed]
+            )
+            conn.execute('UPDATE crawl_runs SET units = units + 1 WHERE id = ?', (run_id,))
+
+        counts = {change: 0 for change in CHANGES}
+        for diff in diffs:
+            counts[diff[4]] += 1
+        return counts
+
+    def finish_run(self, run_id: int) -> Dict[str, Any]:
+        """
+        结束爬取批次
+
+        Returns:
+            Dict[str, Any]: 批次信息和各类变化的数量
+        """
+        with self.store.transaction() as conn:
+            conn.execute('UPDATE crawl_runs SET finished_at = ? WHERE id = ?', (datetime.now().isoformat(), run_id))
+        run = self.run(run_id)
+        if run is not None:
+            logger.info(
+                f"爬取批次 {run_id} 差异: 新出现 {run['added']}, 消失 {run['removed']}, "
+                f"标题变化 {run['title_changed']} ({run['units']} 个任务)"
+            )
+        return run
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        最近的爬取批次（从新到旧），附带各类变化的数量
+
+        Args:
+            limit: 最多返回的批次数
+        """
+        return self._with_counts(self.store.query(
+            'SELECT id, started_at, finished_at, units FROM crawl_runs ORDER BY id DESC LIMIT ?',
+            (limit,)
+        ))
+
+    def run(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """批次信息和各类变化的数量，批次不存在时返回 None"""
+        runs = self._with_counts(self.store.query(
+            'SELECT id, started_at, finished_at, units FROM crawl_runs WHERE id = ?',
+            (run_id,)
+        ))
+        return runs[0] if runs else None
+
+    def _with_counts(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        counts: Dict[int, Dict[str, int]] = {}
+        for run_id, change, count in self.store.query(
+            f"SELECT run_id, change, COUNT(*) FROM crawl_diffs WHERE run_id IN ({','.join('?' * len(rows))}) "
+            'GROUP BY run_id, change',
+            [row[0] for row in rows]
+        ):
+            counts.setdefault(run_id, {})[change] = count
+        return [
+            {
+                'id': run_id,
+                'started_at': started_at,
+                'finished_at': finished_at,
+                'units': units,
+                **{change: counts.get(run_id, {}).get(change, 0) for change in CHANGES}
+            }
+            for run_id, started_at, finished_at, units in rows
+        ]
+
+    def latest_run_id(self) -> Optional[int]:
+        """最近一个已完成批次的 ID"""
+        rows = self.store.query('SELECT MAX(id) FROM crawl_runs WHERE finished_at IS NOT NULL')
+        return rows[0][0]
+
+    def changes(
+        self,
+        run_id: int,
+        change: Optional[str] = None,
+        keyword: Optional[str] = None,
+        market: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        批次中的变化
+
+        Args:
+            run_id: 批次 ID
+            change: 只返回该类变化，见 CHANGES
+            keyword: 只返回该关键词的变化
+            market: 只返回该市场的变化
+
+        Returns:
+            List[Dict[str, Any]]: 按关键词、市场、域名排序的变化
+        """
+        if change is not None and change not in CHANGES:
+            raise ValueError(f'未知的变化类型: {change}')
+        conditions, params = ['run_id = ?'], [run_id]
+        for field, value in (('change', change), ('keyword', keyword), ('market', market)):
+            if value is not None:
+                conditions.append(f'{field} = ?')
+                params.append(value)
+        rows = self.store.query(
+            f"SELECT {', '.join(_DIFF_FIELDS)} FROM crawl_diffs WHERE {' AND '.join(conditions)} "
+            'ORDER BY keyword, market, domain',
+            params
+        )
+        return [dict(zip(_DIFF_FIELDS, row)) for row in rows]
@@ -0,0 +1,174 @@
+"""
+域名索引模块：爬取期间在内存中按域名和关键词索引已有结果，修改合并后批量写回结果存储
+"""
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import CrawlerConfig
+from .store import ResultStore
+from .committer import ResultsCommitter
+
+logger = logging.getLogger(__name__)
+
+
+class DomainIndex:
+    """
+    已有结果的内存索引
+
+    - domain -> (记录 id, 记录)：每次爬取只从结果存储加载一次
+    - (domain, keyword, market) -> 关键词记录：判断关键词是否已记录无需遍历 keyword_records
+    - 修改直接作用在内存中的记录上，新增或替换的关键词记录同时放入待写回队列；待写回的记录达到
+      flush_batch 条或距上次写回超过 flush_interval 秒时，在一个事务中逐条添加到结果存储
+      （规则与 ResultStore.add_keyword_record 一致）；指定 committer 时交给结果写入线程提交。
+      写回只添加关键词记录，不覆盖爬取期间通过其他途径修改的截图、删除的记录等
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        flush_batch: int = CrawlerConfig.INDEX_FLUSH_BATCH,
+        flush_interval: float = CrawlerConfig.INDEX_FLUSH_INTERVAL,
+        committer: Optional[ResultsCommitter] = None
+    ):
+        """
+        Args:
+            store: 结果存储
+            flush_batch: 待写回记录达到多少条时写回
+            flush_interval: 距上次写回超过多少秒时写回
+            committer: 结果写入线程，为 None 时直接写入结果存储
+        """
+        self.store = store
+        self.flush_batch = max(1, int(flush_batch))
+        self.flush_interval = flush_interval
+        self.committer = committer
+        self._lock = threading.RLock()
+        self._pages: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._keywords: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+        # 待写回的关键词记录，同一关键词和市场只保留最后一次修改
+        self._pending: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
+        self.flushes = 0
+        self.flushed_pages = 0
+
+    def load(self) -> 'DomainIndex':
+        """从结果存储加载所有记录（同一域名有多条记录时使用第一条）"""
+        start = time.perf_counter()
+        pages: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        keywords: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+        for page_id, record in self.store.iter_pages():
+            domain = record.get('domain')
+            if not domain or domain in pages:
+                continue
+            pages[domain] = (page_id, record)
+            for keyword_record in record.get('keyword_records', []):
+                key = (domain, keyword_record.get('keyword'), keyword_record.get('market'))
+                keywords.setdefault(key, keyword_record)
+
+        with self._lock:
+            self._pages = pages
+            self._keywords = keywords
+            self._pending = {}
+            self._last_flush = time.monotonic()
+        logger.info(f"已加载域名索引: {len(pages)} 个域名, 耗时 {time.perf_counter() - start:.2f}s")
+        return self
+
+    def __contains__(self, domain: str) -> bool:
+        with self._lock:
+            return domain in self._pages
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """获取域名的记录"""
+        with self._lock:
+            entry = self._pages.get(domain)
+            return entry[1] if entry else None
+
+    def add_keyword_record(self, domain: str, keyword_record: Dict[str, Any]) -> bool:
+        """
+        为域名记录添加关键词记录：已有相同关键词和市场的记录时，新记录时间更晚则替换；
+        否则插入到最前面。与 ResultStore.add_keyword_record 的规则一致。
+
+        Args:
+            domain: 域名
+            keyword_record: 包含 timestamp / market / keyword / title 的关键词记录
+
+        Returns:
+            bool: 是否修改了记录
+        """
+        keyword = keyword_record.get('keyword')
+        market = keyword_record.get('market')
+        with self._lock:
+            entry = self._pages.get(domain)
+            if entry is None:
+                return False
+            page_id, record = entry
+
+            # 旧记录可能没有 market 字段，视为与任意市场相同
+            existing = self._keywords.get((domain, keyword, market)) or self._keywords.get((domain, keyword, None))
+            if existing is not None:
+                if (keyword_record.get('timestamp') or '') <= (existing.get('timestamp') or ''):
+                    return False
+                old_key = (domain, keyword, existing.get('market'))
+                existing.clear()
+                existing.update(keyword_record)
+                if old_key != (domain, keyword, market):
+                    self._keywords.pop(old_key, None)
+                self._keywords[(domain, keyword, market)] = existing
+            else:
+                keyword_record = dict(keyword_record)
+                record.setdefault('keyword_records', []).insert(0, keyword_record)
+                self._keywords[(domain, keyword, market)] = keyword_record
+
+            record['timestamp'] = max(r.get('timestamp') or '' for r in record['keyword_records'])
+            # 内存中的关键词记录之后还会被修改，待写回的是当前的副本
+            self._pending[(domain, keyword, market)] = dict(keyword_record)
+        return True
+
+    def _pending_domains(self) -> int:
+        return len({domain for domain, _, _ in self._pending})
+
+    def pending(self) -> int:
+        """待写回的记录数"""
+        with self._lock:
+            return self._pending_domains()
+
+    def maybe_flush(self) -> int:
+        """待写回记录足够多或距上次写回时间足够长时写回"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if self._pending_domains() < self.flush_batch and not due:
+                return 0
+        return self.flush()
+
+    def flush(self) -> int:
+        """
+        在一个事务中写回待写回的关键词记录（指定 committer 时放入写入队列后立即返回）
+
+        Returns:
+            int: 写回的记录数
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            if self.committer is not None:
+                for (domain, _, _), keyword_record in self._pending.items():
+                    self.committer.add_keyword_record(domain, keyword_record)
+            else:
+                with self.store.transaction():
+                    for (domain, _, _), keyword_record in self._pending.items():
+                        # 已被删除的记录不再写回
+                        self.store.add_keyword_record(self._pages[domain][0], keyword_record)
+            count = self._pending_domains()
+            self._pending = {}
+            self._last_flush = time.monotonic()
+            self.flushes += 1
+            self.flushed_pages += count
+        logger.info(f"域名索引写回 {count} 条记录")
+        return count
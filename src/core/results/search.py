@@ -0,0 +1,191 @@
+"""
+搜索索引模块：在结果数据库中维护落地页的倒排索引（SQLite FTS5），覆盖域名、关键词和广告标题；
+中英文混合内容在写入前分词（英文按单词，中文等按单字和相邻两字），查询支持前缀匹配并按 BM25 排序
+"""
+import re
+import time
+import unicodedata
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 中日韩字符按单字和相邻两字切分，其余按单词切分
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_TOKEN_PATTERN = re.compile(f'([{_CJK}]+)|[^\\W_{_CJK}]+')
+_ASCII_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# 各列在 BM25 排序中的权重：域名、关键词、标题
+COLUMN_WEIGHTS = (3.0, 1.0, 2.0)
+
+# 在事务中逐条执行（executescript 会先提交当前事务）
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "domain, keywords, titles, tokenize = 'unicode61', prefix = '2 3')",
+)
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    分词：统一为 NFKC 小写，英文和数字按单词切分，中日韩字符切分为单字和相邻两字
+
+    Args:
+        text: 文本
+
+    Returns:
+        List[str]: 词列表
+    """
+    if not text:
+        return []
+    text = str(text)
+    if text.isascii():
+        # 纯 ASCII 文本（大多数标题和域名）不需要规范化和中文切分
+        return _ASCII_TOKEN_PATTERN.findall(text.lower())
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(unicodedata.normalize('NFKC', text).lower()):
+        token = match.group()
+        if match.group(1):
+            tokens.extend(token)
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _index_text(values: Iterable[Any]) -> str:
+    seen = dict.fromkeys(token for value in values for token in tokenize(value))
+    return ' '.join(seen)
+
+
+def build_match_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    把用户输入转换为 FTS5 查询：所有词都需匹配，英文和数字按前缀匹配；
+    中文等连续两字以上时按相邻两字匹配，单字按单字匹配
+
+    Args:
+        text: 用户输入
+        prefix: 是否对英文和数字使用前缀匹配
+
+    Returns:
+        Optional[str]: FTS5 查询，没有可搜索的词时返回 None
+    """
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(unicodedata.normalize('NFKC', text or '').lower()):
+        token = match.group()
+        if match.group(1):
+            parts = [token] if len(token) == 1 else [token[i:i + 2] for i in range(len(token) - 1)]
+            terms.extend(f'"{part}"' for part in parts)
+        else:
+            terms.append(f'"{token}"*' if prefix else f'"{token}"')
+    return ' '.join(dict.fromkeys(terms)) or None
+
+
+def index_record(conn: sqlite3.Connection, page_id: int, record: Dict[str, Any], host: Optional[str] = None) -> None:
+    """
+    为新插入的落地页建立索引行（直接使用记录内容，不再查询数据库）
+
+    Args:
+        conn: 结果数据库连接
+        page_id: 落地页 id
+        record: 落地页记录（含 keyword_records）
+        host: 落地页主机名
+    """
+    keyword_records = record.get('keyword_records') or []
+    conn.execute(
+        'INSERT INTO search_index (rowid, domain, keywords, titles) VALUES (?, ?, ?, ?)',
+        (
+            page_id,
+            _index_text((record.get('domain'), host)),
+            _index_text(r.get('keyword') for r in keyword_records),
+            _index_text(r.get('title') for r in keyword_records)
+        )
+    )
+
+
+def reindex_pages(conn: sqlite3.Connection, page_ids: Iterable[int]) -> None:
+    """
+    重建指定落地页的索引行（在调用方的写事务中执行，已删除的落地页同时移出索引）
+
+    Args:
+        conn: 结果数据库连接
+        page_ids: 落地页 id
+    """
+    page_ids = list(page_ids)
+    for start in range(0, len(page_ids), 500):
+        batch = page_ids[start:start + 500]
+        placeholders = ','.join('?' * len(batch))
+        conn.execute(f'DELETE FROM search_index WHERE rowid IN ({placeholders})', batch)
+
+        documents: Dict[int, List[set]] = {}
+        for page_id, domain, host in conn.execute(
+            f'SELECT id, domain, host FROM landing_pages WHERE id IN ({placeholders})', batch
+        ):
+            documents[page_id] = [{domain, host}, set(), set()]
+        for page_id, keyword, title in conn.execute(
+            f'SELECT page_id, keyword, title FROM keyword_records WHERE page_id IN ({placeholders})', batch
+        ):
+            documents[page_id][1].add(keyword)
+            documents[page_id][2].add(title)
+
+        conn.executemany(
+            'INSERT INTO search_index (rowid, domain, keywords, titles) VALUES (?, ?, ?, ?)',
+            [
+                (page_id, _index_text(domains), _index_text(keywords), _index_text(titles))
+                for page_id, (domains, keywords, titles) in documents.items()
+            ]
+        )
+
+
+def rebuild_index(conn: sqlite3.Connection, batch_size: int = 1000) -> int:
+    """
+    重建全部索引（在调用方的写事务中执行）
+
+    Returns:
+        int: 建立索引的落地页数
+    """
+    conn.execute('DELETE FROM search_index')
+    last_id = 0
+    count = 0
+    while True:
+        page_ids = [row[0] for row in conn.execute(
+            'SELECT id FROM landing_pages WHERE id > ? ORDER BY id LIMIT ?', (last_id, batch_size)
+        )]
+        if not page_ids:
+            return count
+        reindex_pages(conn, page_ids)
+        count += len(page_ids)
+        last_id = page_ids[-1]
+
+
+def search_pages(store, text: str, limit: int = 50, prefix: bool = True) -> Dict[str, Any]:
+    """
+    搜索落地页
+
+    Args:
+        store: 结果存储（ResultStore）
+        text: 查询文本，匹配域名、关键词和广告标题
+        limit: 最多返回的结果数
+        prefix: 是否对英文和数字使用前缀匹配
+
+    Returns:
+        Dict[str, Any]: results（按相关度排序的 {'id', 'score'}，score 越大越相关）、
+        query（FTS5 查询）和 elapsed_ms
+    """
+    start = time.perf_counter()
+    query = build_match_query(text, prefix=prefix)
+    results = []
+    if query is not None:
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        rows = store.query(
+            f'SELECT rowid, bm25(search_index, {weights}) AS score FROM search_index '
+            'WHERE search_index MATCH ? ORDER BY score LIMIT ?',
+            (query, max(1, int(limit)))
+        )
+        # bm25() 越小越相关，取反后越大越相关
+        results = [{'id': page_id, 'score': round(-score, 4)} for page_id, score in rows]
+    return {
+        'results': results,
+        'query': query,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+    }
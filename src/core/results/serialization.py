@@ -0,0 +1,382 @@
+"""
+结果文件序列化模块：原子写入（临时文件 + fsync + 重命名），支持紧凑 JSON 和 MessagePack，读取时自动识别格式；
+iter_results / ResultsWriter 逐条读写结果列表，内存占用与文件大小无关
+"""
+import os
+import json
+import struct
+import tempfile
+import time
+import logging
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from src.config import StorageConfig
+
+try:
+    import orjson
+except ImportError:  # 没有安装 orjson 时使用标准库
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 没有安装 msgpack 时不支持二进制格式
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JSON = 'json'        # 缩进的 JSON，便于阅读
+FORMAT_COMPACT = 'compact'  # 不缩进的 JSON（安装 orjson 时使用 orjson 编码）
+FORMAT_MSGPACK = 'msgpack'  # MessagePack 二进制格式（需要安装 msgpack）
+FORMATS = (FORMAT_JSON, FORMAT_COMPACT, FORMAT_MSGPACK)
+
+# 按扩展名选择格式
+MSGPACK_SUFFIXES = ('.msgpack', '.mpk')
+
+# MessagePack 数组（fixarray 0x90-0x9f、array 16/32）和映射（fixmap 0x80-0x8f、map 16/32）的类型前缀，
+# 都不是 JSON 文本可能的首字节
+MSGPACK_PREFIXES = frozenset(range(0x80, 0xa0)) | {0xdc, 0xdd, 0xde, 0xdf}
+
+
+def encode(data: Any, fmt: str = FORMAT_COMPACT) -> bytes:
+    """
+    编码数据
+
+    Args:
+        data: 要编码的数据（JSON 兼容类型）
+        fmt: 格式，见 FORMATS
+
+    Returns:
+        bytes: 编码后的内容
+    """
+    if fmt == FORMAT_COMPACT:
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if fmt == FORMAT_JSON:
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    if fmt == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError('MessagePack 格式需要安装 msgpack')
+        return msgpack.packb(data, use_bin_type=True)
+    raise ValueError(f'未知的序列化格式: {fmt}')
+
+
+def detect_format(raw: bytes) -> str:
+    """
+    根据内容识别格式：第一个字节是 MessagePack 数组或映射的类型前缀时视为 MessagePack，
+    否则视为 JSON（内容损坏时由 JSON 解码报告实际的错误）
+
+    Returns:
+        str: FORMAT_JSON 或 FORMAT_MSGPACK（紧凑 JSON 和缩进 JSON 读取方式相同）
+    """
+    if raw[:1] and raw[0] in MSGPACK_PREFIXES:
+        return FORMAT_MSGPACK
+    return FORMAT_JSON
+
+
+def decode(raw: bytes) -> Any:
+    """解码数据，自动识别格式"""
+    if detect_format(raw) == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError('读取 MessagePack 格式需要安装 msgpack')
+        return msgpack.unpackb(raw, raw=False)
+    if raw.startswith(b'\xef\xbb\xbf'):
+        raw = raw[3:]
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def format_for_path(path: Union[str, Path], default: Optional[str] = None) -> str:
+    """按扩展名选择写入格式：.msgpack / .mpk 使用 MessagePack，其余使用 default（默认取配置）"""
+    if str(path).lower().endswith(MSGPACK_SUFFIXES):
+        return FORMAT_MSGPACK
+    return default or StorageConfig.RESULTS_FILE_FORMAT
+
+
+def atomic_write(path: Union[str, Path], content: bytes, fsync: bool = True) -> None:
+    """
+    原子写入文件：写入同目录下的临时文件并同步到磁盘后重命名，进程中途退出时原文件保持完整
+
+    Args:
+        path: 目标文件路径
+        content: 文件内容
+        fsync: 是否同步到磁盘
+    """
+    path = Path(path)
+    directory = path.parent if str(path.parent) else Path('.')
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """同步目录，确保重命名本身已落盘（不支持的平台忽略）"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def dump_results(
+    data: Any,
+    path: Union[str, Path],
+    fmt: Optional[str] = None,
+    fsync: bool = StorageConfig.RESULTS_FILE_FSYNC
+) -> int:
+    """
+    原子写入结果文件
+
+    Args:
+        data: 结果数据
+        path: 文件路径
+        fmt: 格式，为 None 时按扩展名和配置选择（见 format_for_path）
+        fsync: 是否同步到磁盘
+
+    Returns:
+        int: 写入的字节数
+    """
+    content = encode(data, fmt or format_for_path(path))
+    atomic_write(path, content, fsync=fsync)
+    return len(content)
+
+
+def load_results(path: Union[str, Path]) -> Any:
+    """读取结果文件，自动识别 JSON / MessagePack 格式"""
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+# ---------- 流式读写 ----------
+
+STREAM_CHUNK_SIZE = 1 << 20  # 流式读取每次读入的字符数
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_results(path: Union[str, Path], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐条读取结果列表文件中的记录，不把整个文件读入内存（JSON 或 MessagePack，自动识别）
+
+    Args:
+        path: 结果文件路径，内容为记录列表
+        chunk_size: 每次读入的字符数
+
+    Yields:
+        Any: 列表中的每条记录
+    """
+    with open(path, 'rb') as f:
+        head = f.read(64)
+        f.seek(0)
+        if detect_format(head) == FORMAT_MSGPACK:
+            yield from _iter_msgpack(f)
+            return
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        yield from _iter_json_array(f, chunk_size)
+
+
+def _iter_msgpack(f) -> Iterator[Any]:
+    if msgpack is None:
+        raise RuntimeError('读取 MessagePack 格式需要安装 msgpack')
+    unpacker = msgpack.Unpacker(f, raw=False)
+    for _ in range(unpacker.read_array_header()):
+        yield unpacker.unpack()
+
+
+def _iter_json_array(f, chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    read_size = chunk_size
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof, read_size
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip(_WHITESPACE)
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError('结果文件不是列表格式')
+    pos += 1
+
+    while True:
+        skip(_WHITESPACE + ',')
+        if pos >= len(buf):
+            raise ValueError('结果文件不完整：缺少 ]')
+        if buf[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # 记录跨越了读入的边界，继续读入（单条记录超过 chunk_size 时逐步加大读入量）
+            if eof or not fill():
+                raise
+            read_size = min(read_size * 2, 1 << 26)
+            continue
+        if end >= len(buf) and not eof:
+            # 数字等值可能在边界处被截断，读入更多内容后重新解析
+            if fill():
+                continue
+        yield item
+        pos = end
+        read_size = chunk_size
+
+
+class ResultsWriter:
+    """
+    逐条写入结果列表文件
+
+    写入同目录下的临时文件，close() 时同步到磁盘并替换目标文件；with 块中出现异常时丢弃临时文件，
+    原文件保持不变。目标文件可以是正在用 iter_results 读取的文件。
+
+    用法:
+        with ResultsWriter('all_results.json') as writer:
+            for record in iter_results('all_results.json'):
+                writer.write(record)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fmt: Optional[str] = None,
+        fsync: bool = StorageConfig.RESULTS_FILE_FSYNC,
+        report_every: int = 100000
+    ):
+        """
+        Args:
+            path: 目标文件路径
+            fmt: 格式，为 None 时按扩展名和配置选择（见 format_for_path）
+            fsync: 是否同步到磁盘
+            report_every: 每写入多少条记录输出一次进度，0 表示不输出
+        """
+        self.path = Path(path)
+        self.fmt = fmt or format_for_path(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f'未知的序列化格式: {self.fmt}')
+        if self.fmt == FORMAT_MSGPACK and msgpack is None:
+            raise RuntimeError('MessagePack 格式需要安装 msgpack')
+        self.fsync = fsync
+        self.report_every = report_every
+        self.count = 0
+        self.bytes_written = 0
+        self.started_at = time.perf_counter()
+        self._directory = self.path.parent if str(self.path.parent) else Path('.')
+        self._directory.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=self._directory, prefix=f'.{self.path.name}.', suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        if self.fmt == FORMAT_MSGPACK:
+            # array32 头部，记录数在 close() 时回填
+            self._write(b'\xdd' + struct.pack('>I', 0))
+        else:
+            self._write(b'[')
+
+    def _write(self, content: bytes) -> None:
+        self._file.write(content)
+        self.bytes_written += len(content)
+
+    def write(self, record: Any) -> None:
+        """写入一条记录"""
+        if self.fmt == FORMAT_MSGPACK:
+            self._write(msgpack.packb(record, use_bin_type=True))
+        else:
+            separator = b',' if self.count else b''
+            if self.fmt == FORMAT_JSON:
+                content = encode(record, FORMAT_JSON).replace(b'\n', b'\n  ')
+                self._write(separator + b'\n  ' + content)
+            else:
+                self._write(separator + encode(record, FORMAT_COMPACT))
+        self.count += 1
+        if self.report_every and self.count % self.report_every == 0:
+            logger.info(f"已写入 {self.count} 条记录 ({self.rate:.0f} 条/s)")
+
+    @property
+    def elapsed(self) -> float:
+        """已用时间（秒）"""
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """写入速度（条/秒）"""
+        elapsed = self.elapsed
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def close(self) -> None:
+        """完成写入并替换目标文件"""
+        if self._file is None:
+            return
+        try:
+            if self.fmt == FORMAT_MSGPACK:
+                self._file.seek(1)
+                self._file.write(struct.pack('>I', self.count))
+            else:
+                self._write(b'\n]' if self.fmt == FORMAT_JSON and self.count else b']')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        if self.fsync:
+            _fsync_directory(self._directory)
+
+    def abort(self) -> None:
+        """放弃写入，删除临时文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
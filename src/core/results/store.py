@@ -0,0 +1,638 @@
+"""
+结果存储模块：使用 SQLite 保存落地页记录和关键词记录，替代整体读写 all_results.json
+"""
+import json
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
+
+from src.config import StorageConfig
+from .search import SEARCH_SCHEMA, index_record, rebuild_index, reindex_pages
+from .serialization import dump_results, load_results
+
+logger = logging.getLogger(__name__)
+
+# 落地页记录中单独存列的字段，其余字段保存在 extra 中
+PAGE_FIELDS = ('domain', 'original_url', 'final_url', 'screenshot_path', 'timestamp', 'market')
+
+# 关键词记录中单独存列的字段
+KEYWORD_FIELDS = ('keyword', 'market', 'title', 'timestamp')
+
+# 可以按值查找和删除的落地页字段
+LOOKUP_FIELDS = ('domain', 'host', 'final_url', 'original_url')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS landing_pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT,
+    host TEXT,
+    original_url TEXT,
+    final_url TEXT,
+    screenshot_path TEXT,
+    timestamp TEXT,
+    market TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_domain ON landing_pages(domain);
+CREATE INDEX IF NOT EXISTS idx_pages_host ON landing_pages(host);
+CREATE INDEX IF NOT EXISTS idx_pages_final_url ON landing_pages(final_url);
+CREATE INDEX IF NOT EXISTS idx_pages_original_url ON landing_pages(original_url);
+-- 结果浏览按时间和域名排序（见 browse.py）
+CREATE INDEX IF NOT EXISTS idx_pages_sort_timestamp ON landing_pages(COALESCE(timestamp, ''));
+CREATE INDEX IF NOT EXISTS idx_pages_sort_domain ON landing_pages(COALESCE(domain, ''));
+
+CREATE TABLE IF NOT EXISTS keyword_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_id INTEGER NOT NULL REFERENCES landing_pages(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    keyword TEXT,
+    market TEXT,
+    title TEXT,
+    timestamp TEXT,
+    extra TEXT,
+    updated_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_keywords_page ON keyword_records(page_id, seq);
+CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON keyword_records(keyword, market);
+CREATE INDEX IF NOT EXISTS idx_keywords_market ON keyword_records(market);
+CREATE INDEX IF NOT EXISTS idx_keywords_timestamp ON keyword_records(timestamp);
+CREATE INDEX IF NOT EXISTS idx_keywords_market_timestamp ON keyword_records(market, timestamp);
+
+-- 递增序号的当前值（keyword_records：关键词记录的提交序号，见 ResultStore._next_update_seq）
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+
+def url_host(url: Optional[str]) -> str:
+    """提取 URL 的主机名（小写），用于按域名匹配截图"""
+    try:
+        return urlparse(url or '').netloc.lower()
+    except Exception:
+        return ''
+
+
+def _split(record: Dict[str, Any], fields: Tuple[str, ...], skip: Tuple[str, ...] = ()) -> Tuple[list, Optional[str]]:
+    """把记录拆成列值和 extra（JSON）"""
+    values = [record.get(field) for field in fields]
+    # 显式为 None 的字段也放进 extra，还原时保留该键
+    extra = {k: v for k, v in record.items() if (k not in fields or v is None) and k not in skip}
+    return values, json.dumps(extra, ensure_ascii=False) if extra else None
+
+
+def _join(fields: Tuple[str, ...], values: Iterable[Any], extra: Optional[str]) -> Dict[str, Any]:
+    """把列值和 extra 还原成记录，值为 None 的列不输出，保持与 JSON 格式一致"""
+    record = {field: value for field, value in zip(fields, values) if value is not None}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+
+class ResultStore:
+    """
+    监控结果存储
+
+    - landing_pages：每个落地页一行，按 domain / host / final_url / original_url 建索引
+    - keyword_records：落地页下的关键词记录，按 keyword+market、market、timestamp 建索引
+    - search_index：域名、关键词和标题的全文索引（见 search.py），随每次写入在同一事务中更新
+    - 关键词记录每次插入或修改时分配递增的提交序号 updated_seq，写事务串行执行，
+      序号顺序即提交顺序，增量读取（iter_keyword_rows）以此为水位线
+    - 使用 WAL 模式：所有写操作在同一把锁内通过写连接执行；文件数据库的读取从连接池中借用只读连接，
+      不等待写锁，读到的是最近一次提交的数据（内存数据库只有一个连接，读写共用锁）
+    - 数据库为空且存在 all_results.json 时自动导入
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = StorageConfig.RESULTS_DB,
+        json_path: Union[str, Path, None] = StorageConfig.RESULTS_JSON
+    ):
+        """
+        Args:
+            path: 数据库文件路径，为 None 时使用内存数据库（不自动导入）
+            json_path: 首次使用时自动导入的 JSON 文件，为 None 时不导入
+        """
+        self.path = str(path) if path is not None else ':memory:'
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._memory = path is None
+        self._lock = threading.RLock()  # 保护写连接
+        self._writer: Optional[int] = None  # 正在执行写事务的线程，见 _reading()
+        self._readers: List[sqlite3.Connection] = []  # 空闲的只读连接
+        self._readers_lock = threading.Lock()
+        self._commits = 0  # 本连接已提交的写事务数，见 version()
+        self._savepoints = 0  # 当前嵌套的保存点层数，见 savepoint()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(_SCHEMA)
+        self._init_update_seq()
+        self._init_search_index()
+
+        if path is not None and json_path is not None and self.count() == 0 and os.path.exists(json_path):
+            count = self.import_json(json_path)
+            logger.info(f"首次使用结果数据库，已从 {json_path} 导入 {count} 条记录")
+
+    def _init_update_seq(self) -> None:
+        """初始化关键词记录的提交序号，没有 updated_seq 列的旧数据库补充该列（已有记录按 id 编号）"""
+        with self.transaction() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(keyword_records)')}
+            if 'updated_seq' not in columns:
+                conn.execute('ALTER TABLE keyword_records ADD COLUMN updated_seq INTEGER')
+                conn.execute('UPDATE keyword_records SET updated_seq = id')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_keywords_updated_seq ON keyword_records(updated_seq)')
+            conn.execute(
+                "INSERT OR IGNORE INTO sequences (name, value) "
+                "SELECT 'keyword_records', COALESCE(MAX(updated_seq), 0) FROM keyword_records"
+            )
+
+    def _init_search_index(self) -> None:
+        """创建搜索索引，已有数据的数据库第一次使用时为全部记录建立索引"""
+        with self.transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+            ).fetchone()
+            for statement in SEARCH_SCHEMA:
+                conn.execute(statement)
+            if not exists:
+                count = rebuild_index(conn)
+                if count:
+                    logger.info(f"已为 {count} 条落地页记录建立搜索索引")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """在一个事务中执行多个写操作"""
+        with self._lock:
+            if self._conn.in_transaction:
+                # 嵌套调用时并入外层事务
+                yield self._conn
+                return
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._writer = threading.get_ident()
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            finally:
+                self._writer = None
+            self._conn.execute('COMMIT')
+            self._commits += 1
+
+    @contextmanager
+    def savepoint(self) -> Iterator[sqlite3.Connection]:
+        """
+        在事务中建立保存点：代码块抛出异常时只撤销代码块内的修改，外层事务可以继续提交
+        （不在事务中时开启一个事务）
+        """
+        with self.transaction() as conn:
+            self._savepoints += 1
+            name = f'sp_{self._savepoints}'
+            conn.execute(f'SAVEPOINT {name}')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f'ROLLBACK TO {name}')
+                conn.execute(f'RELEASE {name}')
+                raise
+            finally:
+                self._savepoints -= 1
+            conn.execute(f'RELEASE {name}')
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """
+        读取使用的连接：文件数据库从连接池借用只读连接，不持有写锁；内存数据库，
+        或当前线程正在写事务中（需要读到事务中未提交的修改）时使用写连接
+        """
+        if self._memory or self._writer == threading.get_ident():
+            with self._lock:
+                yield self._conn
+            return
+        with self._readers_lock:
+            conn = self._readers.pop() if self._readers else None
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA query_only=ON')
+        try:
+            yield conn
+        finally:
+            with self._readers_lock:
+                self._readers.append(conn)
+
+    def version(self) -> str:
+        """
+        数据版本：写连接的提交次数加上其 SQLite data_version（其他连接或进程提交后变化），
+        任何写入之后都会改变，可用于判断缓存是否过期
+        """
+        with self._lock:
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            return f'{self._commits}.{data_version}'
+
+    # ---------- 读取 ----------
+
+    def count(self) -> int:
+        """落地页记录数"""
+        with self._reading() as conn:
+            return conn.execute('SELECT COUNT(*) FROM landing_pages').fetchone()[0]
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        """执行只读查询并返回所有行（供归档等扩展模块使用）"""
+        with self._reading() as conn:
+            return conn.execute(sql, tuple(params)).fetchall()
+
+    def _load_pages(self, conn: sqlite3.Connection, rows: List[tuple]) -> List[Tuple[int, Dict[str, Any]]]:
+        """把落地页行和其关键词记录组装成记录"""
+        if not rows:
+            return []
+        page_ids = [row[0] for row in rows]
+        keyword_records: Dict[int, List[Dict[str, Any]]] = {page_id: [] for page_id in page_ids}
+        # 分批查询，避免超过 SQLite 参数数量限制
+        for start in range(0, len(page_ids), 500):
+            batch = page_ids[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            for page_id, keyword, market, title, timestamp, extra in conn.execute(
+                f'SELECT page_id, keyword, market, title, timestamp, extra FROM keyword_records '
+                f'WHERE page_id IN ({placeholders}) ORDER BY page_id, seq',
+                batch
+            ):
+                keyword_records[page_id].append(_join(KEYWORD_FIELDS, (keyword, market, title, timestamp), extra))
+
+        pages = []
+        for row in rows:
+            page_id, values, extra = row[0], row[1:-1], row[-1]
+            record = _join(PAGE_FIELDS, values, extra)
+            record['keyword_records'] = keyword_records[page_id]
+            pages.append((page_id, record))
+        return pages
+
+    _PAGE_COLUMNS = 'id, ' + ', '.join(PAGE_FIELDS) + ', extra'
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """按写入顺序分批读取所有记录"""
+        for _, record in self.iter_pages(batch_size):
+            yield record
+
+    def iter_pages(self, batch_size: int = 500) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """按写入顺序分批读取所有 (记录 id, 记录)"""
+        last_id = 0
+        while True:
+            with self._reading() as conn:
+                rows = conn.execute(
+                    f'SELECT {self._PAGE_COLUMNS} FROM landing_pages WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, batch_size)
+                ).fetchall()
+                pages = self._load_pages(conn, rows)
+            if not pages:
+                return
+            yield from pages
+            last_id = pages[-1][0]
+
+    def all(self) -> List[Dict[str, Any]]:
+        """读取所有记录（与 all_results.json 格式一致）"""
+        return list(self.iter_records())
+
+    def domains(self) -> Set[str]:
+        """所有已记录的域名"""
+        with self._reading() as conn:
+            return {row[0] for row in conn.execute('SELECT DISTINCT domain FROM landing_pages') if row[0]}
+
+    def iter_keyword_rows(
+        self,
+        after_seq: Optional[int] = None,
+        batch_size: int = 5000
+    ) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], int]]:
+        """
+        按提交顺序分批读取展开后的关键词记录
+
+        修改过的关键词记录按修改时的提交序号再次读取；按提交序号而不是 timestamp 增量读取，
+        后提交但 timestamp 较早的记录（如合并的旧结果）不会被遗漏
+
+        Args:
+            after_seq: 只读取提交序号大于该值的记录，为 None 时读取全部
+            batch_size: 每批读取的行数
+
+        Returns:
+            Iterator[tuple]: (timestamp, market, keyword, title, domain, updated_seq)
+        """
+        last_seq = after_seq if after_seq is not None else -1
+        while True:
+            with self._reading() as conn:
+                rows = conn.execute(
+                    'SELECT k.timestamp, k.market, k.keyword, k.title, p.domain, k.updated_seq '
+                    'FROM keyword_records k JOIN landing_pages p ON p.id = k.page_id '
+                    'WHERE k.updated_seq > ? ORDER BY k.updated_seq LIMIT ?',
+                    (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_seq = rows[-1][-1]
+
+    def find(self, field: str, value: Any) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        按字段查找落地页记录
+
+        Args:
+            field: domain / host / final_url / original_url
+            value: 字段值
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: (记录 id, 记录) 列表，按写入顺序排列
+        """
+        if field not in LOOKUP_FIELDS:
+            raise ValueError(f'不支持按 {field} 查找')
+        with self._reading() as conn:
+            rows = conn.execute(
+                f'SELECT {self._PAGE_COLUMNS} FROM landing_pages WHERE {field} = ? ORDER BY id', (value,)
+            ).fetchall()
+            return self._load_pages(conn, rows)
+
+    def find_one(self, field: str, value: Any) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """按字段查找第一条落地页记录"""
+        pages = self.find(field, value)
+        return pages[0] if pages else None
+
+    def get(self, page_id: int) -> Optional[Dict[str, Any]]:
+        """按 id 读取记录"""
+        with self._reading() as conn:
+            rows = conn.execute(
+                f'SELECT {self._PAGE_COLUMNS} FROM landing_pages WHERE id = ?', (page_id,)
+            ).fetchall()
+            pages = self._load_pages(conn, rows)
+        return pages[0][1] if pages else None
+
+    # ---------- 写入 ----------
+
+    def _next_update_seq(self, count: int = 1) -> int:
+        """在当前写事务中分配 count 个连续的提交序号，返回第一个"""
+        last = self._conn.execute(
+            "UPDATE sequences SET value = value + ? WHERE name = 'keyword_records' RETURNING value", (count,)
+        ).fetchall()[0][0]
+        return last - count + 1
+
+    def _insert_keyword_records(self, page_id: int, keyword_records: Iterable[Dict[str, Any]], start_seq: int = 0) -> None:
+        rows = []
+        for seq, keyword_record in enumerate(keyword_records, start_seq):
+            values, extra = _split(keyword_record, KEYWORD_FIELDS)
+            rows.append((page_id, seq, *values, extra))
+        if not rows:
+            return
+        first_update_seq = self._next_update_seq(len(rows))
+        self._conn.executemany(
+            'INSERT INTO keyword_records (page_id, seq, keyword, market, title, timestamp, extra, updated_seq) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(*row, first_update_seq + i) for i, row in enumerate(rows)]
+        )
+
+    def _replace_keyword_records(self, page_id: int, keyword_records: Iterable[Dict[str, Any]]) -> None:
+        """
+        把落地页的关键词记录替换为 keyword_records：内容相同的已有记录保留原来的 id 和提交序号（只调整次序），
+        相同关键词和市场但内容变化的记录原地更新并分配新的提交序号，其余旧记录删除、新记录插入，
+        增量导出（见 iter_keyword_rows）因此只会再次导出变化的记录
+        """
+        existing: Dict[tuple, List[int]] = {}
+        by_keyword: Dict[tuple, List[int]] = {}
+        for row_id, keyword, market, title, timestamp, extra in self._conn.execute(
+            'SELECT id, keyword, market, title, timestamp, extra FROM keyword_records WHERE page_id = ? ORDER BY seq',
+            (page_id,)
+        ):
+            existing.setdefault((keyword, market, title, timestamp, extra), []).append(row_id)
+            by_keyword.setdefault((keyword, market), []).append(row_id)
+
+        kept: List[tuple] = []
+        pending: List[tuple] = []
+        for seq, keyword_record in enumerate(keyword_records):
+            values, extra = _split(keyword_record, KEYWORD_FIELDS)
+            ids = existing.get((*values, extra))
+            if ids:
+                row_id = ids.pop(0)
+                by_keyword[tuple(values[:2])].remove(row_id)
+                kept.append((seq, row_id))
+            else:
+                pending.append((seq, values, extra))
+
+        changed: List[tuple] = []
+        inserted: List[tuple] = []
+        for seq, values, extra in pending:
+            ids = by_keyword.get(tuple(values[:2]))
+            if ids:
+                changed.append((seq, *values, extra, ids.pop(0)))
+            else:
+                inserted.append((page_id, seq, *values, extra))
+        removed = [row_id for ids in by_keyword.values() for row_id in ids]
+
+        self._conn.executemany('DELETE FROM keyword_records WHERE id = ?', [(row_id,) for row_id in removed])
+        self._conn.executemany('UPDATE keyword_records SET seq = ? WHERE id = ?', kept)
+        if changed:
+            first_update_seq = self._next_update_seq(len(changed))
+            self._conn.executemany(
+                'UPDATE keyword_records SET seq = ?, keyword = ?, market = ?, title = ?, timestamp = ?, extra = ?, '
+                'updated_seq = ? WHERE id = ?',
+                [(*row[:-1], first_update_seq + i, row[-1]) for i, row in enumerate(changed)]
+            )
+        if inserted:
+            first_update_seq = self._next_update_seq(len(inserted))
+            self._conn.executemany(
+                'INSERT INTO keyword_records (page_id, seq, keyword, market, title, timestamp, extra, updated_seq) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(*row, first_update_seq + i) for i, row in enumerate(inserted)]
+            )
+
+    def insert(self, record: Dict[str, Any]) -> int:
+        """
+        新增落地页记录（含关键词记录）
+
+        Returns:
+            int: 记录 id
+        """
+        values, extra = _split(record, PAGE_FIELDS, skip=('keyword_records',))
+        host = url_host(record.get('final_url'))
+        with self.transaction():
+            cursor = self._conn.execute(
+                'INSERT INTO landing_pages (domain, original_url, final_url, screenshot_path, timestamp, market, host, extra) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (*values, host, extra)
+            )
+            page_id = cursor.lastrowid
+            self._insert_keyword_records(page_id, record.get('keyword_records') or [])
+            index_record(self._conn, page_id, record, host)
+        return page_id
+
+    def insert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """在一个事务中新增多条记录，返回新增数量"""
+        count = 0
+        with self.transaction():
+            for record in records:
+                self.insert(record)
+                count += 1
+        return count
+
+    def update(self, page_id: int, record: Dict[str, Any]) -> bool:
+        """
+        用 record 整体替换指定记录（含关键词记录）
+
+        Returns:
+            bool: 记录是否存在（已被删除时不做任何修改）
+        """
+        values, extra = _split(record, PAGE_FIELDS, skip=('keyword_records',))
+        with self.transaction():
+            cursor = self._conn.execute(
+                'UPDATE landing_pages SET domain = ?, original_url = ?, final_url = ?, screenshot_path = ?, '
+                'timestamp = ?, market = ?, host = ?, extra = ? WHERE id = ?',
+                (*values, url_host(record.get('final_url')), extra, page_id)
+            )
+            if not cursor.rowcount:
+                return False
+            self._replace_keyword_records(page_id, record.get('keyword_records') or [])
+            reindex_pages(self._conn, [page_id])
+        return True
+
+    def add_keyword_record(self, page_id: int, keyword_record: Dict[str, Any]) -> bool:
+        """
+        为落地页添加关键词记录：已有相同关键词和市场的记录时，新记录时间更晚则替换；
+        否则插入到最前面。落地页时间戳更新为最新的关键词记录时间。
+
+        Args:
+            page_id: 落地页记录 id
+            keyword_record: 包含 timestamp / market / keyword / title 的关键词记录
+
+        Returns:
+            bool: 是否修改了记录（记录已被删除时不做任何修改）
+        """
+        keyword = keyword_record.get('keyword')
+        market = keyword_record.get('market')
+        timestamp = keyword_record.get('timestamp') or ''
+        values, extra = _split(keyword_record, KEYWORD_FIELDS)
+        with self.transaction():
+            if self._conn.execute('SELECT 1 FROM landing_pages WHERE id = ?', (page_id,)).fetchone() is None:
+                return False
+            # 旧记录可能没有 market 字段，视为与任意市场相同
+            row = self._conn.execute(
+                'SELECT id, timestamp FROM keyword_records WHERE page_id = ? AND keyword = ? '
+                'AND (market = ? OR market IS NULL) ORDER BY seq LIMIT 1',
+                (page_id, keyword, market)
+            ).fetchone()
+            if row is not None:
+                if timestamp <= (row[1] or ''):
+                    return False
+                self._conn.execute(
+                    'UPDATE keyword_records SET keyword = ?, market = ?, title = ?, timestamp = ?, extra = ?, '
+                    'updated_seq = ? WHERE id = ?',
+                    (*values, extra, self._next_update_seq(), row[0])
+                )
+            else:
+                min_seq = self._conn.execute(
+                    'SELECT COALESCE(MIN(seq), 0) FROM keyword_records WHERE page_id = ?', (page_id,)
+                ).fetchone()[0]
+                self._insert_keyword_records(page_id, [keyword_record], min_seq - 1)
+            self._conn.execute(
+                'UPDATE landing_pages SET timestamp = ('
+                'SELECT MAX(timestamp) FROM keyword_records WHERE page_id = ?) WHERE id = ?',
+                (page_id, page_id)
+            )
+            reindex_pages(self._conn, [page_id])
+        return True
+
+    def update_screenshot(self, host: str, screenshot_path: str) -> int:
+        """
+        更新指定主机名下所有落地页的截图
+
+        Args:
+            host: 落地页主机名
+            screenshot_path: 截图文件名
+
+        Returns:
+            int: 更新的记录数
+        """
+        with self.transaction():
+            cursor = self._conn.execute(
+                'UPDATE landing_pages SET screenshot_path = ? WHERE host = ?', (screenshot_path, host.lower())
+            )
+        return cursor.rowcount
+
+    def delete(self, field: str, value: Any) -> int:
+        """
+        删除字段值匹配的落地页记录（关键词记录一并删除）
+
+        Returns:
+            int: 删除的记录数
+        """
+        if field not in LOOKUP_FIELDS:
+            raise ValueError(f'不支持按 {field} 删除')
+        with self.transaction():
+            self._conn.execute(
+                f'DELETE FROM search_index WHERE rowid IN (SELECT id FROM landing_pages WHERE {field} = ?)', (value,)
+            )
+            cursor = self._conn.execute(f'DELETE FROM landing_pages WHERE {field} = ?', (value,))
+        return cursor.rowcount
+
+    def replace_all(self, records: Iterable[Dict[str, Any]]) -> int:
+        """用 records 替换全部数据，返回写入的记录数"""
+        with self.transaction():
+            self._conn.execute('DELETE FROM keyword_records')
+            self._conn.execute('DELETE FROM landing_pages')
+            self._conn.execute('DELETE FROM search_index')
+            return self.insert_many(records)
+
+    # ---------- 导入导出 ----------
+
+    def import_json(self, path: Union[str, Path], replace: bool = True) -> int:
+        """
+        从 all_results.json 格式的文件导入（JSON 或 MessagePack，自动识别）
+
+        Args:
+            path: 结果文件路径
+            replace: 是否替换现有数据，False 时追加
+
+        Returns:
+            int: 导入的记录数
+        """
+        records = load_results(path)
+        if not isinstance(records, list):
+            raise ValueError(f'{path} 不是列表格式')
+        records = [record for record in records if isinstance(record, dict)]
+        if replace:
+            return self.replace_all(records)
+        return self.insert_many(records)
+
+    def export_json(self, path: Union[str, Path] = StorageConfig.RESULTS_JSON) -> int:
+        """
+        导出为 all_results.json 格式（原子写入，格式见 serialization.dump_results）
+
+        Returns:
+            int: 导出的记录数
+        """
+        records = self.all()
+        dump_results(records, path)
+        return len(records)
+
+    def close(self) -> None:
+        """关闭写连接和空闲的只读连接"""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[ResultStore] = None
+_default_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """获取进程内共享的默认结果存储"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ResultStore()
+        return _default_store
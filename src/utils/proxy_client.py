@@ -0,0 +1,428 @@
+"""
+预览代理客户端模块：/proxy 和 /mobile_proxy 共用一个带连接池的 requests 会话（保持连接），
+页面缓存在本地 SQLite 文件中（按字节数的 LRU），按 Cache-Control / Expires 判断是否新鲜，
+过期后用 ETag / Last-Modified 向源站确认；HTML 缓存的是改写后的内容，命中时不再改写
+"""
+import os
+import time
+import sqlite3
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import StorageConfig
+from src.core.crawler.redirect_cache import normalize_cache_key
+from src.core.crawler.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 响应的缓存状态（同时作为 X-Cache 响应头）
+CACHE_HIT = 'HIT'                  # 缓存新鲜，直接返回
+CACHE_REVALIDATED = 'REVALIDATED'  # 缓存过期，源站返回 304 确认未变化
+CACHE_MISS = 'MISS'                # 从源站获取
+CACHE_STALE = 'STALE'              # 缓存过期且源站请求失败，返回过期内容
+CACHE_BYPASS = 'BYPASS'            # 未使用缓存
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    解析 Cache-Control 头
+
+    Returns:
+        Dict[str, Optional[str]]: 小写的指令 -> 参数（没有参数时为 None）
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers, default_ttl: float, now: Optional[float] = None) -> Optional[float]:
+    """
+    根据响应头计算缓存的有效期
+
+    依次使用 Cache-Control 的 no-store / no-cache / max-age、Expires，都没有时使用 default_ttl；
+    减去 Age 头表示的已缓存时间。
+
+    Args:
+        headers: 响应头
+        default_ttl: 响应没有指定有效期时使用的有效期（秒）
+        now: 当前时间戳，默认 time.time()
+
+    Returns:
+        Optional[float]: 有效期（秒），为 0 时每次使用前都要确认；不能缓存时返回 None
+    """
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+
+    lifetime = None
+    max_age = directives.get('max-age')
+    if max_age is not None:
+        try:
+            lifetime = float(max_age)
+        except ValueError:
+            lifetime = 0.0
+    elif headers.get('Expires'):
+        try:
+            expires = parsedate_to_datetime(headers['Expires']).timestamp()
+            date = parsedate_to_datetime(headers['Date']).timestamp() if headers.get('Date') else None
+        except (TypeError, ValueError):
+            # 无效的 Expires（如 0）表示已过期
+            lifetime = 0.0
+        else:
+            lifetime = expires - (date if date is not None else (now if now is not None else time.time()))
+    if lifetime is None:
+        lifetime = default_ttl
+
+    try:
+        age = float(headers.get('Age') or 0)
+    except ValueError:
+        age = 0.0
+    return max(0.0, lifetime - age)
+
+
+class HttpCache:
+    """
+    本地页面缓存
+
+    - 条目保存在 SQLite 文件中（内容、状态码、Content-Type、ETag、Last-Modified、过期时间）
+    - 总字节数超过 max_bytes 时淘汰最久未使用的条目，超过 max_entry_bytes 的内容不缓存
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = StorageConfig.PROXY_CACHE_FILE,
+        max_bytes: int = StorageConfig.PROXY_CACHE_MAX_BYTES,
+        max_entry_bytes: int = StorageConfig.PROXY_CACHE_MAX_ENTRY_BYTES,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: 缓存文件路径
+            max_bytes: 缓存内容的总字节数上限
+            max_entry_bytes: 单个条目的字节数上限
+            clock: 时间函数，便于测试
+        """
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_entry_bytes = min(int(max_entry_bytes), self.max_bytes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = {'stores': 0, 'evictions': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                content_type TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache (accessed_at)')
+        self._conn.commit()
+        self._bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        self._evict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存（包括已过期的条目，由调用方决定是否向源站确认）
+
+        Returns:
+            Optional[Dict[str, Any]]: url / status / content_type / body / etag / last_modified / expires_at
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, content_type, body, etag, last_modified, expires_at FROM http_cache WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE http_cache SET accessed_at = ? WHERE key = ?', (self._clock(), key))
+            self._conn.commit()
+        url, status, content_type, body, etag, last_modified, expires_at = row
+        return {
+            'url': url,
+            'status': status,
+            'content_type': content_type,
+            'body': bytes(body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires_at': expires_at
+        }
+
+    def put(self, key: str, entry: Dict[str, Any]) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            entry: 同 get() 返回的字段
+
+        Returns:
+            bool: 是否写入（内容超过 max_entry_bytes 时不写入）
+        """
+        body = entry['body']
+        if len(body) > self.max_entry_bytes:
+            self.delete(key)
+            return False
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM http_cache WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO http_cache '
+                '(key, url, status, content_type, body, size, etag, last_modified, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key, entry['url'], entry['status'], entry.get('content_type'), body, len(body),
+                    entry.get('etag'), entry.get('last_modified'), entry['expires_at'], self._clock()
+                )
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            self._stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def refresh(self, key: str, expires_at: float) -> None:
+        """源站确认内容未变化后更新过期时间"""
+        with self._lock:
+            self._conn.execute('UPDATE http_cache SET expires_at = ? WHERE key = ?', (expires_at, key))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """删除条目"""
+        with self._lock:
+            row = self._conn.execute('SELECT size FROM http_cache WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self._conn.execute('DELETE FROM http_cache WHERE key = ?', (key,))
+                self._conn.commit()
+                self._bytes -= row[0]
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目直到总字节数不超过上限（调用方持有锁）"""
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT key, size FROM http_cache ORDER BY accessed_at LIMIT 50'
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM http_cache WHERE key = ?', (key,))
+                self._bytes -= size
+                self._stats['evictions'] += 1
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """条目数、总字节数、写入和淘汰次数"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM http_cache').fetchone()[0]
+            return dict(self._stats, entries=entries, bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def close(self) -> None:
+        """关闭缓存文件"""
+        with self._lock:
+            self._conn.close()
+
+
+class ProxyResponse:
+    """代理请求的结果"""
+
+    def __init__(self, status: int, content: bytes, content_type: str, url: str, cache_status: str):
+        self.status = status
+        self.content = content
+        self.content_type = content_type
+        self.url = url                    # 跟随跳转后的最终 URL
+        self.cache_status = cache_status  # CACHE_* 之一
+
+
+class ProxyClient:
+    """
+    预览代理客户端
+
+    所有请求共享同一个带连接池的 requests 会话。get() 先查缓存，新鲜时直接返回；
+    过期时带上 If-None-Match / If-Modified-Since 请求源站，304 时沿用缓存内容；
+    源站请求失败时返回过期内容。同一页面的并发请求只向源站发送一次。
+    """
+
+    def __init__(
+        self,
+        cache: Optional[HttpCache] = None,
+        pool_size: int = StorageConfig.PROXY_POOL_SIZE,
+        timeout: float = StorageConfig.PROXY_TIMEOUT,
+        default_ttl: float = StorageConfig.PROXY_CACHE_DEFAULT_TTL,
+        max_retries: int = 2,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            cache: 页面缓存，为 None 时不缓存
+            pool_size: 每个主机保持的连接数
+            timeout: 请求超时时间（秒）
+            default_ttl: 响应没有指定有效期时的缓存有效期（秒）
+            max_retries: 连接失败时的重试次数
+            clock: 时间函数，便于测试
+        """
+        self.cache = cache
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+        self._outcomes = {status: 0 for status in (CACHE_HIT, CACHE_REVALIDATED, CACHE_MISS, CACHE_STALE, CACHE_BYPASS)}
+
+        retry = Retry(total=max_retries, connect=max_retries, read=False, redirect=False, status=False, backoff_factor=0.3)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.verify = False  # 忽略SSL证书验证
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        variant: str = '',
+        rewrite_html: Optional[Callable[[str, str], str]] = None
+    ) -> ProxyResponse:
+        """
+        获取页面
+
+        Args:
+            url: 页面 URL
+            headers: 请求头
+            variant: 缓存变体（请求头或改写方式不同的调用方使用不同的变体，如 desktop / mobile）
+            rewrite_html: HTML 改写函数 rewrite_html(html, 最终 URL)，缓存改写后的内容
+
+        Returns:
+            ProxyResponse: 结果，请求失败且没有缓存时抛出 requests.RequestException
+        """
+        if self.cache is None:
+            return self._count(self._fetch(url, headers, rewrite_html)[0])
+        key = f'{variant}|{normalize_cache_key(url)}'
+        response, shared = self._inflight.do_shared(key, lambda: self._get(key, url, headers, rewrite_html))
+        if shared:
+            # 等待其他请求获取的内容，对本请求而言相当于命中缓存
+            return self._count(ProxyResponse(response.status, response.content, response.content_type, response.url, CACHE_HIT))
+        return self._count(response)
+
+    def _count(self, response: ProxyResponse) -> ProxyResponse:
+        with self._lock:
+            self._outcomes[response.cache_status] += 1
+        return response
+
+    def _fetch(self, url, headers, rewrite_html, conditional=None):
+        """请求源站，返回 (结果, 原始响应)"""
+        response = self.session.get(
+            url,
+            headers={**(headers or {}), **(conditional or {})},
+            timeout=self.timeout,
+            allow_redirects=True
+        )
+        content_type = response.headers.get('Content-Type', 'text/html')
+        content = response.content
+        if response.status_code != 304 and rewrite_html is not None and 'text/html' in content_type.lower():
+            content = rewrite_html(response.text, response.url).encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        return ProxyResponse(response.status_code, content, content_type, response.url, CACHE_BYPASS), response
+
+    def _get(self, key, url, headers, rewrite_html) -> ProxyResponse:
+        now = self._clock()
+        entry = self.cache.get(key)
+        if entry is not None and entry['expires_at'] > now:
+            return self._from_entry(entry, CACHE_HIT)
+
+        conditional = {}
+        if entry is not None:
+            if entry['etag']:
+                conditional['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                conditional['If-Modified-Since'] = entry['last_modified']
+        try:
+            result, response = self._fetch(url, headers, rewrite_html, conditional)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            logger.warning(f"请求 {url} 失败，返回过期的缓存: {str(e)}")
+            return self._from_entry(entry, CACHE_STALE)
+
+        lifetime = freshness_lifetime(response.headers, self.default_ttl, now)
+        if entry is not None and response.status_code == 304:
+            self.cache.refresh(key, now + (lifetime or 0.0))
+            return self._from_entry(entry, CACHE_REVALIDATED)
+
+        result.cache_status = CACHE_MISS
+        if response.status_code == 200 and lifetime is not None:
+            self.cache.put(key, {
+                'url': result.url,
+                'status': result.status,
+                'content_type': result.content_type,
+                'body': result.content,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'expires_at': now + lifetime
+            })
+        elif entry is not None:
+            self.cache.delete(key)
+        return result
+
+    @staticmethod
+    def _from_entry(entry: Dict[str, Any], cache_status: str) -> ProxyResponse:
+        return ProxyResponse(entry['status'], entry['body'], entry['content_type'], entry['url'], cache_status)
+
+    def stats(self) -> Dict[str, Any]:
+        """各缓存状态的请求数、命中率（含 304 确认）和缓存统计"""
+        with self._lock:
+            outcomes = {status.lower(): count for status, count in self._outcomes.items()}
+        lookups = sum(outcomes.values()) - outcomes['bypass']
+        stats = dict(outcomes, requests=sum(outcomes.values()))
+        stats['hit_rate'] = (outcomes['hit'] + outcomes['revalidated'] + outcomes['stale']) / lookups if lookups else 0.0
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        return stats
+
+    def close(self) -> None:
+        """关闭会话和缓存"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_default_client: Optional[ProxyClient] = None
+_default_lock = threading.Lock()
+
+
+def get_proxy_client() -> ProxyClient:
+    """获取进程内共享的预览代理客户端"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ProxyClient(cache=HttpCache())
+        return _default_client
@@ -18,6 +18,9 @@ from PIL import Image
 import io
 
 from src.config import BrowserConfig
+from src.core.results.committer import get_results_committer
+from src.core.results.store import url_host
+from src.utils.screenshot_manifest import get_screenshot_manifest
 
 logger = logging.getLogger(__name__)
 
@@ -419,6 +422,8 @@ def save_screenshot(driver, url, save_path=None, domain=None):
             if os.path.exists(temp_png):
                 os.remove(temp_png)
         
+        # 更新截图清单（不在截图目录中的文件被忽略）
+        get_screenshot_manifest().record(save_path)
         return save_path
         
     except Exception as e:
@@ -458,7 +463,7 @@ def capture_screenshot(
         url (str): 要截图的网页URL
         driver: 可选的现有WebDriver实例
         mobile (bool): 是否使用移动端模式
-        update_results (bool): 是否更新结果文件，只在复用已有截图时有效
+        update_results (bool): 是否更新结果存储中的截图路径（异步提交，见 update_results_json）
         force_refresh (bool): 是否强制刷新截图，即使已存在也重新截图
     
     Returns:
@@ -520,45 +525,31 @@ def _wait_for_page_by_url(driver, url: str):
 
 def update_results_json(url: str, screenshot_filename: str) -> bool:
     """
-    更新 all_results.json 中的截图路径
+    更新结果存储中同一域名记录的截图路径
+    
+    更新只放入结果写入线程的队列，由写入线程按批次异步提交，返回时尚未写入数据库；
+    需要确认写入时调用 get_results_committer().flush()
     
     Args:
         url: 网页URL
         screenshot_filename: 新的截图文件名
         
     Returns:
-        bool: 是否更新成功
+        bool: 是否已放入写入队列（不表示存在该域名的记录或已经写入）
     """
     try:
-        # 读取现有数据
-        with open('all_results.json', 'r', encoding='utf-8') as f:
-            results = json.load(f)
-        
-        # 获取当前URL的域名
-        current_domain = extract_domain(url)
+        # 获取当前URL的主机名
+        host = url_host(url)
         
         # 如果 screenshot_filename 是元组，只取文件名部分
         if isinstance(screenshot_filename, (list, tuple)):
             screenshot_filename = screenshot_filename[1]
         
-        # 更新截图路径
-        updated = False
-        for result in results:
-            # 使用域名匹配而不是完整URL匹配
-            if extract_domain(result.get('final_url', '')) == current_domain:
-                result['screenshot_path'] = screenshot_filename
-                updated = True
-        
-        if updated:
-            # 保存更新后的数据
-            with open('all_results.json', 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
-            logger.info(f"已更新 all_results.json 中的截图路径: {screenshot_filename}")
-            return True
-            
-        logger.warning(f"未找到匹配的域名记录: {current_domain}")
-        return False
+        # 使用域名匹配而不是完整URL匹配
+        get_results_committer().set_screenshot(host, screenshot_filename)
+        logger.info(f"截图路径更新已加入写入队列: {screenshot_filename}")
+        return True
         
     except Exception as e:
-        logger.error(f"更新 all_results.json 失败: {str(e)}")
-        return False
\ No newline at end of file
+        logger.error(f"更新截图路径失败: {str(e)}")
+        return False
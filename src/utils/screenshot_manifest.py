@@ -0,0 +1,251 @@
+"""
+截图清单模块：维护截图目录的索引（键 -> 文件名、大小、修改时间、尺寸），按落地页 URL 直接查找截图，
+不需要每次扫描目录；save_screenshot 写入后更新清单，后台线程在目录变化时重新核对
+"""
+import os
+import re
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urlparse
+
+from src.config import StorageConfig
+from src.core.results.serialization import FORMAT_COMPACT, dump_results, load_results
+
+try:
+    from PIL import Image
+except ImportError:  # 没有安装 Pillow 时不记录尺寸
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# 清单文件，保存在截图目录中（以点开头，不会被当作截图）
+MANIFEST_FILE = '.manifest.json'
+
+SCREENSHOT_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def screenshot_key(url_or_name: str) -> str:
+    """
+    截图的键：与 capture_screenshot 生成文件名的规则一致（主机名去掉非单词字符），
+    传入文件名时取去掉扩展名后的部分
+
+    Args:
+        url_or_name: 落地页 URL 或截图文件名
+
+    Returns:
+        str: 小写的键
+    """
+    if '://' in url_or_name:
+        host = urlparse(url_or_name).netloc or url_or_name[:50]
+    else:
+        host = os.path.splitext(os.path.basename(url_or_name))[0]
+    return re.sub(r'[^\w\-_]', '', host).lower()
+
+
+class ScreenshotManifest:
+    """
+    截图清单
+
+    - lookup() / filename_for() 按 URL 查找截图，只做字典查找
+    - record() 在保存截图后更新单个文件的条目
+    - refresh() 扫描目录核对清单（新增、修改、删除的文件），只读取变化的文件的尺寸
+    - start_watching() 启动后台线程，目录的修改时间变化时调用 refresh()，
+      其他进程（如爬取进程）保存的截图也能被发现
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = StorageConfig.SCREENSHOTS_DIR,
+        watch_interval: float = StorageConfig.SCREENSHOT_WATCH_INTERVAL
+    ):
+        """
+        Args:
+            directory: 截图目录
+            watch_interval: 后台线程检查目录变化的间隔（秒）
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_FILE
+        self.watch_interval = watch_interval
+        self.version = 0  # 清单每次变化时加一，可用于判断依赖截图的缓存是否过期
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._dir_mtime: Optional[int] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._load()
+        self.refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            data = load_results(self.path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"读取截图清单失败，将重新扫描: {str(e)}")
+            return
+        if isinstance(data, dict):
+            self._entries = {key: entry for key, entry in data.items() if isinstance(entry, dict) and entry.get('file')}
+
+    def _save(self) -> None:
+        try:
+            dump_results(self._entries, self.path, fmt=FORMAT_COMPACT, fsync=False)
+        except OSError as e:
+            logger.warning(f"保存截图清单失败: {str(e)}")
+
+    @staticmethod
+    def _describe(path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        entry = {'file': path.name, 'size': stat.st_size, 'mtime': stat.st_mtime, 'width': None, 'height': None}
+        if Image is not None:
+            try:
+                # 只读取文件头，不解码图片
+                with Image.open(path) as img:
+                    entry['width'], entry['height'] = img.size
+            except Exception:
+                pass
+        return entry
+
+    def _put(self, entry: Dict[str, Any]) -> bool:
+        """写入条目，同一键有多个文件（如 .jpg 和 .png）时保留最新的"""
+        key = screenshot_key(entry['file'])
+        current = self._entries.get(key)
+        if current == entry:
+            return False
+        if current is not None and current['file'] != entry['file'] and current['mtime'] > entry['mtime']:
+            if (self.directory / current['file']).exists():
+                return False
+        self._entries[key] = entry
+        return True
+
+    def record(self, path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        记录新保存的截图（save_screenshot 调用）
+
+        Args:
+            path: 截图文件路径，不在截图目录中的文件被忽略
+
+        Returns:
+            Optional[Dict[str, Any]]: 条目，文件不存在或不在截图目录中时返回 None
+        """
+        path = Path(path)
+        if path.resolve().parent != self.directory.resolve() or path.suffix.lower() not in SCREENSHOT_SUFFIXES:
+            return None
+        try:
+            entry = self._describe(path, path.stat())
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if self._put(entry):
+                self.version += 1
+                self._save()
+        return entry
+
+    def refresh(self) -> bool:
+        """
+        扫描截图目录核对清单
+
+        Returns:
+            bool: 清单是否变化
+        """
+        try:
+            dir_mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+
+        with self._lock:
+            self._dir_mtime = dir_mtime
+            by_file = {entry['file']: entry for entry in self._entries.values()}
+            seen = set()
+            changed = False
+            if dir_mtime is not None:
+                with os.scandir(self.directory) as entries:
+                    for dir_entry in entries:
+                        name = dir_entry.name
+                        if name.startswith('.') or not name.lower().endswith(SCREENSHOT_SUFFIXES):
+                            continue
+                        try:
+                            stat = dir_entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        seen.add(name)
+                        current = by_file.get(name)
+                        if current is not None and current['size'] == stat.st_size and current['mtime'] == stat.st_mtime:
+                            continue
+                        changed |= self._put(self._describe(Path(dir_entry.path), stat))
+
+            for key in [key for key, entry in self._entries.items() if entry['file'] not in seen]:
+                del self._entries[key]
+                changed = True
+            if changed:
+                self.version += 1
+                self._save()
+            return changed
+
+    def lookup(self, url_or_name: str) -> Optional[Dict[str, Any]]:
+        """
+        按落地页 URL（或截图文件名）查找截图条目，找不到时再尝试加上或去掉 www 前缀
+
+        Returns:
+            Optional[Dict[str, Any]]: file / size / mtime / width / height
+        """
+        if not url_or_name:
+            return None
+        key = screenshot_key(url_or_name)
+        alternate = key[3:] if key.startswith('www') else 'www' + key
+        with self._lock:
+            entry = self._entries.get(key) or self._entries.get(alternate)
+            return dict(entry) if entry is not None else None
+
+    def filename_for(self, url: str) -> Optional[str]:
+        """落地页 URL 对应的截图文件名，没有截图时返回 None"""
+        entry = self.lookup(url)
+        return entry['file'] if entry is not None else None
+
+    # ---------- 目录监视 ----------
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            try:
+                dir_mtime = self.directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime = None
+            if dir_mtime != self._dir_mtime:
+                try:
+                    if self.refresh():
+                        logger.info(f"截图清单已更新: {len(self)} 个截图")
+                except Exception as e:
+                    logger.error(f"刷新截图清单失败: {str(e)}")
+
+    def start_watching(self) -> 'ScreenshotManifest':
+        """启动后台线程监视截图目录（重复调用无影响）"""
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._stop.clear()
+                self._watcher = threading.Thread(target=self._watch, name='screenshot-manifest', daemon=True)
+                self._watcher.start()
+        return self
+
+    def stop_watching(self) -> None:
+        """停止后台线程"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+_default_manifest: Optional[ScreenshotManifest] = None
+_default_lock = threading.Lock()
+
+
+def get_screenshot_manifest() -> ScreenshotManifest:
+    """获取进程内共享的截图清单"""
+    global _default_manifest
+    with _default_lock:
+        if _default_manifest is None:
+            _default_manifest = ScreenshotManifest()
+        return _default_manifest
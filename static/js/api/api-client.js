@@ -92,9 +92,9 @@ const ApiClient = {
         };
     },
 
-    // 获取最新结果
-    async fetchLatestResults() {
-        return await this.request('/latest');
+    // 获取最新结果（params: market / keyword / q / since / until / sort / cursor / limit）
+    async fetchLatestResults(params) {
+        return await this.request('/latest' + (params ? '?' + new URLSearchParams(params) : ''));
     },
 
     // 获取关键词列表
@@ -0,0 +1,22 @@
+"""
+测试共用的 fixture
+"""
+import pytest
+from tests.helpers import create_store
+
+@pytest.fixture
+def make_store():
+    """
+    创建内存结果存储的工厂，每个测试传入自己的结果记录：make_store(RESULTS)，
+    测试结束时关闭创建的存储
+    """
+    stores = []
+
+    def factory(results=()):
+        store = create_store(results)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.close()
@@ -0,0 +1,10 @@
+"""
+测试共用的辅助函数
+"""
+from src.core.results.store import ResultStore
+
+def create_store(results=()):
+    """创建内存结果存储并写入结果记录"""
+    store = ResultStore(None)
+    store.insert_many(results)
+    return store
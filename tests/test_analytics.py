@@ -0,0 +1,183 @@
+"""
+关键词记录分析导出测试
+"""
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from src.core.results.store import ResultStore
+from src.core.results.index import DomainIndex
+from src.core.results.analytics import FORMAT_NPZ, KeywordRecordExporter, dictionary_encode, parse_timestamps
+from src.core.results.serialization import FORMAT_JSON, dump_results
+from tests.helpers import create_store
+
+# 包含两个域名的结果记录
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'final_url': 'https://a.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A'},
+            {'timestamp': '2024-01-02T00:00:00.500000', 'market': 'gh', 'keyword': 'shoes', 'title': 'A'},
+        ]
+    },
+    {
+        'domain': 'b.com',
+        'final_url': 'https://b.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-03T00:00:00', 'market': 'in', 'keyword': 'boots', 'title': None},
+        ]
+    },
+]
+
+def test_encoding_helpers():
+    """测试字典编码和时间解析"""
+    print("\n测试编码:")
+
+    codes, dictionary = dictionary_encode(['in', 'gh', 'in', None])
+    assert codes.dtype == np.int32 and codes.tolist() == [0, 1, 0, 2]
+    assert dictionary.tolist() == ['in', 'gh', '']
+
+    ts = parse_timestamps(['2024-01-01T00:00:00.123456', '', None, 'not a date'])
+    assert ts.dtype == np.dtype('datetime64[us]')
+    assert str(ts[0]) == '2024-01-01T00:00:00.123456'
+    assert np.isnat(ts[1:]).all()
+    print("✓ 编码测试通过")
+
+def test_incremental_export(make_store):
+    """测试增量导出只追加水位线之后的记录"""
+    print("\n测试增量导出:")
+
+    store = make_store(RESULTS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exporter = KeywordRecordExporter(store, out_dir=tmpdir, fmt=FORMAT_NPZ, part_rows=2)
+
+        stats = exporter.export()
+        assert stats['rows'] == 3 and len(stats['parts']) == 2
+        assert stats['watermark'] == 3, "水位线为已导出记录的最大提交序号"
+
+        # 没有新记录时不生成分片
+        assert exporter.export()['rows'] == 0
+        assert len(exporter.manifest()['parts']) == 2
+
+        page_id, _ = store.find_one('domain', 'a.com')
+        store.add_keyword_record(page_id, {'timestamp': '2024-02-01T00:00:00', 'market': 'ke', 'keyword': 'hats', 'title': 'H'})
+        stats = exporter.export()
+        assert stats['rows'] == 1 and stats['previous_watermark'] == 3
+
+        # 后提交但 timestamp 早于已导出记录的记录（如合并的旧结果）同样导出
+        store.insert({'domain': 'c.com', 'final_url': 'https://c.com/', 'keyword_records': [
+            {'timestamp': '2023-06-01T00:00:00', 'market': 'in', 'keyword': 'socks', 'title': 'C'}
+        ]})
+        assert exporter.export()['rows'] == 1
+
+        frame = exporter.read()
+        assert list(frame.columns) == ['timestamp', 'market', 'keyword', 'title', 'domain']
+        assert len(frame) == 5
+        assert str(frame['market'].dtype) == 'category'
+        assert frame['timestamp'].dtype == np.dtype('datetime64[us]')
+        assert frame['keyword'].tolist() == ['shoes', 'shoes', 'boots', 'hats', 'socks']
+        assert frame['domain'].tolist() == ['a.com', 'a.com', 'b.com', 'a.com', 'c.com']
+        assert frame['title'].tolist()[2] == ''
+
+        # 修改过的关键词记录再次导出
+        store.add_keyword_record(page_id, {'timestamp': '2024-03-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A2'})
+        stats = exporter.export()
+        assert stats['rows'] == 1 and stats['watermark'] == 6
+
+        # 全部重新导出
+        stats = exporter.export(full=True)
+        assert stats['rows'] == 5 and stats['total_rows'] == 5
+        assert sorted(f for f in os.listdir(tmpdir) if f.startswith('part-')) == ['part-00001.npz', 'part-00002.npz', 'part-00003.npz']
+    print("✓ 增量导出测试通过")
+
+def test_update_exports_changed_rows_only(make_store):
+    """测试整体替换落地页记录后只再次导出变化的关键词记录"""
+    print("\n测试替换记录后增量导出:")
+
+    store = make_store(RESULTS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exporter = KeywordRecordExporter(store, out_dir=tmpdir, fmt=FORMAT_NPZ)
+        assert exporter.export()['rows'] == 3
+
+        # 添加一个关键词（DomainIndex 写回时整体替换记录）
+        index = DomainIndex(store).load()
+        index.add_keyword_record('a.com', {'timestamp': '2024-02-01T00:00:00', 'market': 'ke', 'keyword': 'hats', 'title': 'H'})
+        index.flush()
+        stats = exporter.export()
+        assert stats['rows'] == 1, "只导出新添加的关键词记录"
+
+        # 调整次序不再次导出，修改标题只导出修改的记录
+        page_id, record = store.find_one('domain', 'a.com')
+        record['keyword_records'].reverse()
+        store.update(page_id, record)
+        assert exporter.export()['rows'] == 0
+        record['keyword_records'][0]['title'] = 'H2'
+        store.update(page_id, record)
+        assert exporter.export()['rows'] == 1
+        assert [r['keyword'] for r in store.get(page_id)['keyword_records']] == ['shoes', 'shoes', 'hats']
+
+        # 删除的记录不再出现在存储中
+        record['keyword_records'].pop()
+        store.update(page_id, record)
+        assert len(store.get(page_id)['keyword_records']) == 2
+    print("✓ 替换记录后增量导出测试通过")
+
+def test_legacy_store_and_manifest():
+    """测试没有提交序号的旧数据库和以时间为水位线的旧清单"""
+    print("\n测试旧版本数据:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, 'results.db')
+        store = ResultStore(db_path, json_path=None)
+        store.insert_many(RESULTS)
+        store.close()
+
+        # 模拟旧版本的数据库结构
+        conn = sqlite3.connect(db_path)
+        conn.execute('DROP INDEX idx_keywords_updated_seq')
+        conn.execute('ALTER TABLE keyword_records DROP COLUMN updated_seq')
+        conn.execute('DROP TABLE sequences')
+        conn.commit()
+        conn.close()
+
+        store = ResultStore(db_path, json_path=None)
+        assert [row[-1] for row in store.iter_keyword_rows()] == [1, 2, 3], "已有记录按 id 编号"
+        page_id, _ = store.find_one('domain', 'b.com')
+        store.add_keyword_record(page_id, {'timestamp': '2024-02-01T00:00:00', 'market': 'gh', 'keyword': 'hats', 'title': 'H'})
+        assert [row[-1] for row in store.iter_keyword_rows(after_seq=3)] == [4]
+
+        out_dir = os.path.join(tmpdir, 'exports')
+        exporter = KeywordRecordExporter(store, out_dir=out_dir, fmt=FORMAT_NPZ)
+        exporter.export()
+        manifest = exporter.manifest()
+        manifest['watermark'] = '2024-01-03T00:00:00'
+        dump_results(manifest, exporter.manifest_path, fmt=FORMAT_JSON)
+        stats = exporter.export()
+        assert stats['rows'] == 4 and stats['total_rows'] == 4 and stats['watermark'] == 4
+        store.close()
+    print("✓ 旧版本数据测试通过")
+
+def test_read_empty_export():
+    """测试没有导出过时读取"""
+    print("\n测试读取空导出:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        frame = KeywordRecordExporter(ResultStore(None), out_dir=tmpdir, fmt=FORMAT_NPZ).read()
+        assert len(frame) == 0 and list(frame.columns) == ['timestamp', 'market', 'keyword', 'title', 'domain']
+    print("✓ 读取空导出测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试关键词记录分析导出...")
+
+    test_encoding_helpers()
+    test_incremental_export(create_store)
+    test_update_exports_changed_rows_only(create_store)
+    test_legacy_store_and_manifest()
+    test_read_empty_export()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+关键词记录归档测试
+"""
+from datetime import datetime
+from src.core.results.archive import KeywordArchive, archive_table
+from tests.helpers import create_store
+
+# 包含跨越多个月份关键词记录的结果记录
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'final_url': 'https://a.com/',
+        'keyword_records': [
+            {'timestamp': '2024-06-01T00:00:00', 'market': 'in', 'keyword': 'recent', 'title': 'R'},
+            {'timestamp': '2024-02-10T00:00:00', 'market': 'in', 'keyword': 'feb', 'title': 'F'},
+            {'timestamp': '2024-01-05T00:00:00', 'market': 'gh', 'keyword': 'jan', 'title': 'J', 'rank': 2},
+        ]
+    },
+    {
+        'domain': 'b.com',
+        'final_url': 'https://b.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-20T00:00:00', 'market': 'in', 'keyword': 'old', 'title': 'O'},
+            {'timestamp': None, 'market': 'in', 'keyword': 'undated', 'title': 'U'},
+        ]
+    },
+]
+
+def test_archive_table_name():
+    """测试归档表名"""
+    print("\n测试归档表名:")
+
+    assert archive_table('2024-01') == 'keyword_archive_2024_01'
+    for month in ('2024-1', '2024-01; DROP TABLE x', ''):
+        try:
+            archive_table(month)
+        except ValueError:
+            continue
+        raise AssertionError(f"应拒绝无效月份: {month}")
+    print("✓ 归档表名测试通过")
+
+def test_archive_moves_old_records(make_store):
+    """测试归档旧记录并在落地页记录中累计汇总"""
+    print("\n测试归档:")
+
+    store = make_store(RESULTS)
+    archive = KeywordArchive(store, hot_days=90)
+    assert archive.horizon(datetime(2024, 6, 1)) == '2024-03-03T00:00:00'
+
+    stats = archive.archive(before='2024-03-01T00:00:00')
+    assert stats['rows'] == 3 and stats['pages'] == 2
+    assert archive.months() == ['2024-01', '2024-02']
+
+    record = store.find_one('domain', 'a.com')[1]
+    assert [r['keyword'] for r in record['keyword_records']] == ['recent']
+    assert record['keyword_archive'] == {
+        'count': 2,
+        'first_timestamp': '2024-01-05T00:00:00',
+        'last_timestamp': '2024-02-10T00:00:00',
+        'months': ['2024-01', '2024-02']
+    }
+    # 没有时间的记录保留在落地页记录中
+    assert [r['keyword'] for r in store.find_one('domain', 'b.com')[1]['keyword_records']] == ['undated']
+
+    # 再次归档时累计汇总
+    stats = archive.archive(before='2024-07-01T00:00:00')
+    assert stats['rows'] == 1
+    summary = store.find_one('domain', 'a.com')[1]['keyword_archive']
+    assert summary['count'] == 3 and summary['months'] == ['2024-01', '2024-02', '2024-06']
+    assert archive.archive(before='2024-07-01T00:00:00')['rows'] == 0
+    print("✓ 归档测试通过")
+
+def test_history_reads_archive_lazily(make_store):
+    """测试历史查询合并近期记录和归档记录，并按时间范围只读取相关月份"""
+    print("\n测试历史查询:")
+
+    store = make_store(RESULTS)
+    archive = KeywordArchive(store)
+    archive.archive(before='2024-03-01T00:00:00')
+
+    history = archive.history('a.com')
+    assert [r['keyword'] for r in history] == ['recent', 'feb', 'jan']
+    assert 'archived' not in history[0] and history[1]['archived']
+    assert history[2]['rank'] == 2, "额外字段应随归档保留"
+
+    assert [r['keyword'] for r in archive.history('a.com', since='2024-02-01')] == ['recent', 'feb']
+    assert [r['keyword'] for r in archive.history('a.com', until='2024-02-01')] == ['jan']
+
+    # since 之前的月份表不会被读取
+    queried = []
+    original_query = store.query
+    store.query = lambda sql, params=(): queried.append(sql) or original_query(sql, params)
+    list(archive.iter_records('a.com', since='2024-02-01'))
+    assert not any('keyword_archive_2024_01' in sql for sql in queried)
+    print("✓ 历史查询测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试关键词记录归档...")
+
+    test_archive_table_name()
+    test_archive_moves_old_records(create_store)
+    test_history_reads_archive_lazily(create_store)
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
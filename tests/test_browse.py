@@ -0,0 +1,124 @@
+"""
+结果浏览查询测试
+"""
+from src.core.results.browse import SORT_DOMAIN, SORT_OLDEST, browse_results, decode_cursor, encode_cursor
+from tests.helpers import create_store
+
+# 包含多个市场和关键词的结果记录
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'timestamp': '2024-01-05T00:00:00',
+        'final_url': 'https://a.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'Cheap Shoes'},
+            {'timestamp': '2024-01-05T00:00:00', 'market': 'gh', 'keyword': 'boots', 'title': 'Boots 100%'},
+        ]
+    },
+    {
+        'domain': 'b.com',
+        'timestamp': '2024-01-03T00:00:00',
+        'final_url': 'https://b.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-03T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'B Shoes'},
+        ]
+    },
+    {
+        'domain': 'c.com',
+        'timestamp': '2024-01-04T00:00:00',
+        'final_url': 'https://c.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-04T00:00:00', 'market': 'in', 'keyword': 'hats', 'title': 'Hats'},
+        ]
+    },
+]
+
+def test_filters(make_store):
+    """测试按市场、关键词、文本和时间范围筛选"""
+    print("\n测试筛选:")
+
+    store = make_store(RESULTS)
+    page = browse_results(store)
+    assert [r['domain'] for r in page['results']] == ['a.com', 'c.com', 'b.com']
+    assert page['total'] == 3 and page['markets'] == ['gh', 'in']
+    assert page['last_updated'] == '2024-01-05T00:00:00'
+    assert page['next_cursor'] is None
+
+    # 只返回匹配的关键词记录
+    page = browse_results(store, market='in')
+    assert [r['domain'] for r in page['results']] == ['a.com', 'c.com', 'b.com']
+    assert [k['keyword'] for k in page['results'][0]['keyword_records']] == ['shoes']
+
+    assert [r['domain'] for r in browse_results(store, keyword='shoes')['results']] == ['a.com', 'b.com']
+    assert [r['domain'] for r in browse_results(store, q='SHOES')['results']] == ['a.com', 'b.com']
+    # 文本通过搜索索引匹配：英文按前缀，所有词都需匹配，没有可搜索的词时不筛选
+    assert [r['domain'] for r in browse_results(store, q='hat')['results']] == ['c.com']
+    assert [r['domain'] for r in browse_results(store, q='boots 100%')['results']] == ['a.com']
+    assert browse_results(store, q='shoes hats')['total'] == 0
+    assert browse_results(store, market='in', q='shoes')['total'] == 2
+    assert browse_results(store, q='%_')['total'] == 3
+
+    page = browse_results(store, since='2024-01-02', until='2024-01-04T00:00:00')
+    assert [r['domain'] for r in page['results']] == ['b.com'] and page['total'] == 1
+    print("✓ 筛选测试通过")
+
+def test_pages_without_keyword_records(make_store):
+    """测试关键词记录已归档的落地页仍然返回"""
+    print("\n测试没有关键词记录的落地页:")
+
+    store = make_store(RESULTS)
+    store.insert({'domain': 'old.com', 'timestamp': '2023-01-01T00:00:00', 'final_url': 'https://old.com/', 'keyword_records': []})
+    page = browse_results(store)
+    assert [r['domain'] for r in page['results']] == ['a.com', 'c.com', 'b.com', 'old.com']
+    assert page['total'] == 4 and page['results'][3]['keyword_records'] == []
+    assert [r['domain'] for r in browse_results(store, q='old')['results']] == ['old.com']
+    # 按关键词记录筛选时不返回
+    assert browse_results(store, market='in')['total'] == 3
+    print("✓ 没有关键词记录的落地页测试通过")
+
+def test_cursor_pagination(make_store):
+    """测试游标分页和排序"""
+    print("\n测试分页:")
+
+    store = make_store(RESULTS)
+    for sort, expected in ((None, ['a.com', 'c.com', 'b.com']),
+                           (SORT_OLDEST, ['b.com', 'c.com', 'a.com']),
+                           (SORT_DOMAIN, ['a.com', 'b.com', 'c.com'])):
+        kwargs = {'sort': sort} if sort else {}
+        seen, cursor = [], None
+        while True:
+            page = browse_results(store, cursor=cursor, limit=2, **kwargs)
+            seen.extend(r['domain'] for r in page['results'])
+            assert ('total' in page) == (cursor is None), "只有第一页返回总数"
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert seen == expected, f"{sort}: {seen}"
+
+    assert decode_cursor(encode_cursor('2024-01-01T00:00:00', 7)) == ('2024-01-01T00:00:00', 7)
+    for bad in ('not-a-cursor', encode_cursor('x', 1)[:-2]):
+        try:
+            browse_results(store, cursor=bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"应拒绝无效游标: {bad}")
+    try:
+        browse_results(store, sort='random')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应拒绝未知的排序方式")
+    print("✓ 分页测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试结果浏览查询...")
+
+    test_filters(create_store)
+    test_pages_without_keyword_records(create_store)
+    test_cursor_pagination(create_store)
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
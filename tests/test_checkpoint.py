@@ -0,0 +1,94 @@
+"""
+爬取检查点模块测试
+"""
+import json
+import os
+import tempfile
+import time
+from src.core.crawler.checkpoint import CrawlCheckpoint, merge_unit_results
+
+def make_record(domain, keyword, market, timestamp='2024-01-01T00:00:00'):
+    """创建测试记录"""
+    return {
+        'domain': domain,
+        'final_url': f'https://{domain}/',
+        'screenshot_path': f'{domain}.png',
+        'timestamp': timestamp,
+        'keyword_records': [{'timestamp': timestamp, 'market': market, 'keyword': keyword, 'title': 'Ad'}]
+    }
+
+def test_resume_skips_completed_units():
+    """测试恢复时跳过已完成的任务"""
+    print("\n测试检查点恢复:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'checkpoint.jsonl')
+
+        checkpoint = CrawlCheckpoint(path).open()
+        assert not checkpoint.resumed
+        checkpoint.record('shoes', 'in', [make_record('a.com', 'shoes', 'in')])
+        checkpoint.record('shoes', 'GH', [])
+        checkpoint.close()
+
+        # 模拟中断时写了一半的记录
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "unit", "keyword": "ha')
+
+        resumed = CrawlCheckpoint(path).open()
+        assert resumed.resumed
+        assert resumed.is_done('shoes', 'in') and resumed.is_done('shoes', 'gh')
+        assert not resumed.is_done('hats', 'in')
+
+        resumed.record('hats', 'in', [make_record('b.com', 'hats', 'in')])
+        resumed.close()
+
+        domains = [record['domain'] for record in CrawlCheckpoint(path).open().results()]
+        assert domains == ['a.com', 'b.com']
+    print("✓ 检查点恢复测试通过")
+
+def test_expired_and_finished_checkpoint():
+    """测试过期和完成后的检查点"""
+    print("\n测试检查点过期和删除:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'checkpoint.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'run', 'started_at': time.time() - 7200}) + '\n')
+            f.write(json.dumps({'type': 'unit', 'keyword': 'old', 'market': 'in', 'results': []}) + '\n')
+
+        checkpoint = CrawlCheckpoint(path, max_age=3600).open()
+        assert not checkpoint.resumed
+        assert not checkpoint.is_done('old', 'in'), "过期的检查点不应恢复"
+
+        checkpoint.finish()
+        assert not os.path.exists(path)
+    print("✓ 检查点过期和删除测试通过")
+
+def test_merge_unit_results():
+    """测试按域名合并各任务的结果"""
+    print("\n测试结果合并:")
+
+    merged = merge_unit_results(iter([
+        make_record('a.com', 'shoes', 'in', '2024-01-01T00:00:00'),
+        make_record('b.com', 'shoes', 'in'),
+        make_record('a.com', 'shoes', 'gh', '2024-01-02T00:00:00'),
+        make_record('a.com', 'shoes', 'gh', '2024-01-03T00:00:00'),
+    ]))
+
+    assert [record['domain'] for record in merged] == ['a.com', 'b.com']
+    assert [(r['keyword'], r['market']) for r in merged[0]['keyword_records']] == [('shoes', 'in'), ('shoes', 'gh')]
+    assert merged[0]['timestamp'] == '2024-01-03T00:00:00'
+    print("✓ 结果合并测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试爬取检查点模块...")
+
+    test_resume_skips_completed_units()
+    test_expired_and_finished_checkpoint()
+    test_merge_unit_results()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
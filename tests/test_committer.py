@@ -0,0 +1,202 @@
+"""
+结果写入线程测试
+"""
+import threading
+from src.core.results.index import DomainIndex
+from src.core.results.committer import ResultsCommitter
+from tests.helpers import create_store
+
+# 包含一个域名的结果记录
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'original_url': 'https://a.com/ad',
+        'final_url': 'https://a.com/',
+        'timestamp': '2024-01-01T00:00:00',
+        'keyword_records': [
+            {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A'},
+        ]
+    }
+]
+
+def test_mutations_applied_in_order(make_store):
+    """测试各类修改按提交顺序生效"""
+    print("\n测试修改生效:")
+
+    store = make_store(RESULTS)
+    committer = ResultsCommitter(store, batch_size=10, max_delay=0.05)
+    try:
+        # 已有记录：合并关键词记录并更新 final_url
+        committer.upsert({
+            'domain': 'a.com',
+            'original_url': 'https://a.com/ad',
+            'final_url': 'https://a.com/new',
+            'keyword_records': [
+                {'timestamp': '2024-02-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A'},
+                {'timestamp': '2024-02-01T00:00:00', 'market': 'gh', 'keyword': 'boots', 'title': 'B'},
+            ]
+        })
+        # 新记录
+        committer.upsert({
+            'domain': 'b.com',
+            'original_url': 'https://b.com/ad',
+            'final_url': 'https://b.com/',
+            'keyword_records': [{'timestamp': '2024-02-01T00:00:00', 'market': 'in', 'keyword': 'k', 'title': 'T'}]
+        })
+        committer.add_keyword_record('b.com', {'timestamp': '2024-03-01T00:00:00', 'market': 'in', 'keyword': 'k2', 'title': 'T2'})
+        committer.set_screenshot('b.com', 'b.png')
+        assert committer.flush(timeout=5)
+
+        record = store.find_one('domain', 'a.com')[1]
+        assert record['final_url'] == 'https://a.com/new'
+        assert [r['keyword'] for r in record['keyword_records']] == ['shoes', 'boots']
+
+        record = store.find_one('domain', 'b.com')[1]
+        assert [r['keyword'] for r in record['keyword_records']] == ['k2', 'k']
+        assert record['screenshot_path'] == 'b.png'
+
+        stats = committer.stats()
+        assert stats['events'] == 4 and stats['errors'] == 0
+        assert stats['pending'] == 0
+    finally:
+        committer.close()
+    print("✓ 修改生效测试通过")
+
+def test_failed_mutation_rolled_back(make_store):
+    """测试失败的修改整条撤销，同批次的其他修改照常提交"""
+    print("\n测试失败修改撤销:")
+
+    store = make_store(RESULTS)
+    page_id = store.find_one('domain', 'a.com')[0]
+    committer = ResultsCommitter(store, batch_size=10, max_delay=0.05)
+    try:
+        # 标题为列表，写入关键词记录时失败（此时旧的关键词记录已被删除）
+        committer.replace(page_id, {
+            'domain': 'a.com',
+            'original_url': 'https://a.com/ad',
+            'final_url': 'https://a.com/broken',
+            'keyword_records': [{'timestamp': '2024-02-01T00:00:00', 'market': 'in', 'keyword': 'x', 'title': ['bad']}]
+        })
+        committer.set_screenshot('a.com', 'a.png')
+        assert committer.flush(timeout=5)
+
+        record = store.find_one('domain', 'a.com')[1]
+        assert record['final_url'] == 'https://a.com/', "失败的替换不应部分生效"
+        assert [r['keyword'] for r in record['keyword_records']] == ['shoes']
+        assert record['screenshot_path'] == 'a.png'
+        assert committer.stats()['errors'] == 1
+    finally:
+        committer.close()
+    print("✓ 失败修改撤销测试通过")
+
+def test_batches_by_size(make_store):
+    """测试按批次大小提交并统计批次和延迟"""
+    print("\n测试按批次提交:")
+
+    store = make_store(RESULTS)
+    committer = ResultsCommitter(store, batch_size=5, max_delay=10)
+    try:
+        for i in range(12):
+            committer.add_keyword_record('a.com', {'timestamp': f'2024-05-{i + 1:02d}T00:00:00', 'market': 'in', 'keyword': f'k{i}', 'title': 'T'})
+        assert committer.flush(timeout=5)
+
+        stats = committer.stats()
+        assert stats['events'] == 12
+        # 两批满 5 条，剩余 2 条由 flush 提交
+        assert stats['batches'] == 3
+        assert stats['max_batch_size'] == 5
+        assert stats['avg_batch_size'] == 4.0
+        assert stats['max_latency'] >= stats['avg_latency'] >= 0
+        assert len(store.find_one('domain', 'a.com')[1]['keyword_records']) == 13
+    finally:
+        committer.close()
+    print("✓ 按批次提交测试通过")
+
+def test_concurrent_writers(make_store):
+    """测试多个线程同时提交修改"""
+    print("\n测试多线程提交:")
+
+    store = make_store(RESULTS)
+    committer = ResultsCommitter(store, batch_size=50, max_delay=0.01)
+
+    def worker(n):
+        for i in range(20):
+            committer.upsert({
+                'domain': f'd{n}-{i}.com',
+                'original_url': f'https://d{n}-{i}.com/ad',
+                'keyword_records': [{'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'k', 'title': 'T'}]
+            })
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    committer.close()
+
+    assert store.count() == 81
+    assert committer.stats()['events'] == 80
+    print("✓ 多线程提交测试通过")
+
+def test_domain_index_flush_through_committer(make_store):
+    """测试域名索引通过写入线程写回，同一记录在一批中只写一次"""
+    print("\n测试域名索引写回:")
+
+    store = make_store(RESULTS)
+    committer = ResultsCommitter(store, batch_size=100, max_delay=10)
+    index = DomainIndex(store, committer=committer).load()
+    try:
+        index.add_keyword_record('a.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k1', 'title': 'T'})
+        assert index.flush() == 1
+        # 写回后在内存中继续修改，不影响已放入队列的副本
+        index.add_keyword_record('a.com', {'timestamp': '2024-05-02T00:00:00', 'market': 'in', 'keyword': 'k2', 'title': 'T'})
+        assert index.flush() == 1
+        assert committer.flush(timeout=5)
+
+        record = store.find_one('domain', 'a.com')[1]
+        assert [r['keyword'] for r in record['keyword_records']] == ['k2', 'k1', 'shoes']
+        stats = committer.stats()
+        assert stats['events'] == 2 and stats['batches'] == 1
+    finally:
+        committer.close()
+    print("✓ 域名索引写回测试通过")
+
+def test_domain_index_flush_keeps_other_changes(make_store):
+    """测试域名索引写回不覆盖爬取期间的截图更新和删除"""
+    print("\n测试域名索引写回保留其他修改:")
+
+    store = make_store(RESULTS + [{'domain': 'b.com', 'final_url': 'https://b.com/', 'keyword_records': []}])
+    committer = ResultsCommitter(store, batch_size=100, max_delay=0.05)
+    index = DomainIndex(store, committer=committer).load()
+    try:
+        index.add_keyword_record('a.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k1', 'title': 'T'})
+        index.add_keyword_record('b.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k1', 'title': 'T'})
+        # 加载索引之后通过其他途径修改：更新截图、删除记录
+        committer.set_screenshot('a.com', 'screenshots/a.png')
+        store.delete('domain', 'b.com')
+        index.flush()
+        assert committer.flush(timeout=5)
+
+        record = store.find_one('domain', 'a.com')[1]
+        assert record['screenshot_path'] == 'screenshots/a.png'
+        assert [r['keyword'] for r in record['keyword_records']] == ['k1', 'shoes']
+        assert store.domains() == {'a.com'}, "已删除的记录不应被写回"
+    finally:
+        committer.close()
+    print("✓ 域名索引写回保留其他修改测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试结果写入线程...")
+
+    test_mutations_applied_in_order(create_store)
+    test_failed_mutation_rolled_back(create_store)
+    test_batches_by_size(create_store)
+    test_concurrent_writers(create_store)
+    test_domain_index_flush_through_committer(create_store)
+    test_domain_index_flush_keeps_other_changes(create_store)
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
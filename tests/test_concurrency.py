@@ -0,0 +1,136 @@
+"""
+自适应并发模块测试
+"""
+import threading
+import time
+from src.core.crawler.concurrency import AdaptiveConcurrency, available_memory_mb
+
+def make_controller(memory=8192, **kwargs):
+    """创建使用固定可用内存的控制器"""
+    options = dict(
+        min_limit=1, max_limit=6, initial=3, target_latency=10,
+        max_error_rate=0.2, min_free_memory_mb=1024, window=2,
+        memory_probe=lambda: memory
+    )
+    options.update(kwargs)
+    return AdaptiveConcurrency(**options)
+
+def run(controller, outcome='ok'):
+    """完成一次处理"""
+    with controller.slot() as slot:
+        slot.outcome = outcome
+
+def test_increase_when_healthy():
+    """测试运行正常时逐步提高并发"""
+    print("\n测试并发提升:")
+
+    controller = make_controller()
+    for _ in range(20):
+        run(controller)
+
+    assert controller.limit == 6, "不应超过最大并发数"
+    assert [a['to'] for a in controller.stats()['adjustments']] == [4, 5, 6]
+    print(f"✓ 并发提升到 {controller.limit}")
+
+def test_decrease_on_blocked_and_errors():
+    """测试出现拦截或失败时减半"""
+    print("\n测试拦截降并发:")
+
+    controller = make_controller(initial=6)
+    run(controller)
+    run(controller, 'blocked')
+    assert controller.limit == 3
+
+    run(controller, 'error')
+    run(controller, 'error')
+    assert controller.limit == 1
+
+    run(controller, 'blocked')
+    run(controller, 'blocked')
+    assert controller.limit == 1, "不应低于最小并发数"
+    print("✓ 拦截和失败时并发减半")
+
+def test_exception_counts_as_error():
+    """测试处理抛出异常时记为失败"""
+    print("\n测试异常记为失败:")
+
+    controller = make_controller(window=10)
+    try:
+        with controller.slot():
+            raise RuntimeError('driver crashed')
+    except RuntimeError:
+        pass
+
+    stats = controller.stats()
+    assert stats['outcomes']['error'] == 1
+    assert stats['in_flight'] == 0
+    print("✓ 异常记为失败并释放名额")
+
+def test_decrease_on_low_memory_and_latency():
+    """测试内存不足或耗时过长时降低并发"""
+    print("\n测试内存和耗时:")
+
+    controller = make_controller(memory=512)
+    run(controller)
+    run(controller)
+    assert controller.limit == 2
+    assert '可用内存' in controller.stats()['adjustments'][-1]['reason']
+
+    controller = make_controller(target_latency=0.01)
+    for _ in range(2):
+        with controller.slot():
+            time.sleep(0.02)
+    assert controller.limit == 2
+    assert '平均耗时' in controller.stats()['adjustments'][-1]['reason']
+    print("✓ 内存不足和耗时过长时降低并发")
+
+def test_limit_bounds_in_flight():
+    """测试同时处理的数量不超过当前上限"""
+    print("\n测试并发上限:")
+
+    controller = make_controller(initial=2, window=100)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def worker():
+        with controller.slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    print(f"✓ 最大同时处理数: {peak[0]}")
+
+def test_available_memory():
+    """测试获取可用内存"""
+    print("\n测试获取可用内存:")
+
+    memory = available_memory_mb()
+    assert memory is None or memory > 0
+    print(f"✓ 可用内存: {memory}")
+
+def main():
+    """运行所有测试"""
+    print("开始测试自适应并发模块...")
+
+    test_increase_when_healthy()
+    test_decrease_on_blocked_and_errors()
+    test_exception_counts_as_error()
+    test_decrease_on_low_memory_and_latency()
+    test_limit_bounds_in_flight()
+    test_available_memory()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
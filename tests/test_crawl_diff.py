@@ -0,0 +1,128 @@
+"""
+爬取差异测试
+"""
+import logging
+from types import SimpleNamespace
+from google_monitor import GoogleAdMonitor
+from src.core.crawler import CrawlUnit
+from src.core.results.store import ResultStore
+from src.core.results.diff import CHANGE_ADDED, CHANGE_REMOVED, CHANGE_TITLE, CrawlDiff
+
+def test_record_unit_changes():
+    """测试新出现、消失和标题变化的广告"""
+    print("\n测试爬取差异:")
+
+    crawl_diff = CrawlDiff(ResultStore(None))
+
+    run_id = crawl_diff.start_run()
+    counts = crawl_diff.record_unit(run_id, 'shoes', 'in', [('a.com', 'A'), ('b.com', 'B'), ('a.com', 'A2'), (None, 'X')])
+    assert counts == {CHANGE_ADDED: 2, CHANGE_REMOVED: 0, CHANGE_TITLE: 0}
+    crawl_diff.record_unit(run_id, 'shoes', 'gh', [('a.com', 'A')])
+    crawl_diff.finish_run(run_id)
+
+    second = crawl_diff.start_run()
+    assert second != run_id
+    counts = crawl_diff.record_unit(second, 'shoes', 'in', [('a.com', 'A new'), ('c.com', 'C')])
+    assert counts == {CHANGE_ADDED: 1, CHANGE_REMOVED: 1, CHANGE_TITLE: 1}
+    run = crawl_diff.finish_run(second)
+    assert run['units'] == 1 and run['added'] == 1 and run['finished_at']
+
+    changes = crawl_diff.changes(second)
+    assert [(c['domain'], c['change']) for c in changes] == [
+        ('a.com', CHANGE_TITLE), ('b.com', CHANGE_REMOVED), ('c.com', CHANGE_ADDED)
+    ]
+    assert changes[0]['old_title'] == 'A' and changes[0]['new_title'] == 'A new'
+    assert crawl_diff.changes(second, change=CHANGE_REMOVED)[0]['old_title'] == 'B'
+    # 其他市场不受影响
+    assert crawl_diff.changes(second, market='gh') == []
+
+    # 消失的广告再次出现时记为新出现
+    third = crawl_diff.start_run()
+    counts = crawl_diff.record_unit(third, 'shoes', 'in', [('a.com', 'A new'), ('b.com', 'B'), ('c.com', 'C')])
+    assert counts == {CHANGE_ADDED: 1, CHANGE_REMOVED: 0, CHANGE_TITLE: 0}
+    print("✓ 爬取差异测试通过")
+
+def make_unit(state, raw_ads, ads):
+    """构造已完成跳转解析的爬取单元"""
+    unit = CrawlUnit('shoes', market='in')
+    unit.serp_state = state
+    unit.raw_ads = [{'title': title, 'link': f'https://www.googleadservices.com/{title}'} for title in raw_ads]
+    unit.ads = [{'title': title, 'domain': domain} for domain, title in ads]
+    return unit
+
+def test_incomplete_units_keep_visibility():
+    """测试超时的搜索结果页和跳转解析失败的广告不记为消失"""
+    print("\n测试不完整的任务:")
+
+    crawl_diff = CrawlDiff(ResultStore(None))
+    monitor = SimpleNamespace(crawl_diff=crawl_diff, logger=logging.getLogger(__name__))
+
+    def record(run_id, unit):
+        return GoogleAdMonitor.record_unit_diff(monitor, run_id, unit)
+
+    def visible():
+        return sorted(row[0] for row in crawl_diff.store.query('SELECT domain FROM serp_visibility'))
+
+    first = crawl_diff.start_run()
+    record(first, make_unit('ads', ['A', 'B'], [('a.com', 'A'), ('b.com', 'B')]))
+    crawl_diff.finish_run(first)
+
+    # 超时的页面只看到部分广告，不计算差异
+    second = crawl_diff.start_run()
+    assert record(second, make_unit('timeout', ['A'], [('a.com', 'A')])) is None
+    assert crawl_diff.changes(second) == [] and crawl_diff.run(second)['units'] == 0
+    assert visible() == ['a.com', 'b.com']
+
+    # B 的跳转解析失败：不记为消失，可见性记录保持不变；新出现的广告照常记录
+    counts = record(second, make_unit('ads', ['A', 'B', 'C'], [('a.com', 'A'), ('c.com', 'C')]))
+    assert counts == {CHANGE_ADDED: 1, CHANGE_REMOVED: 0, CHANGE_TITLE: 0}
+    assert visible() == ['a.com', 'b.com', 'c.com']
+    assert crawl_diff.store.query(
+        "SELECT last_seen_run FROM serp_visibility WHERE domain = 'b.com'"
+    )[0][0] == first
+
+    # 完整解析且就绪的页面照常记录消失的广告
+    counts = record(second, make_unit('no_ads', [], []))
+    assert counts[CHANGE_REMOVED] == 3 and visible() == []
+    print("✓ 不完整的任务测试通过")
+
+def test_runs_and_resume():
+    """测试批次列表和恢复未完成的批次"""
+    print("\n测试爬取批次:")
+
+    crawl_diff = CrawlDiff(ResultStore(None))
+    first = crawl_diff.start_run()
+    crawl_diff.record_unit(first, 'shoes', 'in', [('a.com', 'A')])
+    crawl_diff.finish_run(first)
+    assert crawl_diff.latest_run_id() == first
+
+    second = crawl_diff.start_run()
+    assert crawl_diff.start_run(resume=True) == second, "应继续未完成的批次"
+    assert crawl_diff.latest_run_id() == first
+
+    runs = crawl_diff.runs()
+    assert [run['id'] for run in runs] == [second, first]
+    assert runs[0]['finished_at'] is None and runs[0]['units'] == 0
+    assert runs[1]['added'] == 1 and runs[1]['units'] == 1
+    assert crawl_diff.run(9999) is None
+
+    try:
+        crawl_diff.changes(first, change='unknown')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应拒绝未知的变化类型")
+    print("✓ 爬取批次测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试爬取差异...")
+
+    test_record_unit_changes()
+    test_incomplete_units_keep_visibility()
+    test_runs_and_resume()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+后台爬取任务测试
+"""
+import threading
+import time
+import app as app_module
+from src.core.crawler.jobs import CrawlJob, CrawlJobManager
+
+def wait_until(condition, timeout=5):
+    """等待 condition() 为真"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+def fake_crawl(units, release=None):
+    """模拟爬取：逐个发布任务进度（第 3 个任务失败），指定 release 时每个任务后等待其设置，支持取消"""
+    def target(job):
+        job.publish('started', {'total': units, 'skipped': 1})
+        for index in range(2, units + 1):
+            if job.cancel_event.is_set():
+                break
+            if index == 3:
+                job.publish('unit_failed', {'keyword': f'kw{index}', 'stage': 'serp', 'error': 'boom'})
+            else:
+                job.publish('unit', {'keyword': f'kw{index}', 'ads': 2, 'new_records': 1, 'state': 'ads'})
+            if release is not None:
+                release.wait(5)
+        return {'results': 3, 'cancelled': job.cancel_event.is_set(), 'error': None}
+    return target
+
+def test_job_progress_and_attach():
+    """测试任务进度计数，运行中再次启动时返回同一任务"""
+    print("\n测试任务进度:")
+
+    release = threading.Event()
+    manager = CrawlJobManager(fake_crawl(5, release))
+    job, created = manager.start()
+    assert created and job.status == 'running'
+
+    wait_until(lambda: job.progress['processed'] == 1)
+    same, created = manager.start()
+    assert same is job and not created, "运行中的任务应被复用"
+    assert manager.current() is job
+
+    release.set()
+    wait_until(lambda: job.finished)
+    assert job.status == 'completed'
+    state = job.to_dict()
+    assert state['progress']['total'] == 5
+    assert state['progress']['skipped'] == 1
+    assert state['progress']['processed'] == 3
+    assert state['progress']['failed'] == 1
+    assert state['progress']['ads'] == 6
+    assert state['progress']['percent'] == 100.0
+    assert state['result']['results'] == 3
+    assert manager.current() is None
+
+    events = job.events_after(0)
+    assert [event_type for _, event_type, _ in events] == ['started', 'unit', 'unit_failed', 'unit', 'unit', 'finished']
+    assert [seq for seq, _, _ in events] == [1, 2, 3, 4, 5, 6]
+    assert job.events_after(3)[0][0] == 4, "按序号继续读取"
+
+    # 结束后再次启动时创建新任务
+    second, created = manager.start()
+    assert created and second is not job
+    wait_until(lambda: second.finished)
+    assert [j.id for j in manager.jobs()] == [second.id, job.id]
+    print("✓ 任务进度测试通过")
+
+def test_cancel_and_failure():
+    """测试取消和失败的任务"""
+    print("\n测试取消和失败:")
+
+    release = threading.Event()
+    manager = CrawlJobManager(fake_crawl(10, release))
+    job, _ = manager.start()
+    wait_until(lambda: job.progress['processed'] == 1)
+    assert manager.cancel(job.id)
+    release.set()
+    wait_until(lambda: job.finished)
+    assert job.status == 'cancelled'
+    assert job.progress['processed'] < 9
+    assert not manager.cancel(job.id), "已结束的任务不能取消"
+    assert not manager.cancel('missing')
+
+    def broken(job):
+        raise RuntimeError('driver crashed')
+    job, _ = CrawlJobManager(broken).start()
+    wait_until(lambda: job.finished)
+    assert job.status == 'failed' and job.error == 'driver crashed'
+
+    job, _ = CrawlJobManager(lambda job: {'error': '没有找到关键词配置'}).start()
+    wait_until(lambda: job.finished)
+    assert job.status == 'failed'
+    print("✓ 取消和失败测试通过")
+
+def test_history_and_event_limit():
+    """测试只保留最近的任务和事件"""
+    print("\n测试任务和事件上限:")
+
+    manager = CrawlJobManager(lambda job: None, history=2)
+    for _ in range(4):
+        job, _ = manager.start()
+        wait_until(lambda: job.finished)
+    assert len(manager.jobs()) == 3, "最多保留 history 个已结束的任务和刚启动的任务"
+
+    job = CrawlJob(max_events=3)
+    for i in range(5):
+        job.publish('unit', {'ads': 1})
+    assert [seq for seq, _, _ in job.events_after(0)] == [3, 4, 5]
+    assert job.progress['ads'] == 5
+
+    # 没有新事件时等待到超时
+    start = time.monotonic()
+    assert job.events_after(5, timeout=0.1) == []
+    assert time.monotonic() - start >= 0.09
+    print("✓ 任务和事件上限测试通过")
+
+def test_event_stream():
+    """测试进度流接口"""
+    print("\n测试进度流接口:")
+
+    original = app_module.crawl_jobs
+    app_module.crawl_jobs = CrawlJobManager(fake_crawl(4))
+    try:
+        client = app_module.app.test_client()
+        job, _ = app_module.crawl_jobs.start()
+        wait_until(lambda: job.finished)
+
+        response = client.get(f'/api/crawl_jobs/{job.id}/events')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        assert 'event: started' in body
+        assert body.count('event: unit\n') == 2
+        assert body.rstrip().split('\n\n')[-1].startswith(f'id: {job.last_seq}\nevent: finished')
+
+        # 断线重连时从 Last-Event-ID 之后继续
+        response = client.get(f'/api/crawl_jobs/{job.id}/events', headers={'Last-Event-ID': str(job.last_seq - 1)})
+        assert response.get_data(as_text=True).count('event: ') == 1
+
+        assert client.get('/api/crawl_jobs/missing/events').status_code == 404
+        listing = client.get('/api/crawl_jobs').get_json()
+        assert listing['current'] is None and listing['jobs'][0]['id'] == job.id
+        assert client.get(f'/api/crawl_jobs/{job.id}').get_json()['job']['status'] == 'completed'
+        assert client.post(f'/api/crawl_jobs/{job.id}/cancel').status_code == 409
+    finally:
+        app_module.crawl_jobs = original
+    print("✓ 进度流接口测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试后台爬取任务...")
+
+    test_job_progress_and_attach()
+    test_cancel_and_failure()
+    test_history_and_event_limit()
+    test_event_stream()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+结果去重模块测试
+"""
+from src.core.results.deduplication import (
+    deduplicate_keyword_records,
+    deduplicate_results,
+    merge_and_deduplicate,
+    normalize_result_url,
+    result_key
+)
+
+def test_normalize_result_url():
+    """测试落地页 URL 规范化"""
+    print("\n测试 URL 规范化:")
+
+    key = normalize_result_url('https://www.Example.com/shop/?b=2&a=1&gclid=xyz&utm_source=g#top')
+    assert key == normalize_result_url('http://example.com:80/shop?a=1&b=2')
+    assert key != normalize_result_url('https://example.com/shop?a=2&b=2')
+    assert normalize_result_url('https://example.com:8080/') != normalize_result_url('https://example.com/')
+    print("✓ URL 规范化测试通过")
+
+def test_result_key_fallbacks():
+    """测试去重键：final_url > 域名 > original_url"""
+    print("\n测试去重键:")
+
+    assert result_key({'final_url': 'https://a.com/', 'domain': 'b.com'}) == normalize_result_url('https://a.com')
+    assert result_key({'landing_page': 'https://a.com/'}) == normalize_result_url('https://a.com')
+    assert result_key({'final_url': '', 'domain': 'B.com'}) == 'domain:b.com'
+    assert result_key({'original_url': 'https://g.com/aclk?x=1'}).startswith('original:')
+    assert result_key({}) is None
+    print("✓ 去重键测试通过")
+
+def test_deduplicate_keyword_records():
+    """测试关键词记录按 (关键词, 市场) 保留最新一条"""
+    print("\n测试关键词记录去重:")
+
+    records = deduplicate_keyword_records([
+        {'timestamp': '2024-01-01', 'market': 'in', 'keyword': 'shoes', 'title': 'Old'},
+        {'timestamp': '2024-03-01', 'market': 'in', 'keyword': 'shoes', 'title': 'New'},
+        {'timestamp': '2024-02-01', 'market': 'gh', 'keyword': 'shoes', 'title': 'GH'},
+        {'timestamp': '2024-05-01', 'market': 'in', 'keyword': '', 'title': 'Empty'},
+    ])
+    assert [(r['market'], r['title']) for r in records] == [('in', 'New'), ('gh', 'GH')]
+    assert deduplicate_keyword_records(None) == []
+    print("✓ 关键词记录去重测试通过")
+
+def test_deduplicate_results():
+    """测试结果合并"""
+    print("\n测试结果合并:")
+
+    first = {
+        'domain': 'a.com',
+        'final_url': 'https://www.a.com/',
+        'screenshot_path': 'a.png',
+        'keyword_records': [{'timestamp': '2024-01-01', 'market': 'in', 'keyword': 'k1', 'title': 'T'}]
+    }
+    results = deduplicate_results([
+        first,
+        {'domain': 'b.com', 'final_url': 'https://b.com/', 'keyword_records': [
+            {'timestamp': '2024-01-05', 'market': 'in', 'keyword': 'k', 'title': 'T'}
+        ]},
+        {'domain': 'a.com', 'final_url': 'https://a.com/?gclid=1', 'screenshot_path': 'a_new.png', 'keyword_records': [
+            {'timestamp': '2024-02-01', 'market': 'in', 'keyword': 'k1', 'title': 'T2'},
+            {'timestamp': '2024-01-10', 'market': 'gh', 'keyword': 'k2', 'title': 'T'},
+        ]},
+        {'domain': 'a.com', 'final_url': 'https://a.com', 'screenshot_path': ''},
+        'invalid',
+    ])
+
+    assert [r['domain'] for r in results] == ['a.com', 'b.com'], "应按时间倒序排列"
+    merged = results[0]
+    assert merged['screenshot_path'] == 'a_new.png', "应使用最新结果的非空截图"
+    assert merged['final_url'] == 'https://a.com/?gclid=1', "没有关键词记录的结果不覆盖较新的 final_url"
+    assert [(r['keyword'], r['title']) for r in merged['keyword_records']] == [('k1', 'T2'), ('k2', 'T')]
+    assert merged['timestamp'] == '2024-02-01'
+    # 输入不被修改
+    assert len(first['keyword_records']) == 1 and first['screenshot_path'] == 'a.png'
+    print("✓ 结果合并测试通过")
+
+def test_merge_and_deduplicate():
+    """测试新结果合并到已有结果"""
+    print("\n测试合并新结果:")
+
+    existing = [{'final_url': 'https://a.com/', 'screenshot_path': 'old.png', 'keyword_records': [
+        {'timestamp': '2024-01-01', 'market': 'in', 'keyword': 'k', 'title': 'T'}
+    ]}]
+    new = [{'final_url': 'https://a.com', 'screenshot_path': 'new.png', 'keyword_records': [
+        {'timestamp': '2024-01-02', 'market': 'in', 'keyword': 'k', 'title': 'T'}
+    ]}]
+
+    results = merge_and_deduplicate(existing, new)
+    assert len(results) == 1
+    assert results[0]['screenshot_path'] == 'new.png'
+    assert [r['timestamp'] for r in results[0]['keyword_records']] == ['2024-01-02']
+    assert merge_and_deduplicate(None, []) == []
+
+    # 截图取自最新的结果，与输入顺序无关
+    results = merge_and_deduplicate(new, existing)
+    assert results[0]['screenshot_path'] == 'new.png'
+    print("✓ 合并新结果测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试结果去重模块...")
+
+    test_normalize_result_url()
+    test_result_key_fallbacks()
+    test_deduplicate_keyword_records()
+    test_deduplicate_results()
+    test_merge_and_deduplicate()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+域名索引模块测试
+"""
+from src.core.results.index import DomainIndex
+from tests.helpers import create_store
+
+# 包含两个域名的结果记录
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'final_url': 'https://a.com/',
+        'timestamp': '2024-01-01T00:00:00',
+        'keyword_records': [
+            {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A'},
+            {'timestamp': '2023-06-01T00:00:00', 'keyword': 'legacy', 'title': 'Old'},
+        ]
+    },
+    {'domain': 'b.com', 'final_url': 'https://b.com/', 'keyword_records': []},
+]
+
+class CountingStore:
+    """记录写回次数的结果存储包装"""
+
+    def __init__(self, store):
+        self.store = store
+        self.writes = 0
+        self.updates = 0
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def add_keyword_record(self, page_id, keyword_record):
+        self.writes += 1
+        return self.store.add_keyword_record(page_id, keyword_record)
+
+    def update(self, page_id, record):
+        self.updates += 1
+        return self.store.update(page_id, record)
+
+def test_lookup(make_store):
+    """测试按域名查找"""
+    print("\n测试按域名查找:")
+
+    index = DomainIndex(make_store(RESULTS)).load()
+
+    assert len(index) == 2
+    assert 'a.com' in index and 'c.com' not in index
+    assert index.get('a.com')['final_url'] == 'https://a.com/'
+    print("✓ 按域名查找测试通过")
+
+def test_add_keyword_record_matches_store_rules(make_store):
+    """测试关键词记录规则与结果存储一致"""
+    print("\n测试关键词记录:")
+
+    index = DomainIndex(make_store(RESULTS), flush_batch=100).load()
+
+    # 新关键词插入到最前面
+    assert index.add_keyword_record('a.com', {'timestamp': '2024-02-01T00:00:00', 'market': 'in', 'keyword': 'boots', 'title': 'B'})
+    # 相同关键词和市场：时间更早时忽略，更晚时替换
+    assert not index.add_keyword_record('a.com', {'timestamp': '2023-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'X'})
+    assert index.add_keyword_record('a.com', {'timestamp': '2024-03-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'A2'})
+    # 没有 market 的旧记录视为同一市场
+    assert index.add_keyword_record('a.com', {'timestamp': '2024-03-02T00:00:00', 'market': 'gh', 'keyword': 'legacy', 'title': 'New'})
+    # 不存在的域名
+    assert not index.add_keyword_record('c.com', {'timestamp': '2024-03-01T00:00:00', 'market': 'in', 'keyword': 'x', 'title': 'x'})
+
+    record = index.get('a.com')
+    assert [(r['keyword'], r['title']) for r in record['keyword_records']] == [('boots', 'B'), ('shoes', 'A2'), ('legacy', 'New')]
+    assert record['timestamp'] == '2024-03-02T00:00:00'
+    print("✓ 关键词记录测试通过")
+
+def test_coalesced_flush(make_store):
+    """测试多次修改合并为一次写回"""
+    print("\n测试批量写回:")
+
+    store = CountingStore(make_store(RESULTS))
+    index = DomainIndex(store, flush_batch=2, flush_interval=3600).load()
+
+    for i in range(5):
+        index.add_keyword_record('a.com', {'timestamp': f'2024-05-0{i + 1}T00:00:00', 'market': 'in', 'keyword': f'k{i}', 'title': 'T'})
+        assert index.maybe_flush() == 0, "同一记录的多次修改不应触发写回"
+    assert store.writes == 0
+
+    index.add_keyword_record('b.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k', 'title': 'T'})
+    assert index.maybe_flush() == 2
+    assert store.writes == 6 and store.updates == 0, "只添加关键词记录，不整体替换记录"
+    assert index.pending() == 0
+
+    page_id, record = store.find_one('domain', 'a.com')
+    assert len(record['keyword_records']) == 7
+    assert store.find_one('domain', 'b.com')[1]['keyword_records'][0]['keyword'] == 'k'
+    print("✓ 批量写回测试通过")
+
+def test_flush_skips_deleted_records(make_store):
+    """测试写回时跳过已被删除的记录"""
+    print("\n测试写回已删除的记录:")
+
+    store = make_store(RESULTS)
+    index = DomainIndex(store).load()
+    index.add_keyword_record('a.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k', 'title': 'T'})
+    index.add_keyword_record('b.com', {'timestamp': '2024-05-01T00:00:00', 'market': 'in', 'keyword': 'k', 'title': 'T'})
+    store.delete('domain', 'a.com')
+
+    index.flush()
+    assert store.domains() == {'b.com'}
+    assert store.find_one('domain', 'b.com')[1]['keyword_records'][0]['keyword'] == 'k'
+    print("✓ 写回已删除的记录测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试域名索引模块...")
+
+    test_lookup(create_store)
+    test_add_keyword_record_matches_store_rules(create_store)
+    test_coalesced_flush(create_store)
+    test_flush_skips_deleted_records(create_store)
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
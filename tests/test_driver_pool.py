@@ -0,0 +1,192 @@
+"""
+浏览器池模块测试
+"""
+import logging
+import threading
+import pytest
+from types import SimpleNamespace
+from google_monitor import GoogleAdMonitor
+from src.core.crawler.driver_pool import DriverPool
+
+class FakeDriver:
+    """模拟的浏览器驱动"""
+
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError('chrome not reachable')
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+def create_pool(**kwargs):
+    """创建使用模拟驱动的浏览器池"""
+    created = []
+
+    def factory():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    return DriverPool(factory, **kwargs), created
+
+def test_reuse_driver():
+    """测试浏览器复用"""
+    print("\n测试浏览器复用:")
+
+    pool, created = create_pool(max_size=2, max_uses=10)
+    for _ in range(5):
+        with pool.lease() as driver:
+            assert driver is created[0]
+
+    stats = pool.stats()
+    assert len(created) == 1, "应该只启动一个浏览器"
+    assert stats['misses'] == 1 and stats['hits'] == 4, "命中统计不正确"
+    assert stats['launches'] == 1
+    pool.close()
+    assert created[0].quit_called, "关闭浏览器池时应关闭空闲浏览器"
+    print("✓ 浏览器复用测试通过")
+
+def test_recycle_after_max_uses():
+    """测试达到使用次数后回收"""
+    print("\n测试使用次数回收:")
+
+    pool, created = create_pool(max_size=1, max_uses=2)
+    for _ in range(4):
+        with pool.lease():
+            pass
+
+    assert len(created) == 2, "每使用两次应重建一次浏览器"
+    assert created[0].quit_called
+    assert pool.stats()['recycled'] == 2
+    pool.close()
+    print("✓ 使用次数回收测试通过")
+
+def test_discard_crashed_driver():
+    """测试崩溃的浏览器被丢弃"""
+    print("\n测试崩溃浏览器丢弃:")
+
+    pool, created = create_pool(max_size=1, max_uses=10)
+    with pytest.raises(ValueError):
+        with pool.lease() as driver:
+            driver.alive = False
+            raise ValueError('页面处理失败')
+
+    with pool.lease() as driver:
+        assert driver is created[1], "崩溃后应启动新的浏览器"
+
+    stats = pool.stats()
+    assert stats['crashed'] == 1
+    assert created[0].quit_called
+    pool.close()
+    print("✓ 崩溃浏览器丢弃测试通过")
+
+def test_unhealthy_idle_driver():
+    """测试空闲浏览器健康检查"""
+    print("\n测试空闲浏览器健康检查:")
+
+    pool, created = create_pool(max_size=1, max_uses=10)
+    with pool.lease():
+        pass
+    created[0].alive = False
+
+    with pool.lease() as driver:
+        assert driver is created[1], "健康检查失败后应启动新的浏览器"
+    assert pool.stats()['unhealthy'] == 1
+    pool.close()
+    print("✓ 健康检查测试通过")
+
+def test_bounded_pool():
+    """测试浏览器池大小限制"""
+    print("\n测试浏览器池大小限制:")
+
+    pool, created = create_pool(max_size=2, max_uses=100)
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(10):
+            with pool.lease():
+                pass
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(created) <= 2, "同时存在的浏览器不应超过上限"
+    stats = pool.stats()
+    assert stats['hits'] + stats['misses'] == 40
+
+    held = pool.acquire()
+    held_2 = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(held)
+    pool.release(held_2)
+    pool.close()
+    print("✓ 浏览器池大小限制测试通过")
+
+class ResettableDriver(FakeDriver):
+    """记录状态清理操作的模拟驱动"""
+
+    def __init__(self):
+        super().__init__()
+        self.launch_window_size = {'width': 1920, 'height': 1080}
+        self.window_size = dict(self.launch_window_size)
+        self.calls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append(cmd)
+
+    def execute_script(self, script):
+        self.calls.append(script)
+        return 1
+
+    def get(self, url):
+        self.calls.append(url)
+
+    def get_window_size(self):
+        return dict(self.window_size)
+
+    def set_window_size(self, width, height):
+        self.window_size = {'width': width, 'height': height}
+
+def test_reset_driver_restores_state():
+    """测试归还浏览器前清理存储并恢复启动时的窗口大小"""
+    print("\n测试浏览器状态清理:")
+
+    monitor = SimpleNamespace(logger=logging.getLogger(__name__))
+    pool = DriverPool(ResettableDriver, max_size=1, reset=lambda d: GoogleAdMonitor.reset_driver(monitor, d))
+    with pool.lease() as driver:
+        # 截图时窗口被调整为整页高度
+        driver.set_window_size(1920, 5000)
+    assert driver.window_size == {'width': 1920, 'height': 1080}
+    assert any('localStorage.clear()' in call and 'sessionStorage.clear()' in call for call in driver.calls)
+    assert driver.calls.index('about:blank') > 1, "应在离开页面前清理存储"
+    assert 'Network.clearBrowserCookies' in driver.calls
+    with pool.lease() as reused:
+        assert reused is driver, "清理后的浏览器应被复用"
+    pool.close()
+    print("✓ 浏览器状态清理测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试浏览器池模块...")
+
+    test_reuse_driver()
+    test_recycle_after_max_uses()
+    test_discard_crashed_driver()
+    test_unhealthy_idle_driver()
+    test_bounded_pool()
+    test_reset_driver_restores_state()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
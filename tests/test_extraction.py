@@ -0,0 +1,126 @@
+"""
+广告提取模块测试
+"""
+from src.core.crawler.extraction import ExtractionStats, collect_raw_ads, extract_ads
+
+class FakeElement:
+    """模拟的页面元素"""
+
+    def __init__(self, text='', href='', children=None):
+        self.text = text
+        self.href = href
+        self.children = children or {}
+
+    def find_element(self, by, selector):
+        if selector not in self.children:
+            raise Exception(f'no such element: {selector}')
+        return self.children[selector]
+
+    def get_attribute(self, name):
+        return self.href if name == 'href' else None
+
+class ScriptDriver:
+    """注入脚本可用的模拟驱动"""
+
+    def __init__(self, result):
+        self.result = result
+        self.script_calls = 0
+
+    def execute_script(self, script, *args):
+        self.script_calls += 1
+        return self.result
+
+    def find_elements(self, by, selector):
+        raise AssertionError('脚本提取成功时不应逐个查询元素')
+
+class BrokenScriptDriver:
+    """注入脚本失败、只能逐个查询元素的模拟驱动"""
+
+    def __init__(self, ads):
+        self.ads = ads
+        self.implicit_waits = []
+
+    def execute_script(self, script, *args):
+        raise Exception('javascript error')
+
+    def implicitly_wait(self, seconds):
+        self.implicit_waits.append(seconds)
+
+    def find_elements(self, by, selector):
+        return self.ads if selector == 'div.uEierd' else []
+
+def test_script_extraction():
+    """测试单次脚本提取"""
+    print("\n测试单次脚本提取:")
+
+    driver = ScriptDriver({
+        'selector': 'div.uEierd',
+        'total': 3,
+        'items': [
+            {'index': 1, 'title': 'Ad One', 'link': 'https://www.google.com/aclk?adurl=https://a.com'},
+            {'index': 2, 'title': '', 'link': 'https://b.com'},
+            {'index': 3, 'title': 'Ad One Again', 'link': 'https://www.google.com/aclk?adurl=https://a.com'},
+        ]
+    })
+    stats = ExtractionStats()
+    extracted = extract_ads(driver, stats)
+
+    assert driver.script_calls == 1, "应该只调用一次脚本"
+    assert extracted['total'] == 3
+    assert not extracted['fallback']
+    assert extracted['raw_ads'] == [{
+        'title': 'Ad One',
+        'link': 'https://www.google.com/aclk?adurl=https://a.com',
+        'position': 1
+    }], "应过滤无标题和重复链接的广告"
+    assert stats.snapshot()['script_calls'] == 1
+    print("✓ 单次脚本提取测试通过")
+
+def test_fallback_extraction():
+    """测试兜底提取"""
+    print("\n测试兜底提取:")
+
+    ads = [
+        FakeElement(children={
+            "div[role='heading']": FakeElement(text=' Remote Jobs '),
+            "a[ping]": FakeElement(href='https://jobs.example.com')
+        }),
+        FakeElement(children={
+            "h3": FakeElement(text='Earn Online'),
+            "a": FakeElement(href='https://earn.example.com')
+        }),
+    ]
+    driver = BrokenScriptDriver(ads)
+    stats = ExtractionStats()
+    extracted = extract_ads(driver, stats)
+
+    assert extracted['fallback']
+    assert [ad['title'] for ad in extracted['raw_ads']] == ['Remote Jobs', 'Earn Online']
+    assert [ad['position'] for ad in extracted['raw_ads']] == [1, 2]
+    assert stats.snapshot()['fallback_calls'] == 1, "应记录兜底提取次数"
+    print("✓ 兜底提取测试通过")
+
+def test_collect_raw_ads():
+    """测试广告整理"""
+    print("\n测试广告整理:")
+
+    raw_ads = collect_raw_ads([
+        {'title': 'A', 'link': 'https://a.com'},
+        {'title': 'B', 'link': ''},
+        {'title': 'C', 'link': 'https://c.com'},
+    ])
+    assert [(ad['title'], ad['position']) for ad in raw_ads] == [('A', 1), ('C', 2)]
+    print("✓ 广告整理测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试广告提取模块...")
+
+    test_script_extraction()
+    test_fallback_extraction()
+    test_collect_raw_ads()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+市场参数和重复任务合并模块测试
+"""
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from src.core.crawler.markets import build_market_table, build_search_url, get_market_params
+from src.core.crawler.singleflight import SingleFlight
+
+def test_market_table():
+    """测试根据域名配置生成市场参数"""
+    print("\n测试市场参数表:")
+
+    table = build_market_table({'in': 'google.co.in', 'UK': 'google.co.uk', 'br': 'google.com.br'})
+
+    assert table['in'].gl == 'in' and table['in'].hl == 'en-IN'
+    assert table['uk'].gl == 'gb' and table['uk'].domain == 'google.co.uk'
+    assert table['br'].hl == 'en', "未配置语言的市场使用 en"
+    assert get_market_params('GH').domain == 'google.com.gh'
+    assert get_market_params('zz').domain == 'google.com', "未配置的市场使用 google.com"
+    print("✓ 市场参数表测试通过")
+
+def test_search_url():
+    """测试生成搜索地址"""
+    print("\n测试搜索地址:")
+
+    url = build_search_url('cheap flights & hotels', 'gh')
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+
+    assert parsed.netloc == 'www.google.com.gh'
+    assert query['gl'] == ['gh'] and query['hl'] == ['en-GH']
+    assert query['q'] == ['cheap flights & hotels'], "关键词应正确编码"
+    assert query['mobile'] == ['1']
+    print(f"✓ {url}")
+
+def test_singleflight_shares_concurrent_calls():
+    """测试同时执行的相同任务只执行一次"""
+    print("\n测试重复任务合并:")
+
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['result'] * 5
+    assert flight.stats() == {'executed': 1, 'shared': 4}
+
+    # 不保留结果时，完成后再次调用会重新执行
+    flight.do('key', work)
+    assert len(calls) == 2
+    print("✓ 重复任务合并测试通过")
+
+def test_singleflight_remember_and_errors():
+    """测试保留结果和失败重试"""
+    print("\n测试保留结果:")
+
+    flight = SingleFlight(remember=True)
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('a', lambda: 2) == 1, "保留的结果应直接返回"
+
+    def fail():
+        raise ValueError('boom')
+
+    try:
+        flight.do('b', fail)
+        assert False, "应抛出任务的异常"
+    except ValueError:
+        pass
+    assert flight.do('b', lambda: 3) == 3, "失败的任务不应保留"
+
+    flight.forget()
+    assert flight.do('a', lambda: 4) == 4
+    print("✓ 保留结果测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试市场参数和重复任务合并模块...")
+
+    test_market_table()
+    test_search_url()
+    test_singleflight_shares_concurrent_calls()
+    test_singleflight_remember_and_errors()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,11 @@ import pytest
 from datetime import datetime, timedelta
 from merge_results import merge_results
 
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """在临时目录中运行，不读取也不删除仓库中的 all_results.json"""
+    monkeypatch.chdir(tmp_path)
+
 def create_test_file(filename: str, data: list):
     """创建测试用的结果文件"""
     with open(filename, 'w', encoding='utf-8') as f:
@@ -0,0 +1,79 @@
+"""
+响应缓存测试
+"""
+import gzip
+import json
+from src.core.results.store import ResultStore
+from src.core.results.cache import ENCODING_GZIP, ENCODING_IDENTITY, PayloadCache
+
+def test_store_version_changes_on_write():
+    """测试结果存储写入后版本变化"""
+    print("\n测试数据版本:")
+
+    store = ResultStore(None)
+    version = store.version()
+    assert store.version() == version, "没有写入时版本不变"
+    store.all()
+    assert store.version() == version, "读取不改变版本"
+
+    store.insert({'domain': 'a.com', 'final_url': 'https://a.com/'})
+    assert store.version() != version
+    version = store.version()
+    try:
+        with store.transaction() as conn:
+            conn.execute('DELETE FROM landing_pages')
+            raise RuntimeError('回滚')
+    except RuntimeError:
+        pass
+    assert store.version() == version, "回滚的事务不改变版本"
+    print("✓ 数据版本测试通过")
+
+def test_payload_cache():
+    """测试按版本缓存和压缩"""
+    print("\n测试响应缓存:")
+
+    cache = PayloadCache(max_entries=2, min_compress_size=100)
+    builds = []
+
+    def build(value):
+        def _build():
+            builds.append(value)
+            return {'results': [value] * 50}
+        return _build
+
+    first = cache.get('a', '1', build('x'))
+    assert cache.get('a', '1', build('y')) is first and builds == ['x'], "同一版本只生成一次"
+    assert json.loads(first.body) == {'results': ['x'] * 50}
+
+    # 版本变化后重新生成，ETag 随之变化
+    second = cache.get('a', '2', build('y'))
+    assert builds == ['x', 'y'] and second.etag != first.etag
+    assert cache.get('b', '2', build('z')).etag != second.etag, "不同查询的 ETag 不同"
+
+    # 压缩只执行一次
+    assert second.choose_encoding(lambda name: name == ENCODING_GZIP) == ENCODING_GZIP
+    compressed = second.encoded(ENCODING_GZIP)
+    assert second.encoded(ENCODING_GZIP) is compressed
+    assert gzip.decompress(compressed) == second.body
+    assert second.choose_encoding(lambda name: False) == ENCODING_IDENTITY
+
+    small = cache.get('c', '2', lambda: {'ok': True})
+    assert small.choose_encoding(lambda name: True) == ENCODING_IDENTITY, "小内容不压缩"
+
+    # 超过容量时淘汰最久未使用的条目
+    assert cache.stats()['entries'] == 2
+    cache.get('a', '2', build('w'))
+    assert builds[-1] == 'w'
+    print("✓ 响应缓存测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试响应缓存...")
+
+    test_store_version_changes_on_write()
+    test_payload_cache()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
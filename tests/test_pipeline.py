@@ -0,0 +1,110 @@
+"""
+分阶段流水线模块测试
+"""
+import threading
+import time
+from src.core.crawler.pipeline import PipelineStage, StagedPipeline
+
+def test_items_flow_through_stages():
+    """测试任务依次经过所有阶段"""
+    print("\n测试任务流转:")
+
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    pipeline = StagedPipeline([
+        PipelineStage('double', lambda x: x * 2, workers=2),
+        PipelineStage('skip_odd', lambda x: x if x % 4 == 0 else None, workers=1),
+        PipelineStage('add', lambda x: x + 1, workers=3),
+    ], on_result=collect, report_interval=0)
+    pipeline.start()
+    for i in range(10):
+        pipeline.submit(i)
+    pipeline.join()
+
+    assert sorted(results) == [1, 5, 9, 13, 17]
+    snapshot = pipeline.snapshot()['stages']
+    assert snapshot['double']['processed'] == 10
+    assert snapshot['skip_odd']['processed'] == 10
+    assert snapshot['add']['processed'] == 5
+    print("✓ 任务流转测试通过")
+
+def test_backpressure():
+    """测试下游阻塞时上游等待"""
+    print("\n测试背压:")
+
+    release = threading.Event()
+
+    def slow(item):
+        release.wait()
+        return item
+
+    pipeline = StagedPipeline([
+        PipelineStage('fast', lambda x: x, workers=1, queue_size=1),
+        PipelineStage('slow', slow, workers=1, queue_size=1),
+    ], report_interval=0)
+    pipeline.start()
+
+    submitted = []
+
+    def producer():
+        for i in range(10):
+            pipeline.submit(i)
+            submitted.append(i)
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+
+    # slow 处理中 1 个 + slow 队列 1 个 + fast 处理中 1 个 + fast 队列 1 个
+    assert len(submitted) <= 5, "下游阻塞时上游不应无限提交"
+    assert pipeline.snapshot()['stages']['slow']['in_flight'] == 1
+
+    release.set()
+    thread.join()
+    pipeline.join()
+    assert pipeline.snapshot()['stages']['slow']['processed'] == 10
+    print(f"✓ 背压测试通过 (阻塞时已提交 {len(submitted)} 个)")
+
+def test_stage_error_is_isolated():
+    """测试单个任务失败不影响其他任务"""
+    print("\n测试失败隔离:")
+
+    results = []
+    errors = []
+
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError('boom')
+        return x
+
+    pipeline = StagedPipeline([
+        PipelineStage('check', fail_on_three, workers=2),
+    ], on_result=results.append, on_error=lambda stage, item, e: errors.append((stage, item, str(e))),
+        report_interval=0)
+    pipeline.start()
+    for i in range(5):
+        pipeline.submit(i)
+    pipeline.join()
+
+    assert sorted(results) == [0, 1, 2, 4]
+    assert pipeline.snapshot()['stages']['check']['errors'] == 1
+    assert errors == [('check', 3, 'boom')]
+    print("✓ 失败隔离测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试分阶段流水线模块...")
+
+    test_items_flow_through_stages()
+    test_backpressure()
+    test_stage_error_is_isolated()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
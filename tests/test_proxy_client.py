@@ -0,0 +1,201 @@
+"""
+预览代理客户端测试
+"""
+import os
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils.proxy_client import (
+    CACHE_HIT, CACHE_MISS, CACHE_REVALIDATED, CACHE_STALE,
+    HttpCache, ProxyClient, freshness_lifetime
+)
+
+class PageHandler(BaseHTTPRequestHandler):
+    """按路径返回不同缓存策略的页面，/flaky 在第一次之后断开连接"""
+
+    requests_seen = Counter()
+    conditional_seen = Counter()
+    policies = {
+        '/fresh': 'max-age=60',
+        '/revalidate': 'no-cache',
+        '/nostore': 'no-store',
+        '/flaky': 'max-age=0',
+    }
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.requests_seen[path] += 1
+        etag = f'"{path}-v1"'
+        if path == '/flaky' and self.requests_seen[path] > 1:
+            self.close_connection = True
+            return
+        if self.headers.get('If-None-Match') == etag:
+            self.conditional_seen[path] += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = f'<html><head></head><body>{path}</body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Cache-Control', self.policies.get(path, 'max-age=60'))
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    """启动本地测试服务，返回服务实例和地址"""
+    PageHandler.requests_seen.clear()
+    PageHandler.conditional_seen.clear()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f'http://127.0.0.1:{httpd.server_address[1]}'
+
+def test_freshness_lifetime():
+    """测试根据响应头计算有效期"""
+    print("\n测试有效期计算:")
+
+    assert freshness_lifetime({'Cache-Control': 'public, max-age=120'}, 300) == 120
+    assert freshness_lifetime({'Cache-Control': 'max-age=120', 'Age': '20'}, 300) == 100
+    assert freshness_lifetime({'Cache-Control': 'no-cache'}, 300) == 0
+    assert freshness_lifetime({'Cache-Control': 'private, no-store'}, 300) is None
+    assert freshness_lifetime({'Vary': '*'}, 300) is None
+    assert freshness_lifetime({}, 300) == 300
+    assert freshness_lifetime({
+        'Date': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        'Expires': 'Mon, 01 Jan 2024 00:10:00 GMT'
+    }, 300) == 600
+    assert freshness_lifetime({'Expires': '0'}, 300) == 0
+    print("✓ 有效期计算测试通过")
+
+def test_cache_lru_by_bytes():
+    """测试按字节数淘汰最久未使用的条目"""
+    print("\n测试缓存淘汰:")
+
+    now = [1000.0]
+    def clock():
+        now[0] += 1
+        return now[0]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'proxy_cache.db')
+        cache = HttpCache(path, max_bytes=100, max_entry_bytes=60, clock=clock)
+
+        def entry(size):
+            return {'url': 'http://x/', 'status': 200, 'content_type': 'text/html', 'body': b'x' * size, 'expires_at': 0}
+
+        assert cache.put('a', entry(40))
+        assert cache.put('b', entry(40))
+        assert cache.get('a') is not None  # a 变为最近使用
+        assert cache.put('c', entry(40))
+        assert cache.get('b') is None, "最久未使用的 b 被淘汰"
+        assert cache.get('a') is not None and cache.get('c') is not None
+        assert not cache.put('big', entry(61)), "超过单个条目上限的内容不缓存"
+
+        stats = cache.stats()
+        assert stats['entries'] == 2 and stats['bytes'] == 80 and stats['evictions'] == 1
+        cache.close()
+
+        # 重新打开时读取已有条目和字节数
+        reopened = HttpCache(path, max_bytes=100, max_entry_bytes=60, clock=clock)
+        assert reopened.stats()['bytes'] == 80
+        assert reopened.get('c')['body'] == b'x' * 40
+        reopened.close()
+    print("✓ 缓存淘汰测试通过")
+
+def test_client_caching_and_revalidation():
+    """测试命中缓存、304 确认、不缓存和请求失败时返回过期内容"""
+    print("\n测试代理缓存:")
+
+    httpd, server = start_server()
+    rewrites = Counter()
+
+    def rewrite(html, base_url):
+        rewrites[base_url] += 1
+        return html.replace('<head>', f'<head><base href="{base_url}">')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        client = ProxyClient(cache=HttpCache(os.path.join(tmpdir, 'proxy_cache.db')), timeout=5, max_retries=0)
+        try:
+            first = client.get(f'{server}/fresh', variant='mobile', rewrite_html=rewrite)
+            second = client.get(f'{server}/fresh?gclid=abc', variant='mobile', rewrite_html=rewrite)
+            assert (first.cache_status, second.cache_status) == (CACHE_MISS, CACHE_HIT)
+            assert second.content == first.content and b'<base href=' in second.content
+            assert second.content_type == 'text/html; charset=utf-8'
+            assert PageHandler.requests_seen['/fresh'] == 1, "跟踪参数不同的同一页面共用缓存"
+            assert sum(rewrites.values()) == 1, "命中缓存时不再改写"
+
+            # 不同变体分别缓存
+            assert client.get(f'{server}/fresh', variant='desktop').cache_status == CACHE_MISS
+            assert b'<base' not in client.get(f'{server}/fresh', variant='desktop').content
+
+            # no-cache：每次向源站确认，304 时沿用改写后的内容
+            assert client.get(f'{server}/revalidate', rewrite_html=rewrite).cache_status == CACHE_MISS
+            revalidated = client.get(f'{server}/revalidate', rewrite_html=rewrite)
+            assert revalidated.cache_status == CACHE_REVALIDATED
+            assert b'<base href=' in revalidated.content
+            assert PageHandler.conditional_seen['/revalidate'] == 1
+
+            # no-store：不缓存
+            client.get(f'{server}/nostore')
+            assert client.get(f'{server}/nostore').cache_status == CACHE_MISS
+            assert PageHandler.requests_seen['/nostore'] == 2
+
+            # 源站请求失败时返回过期内容
+            assert client.get(f'{server}/flaky').cache_status == CACHE_MISS
+            stale = client.get(f'{server}/flaky')
+            assert stale.cache_status == CACHE_STALE and b'/flaky' in stale.content
+
+            stats = client.stats()
+            assert stats['hit'] == 2 and stats['revalidated'] == 1 and stats['stale'] == 1
+            assert stats['miss'] == 6
+            assert abs(stats['hit_rate'] - 4 / 10) < 1e-9
+            assert stats['cache']['entries'] == 4
+        finally:
+            client.close()
+            httpd.shutdown()
+    print("✓ 代理缓存测试通过")
+
+def test_concurrent_requests_share_fetch():
+    """测试同一页面的并发请求只向源站发送一次"""
+    print("\n测试并发请求:")
+
+    httpd, server = start_server()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        client = ProxyClient(cache=HttpCache(os.path.join(tmpdir, 'proxy_cache.db')), timeout=5)
+        try:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(client.get(f'{server}/fresh')))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(results) == 8
+            assert PageHandler.requests_seen['/fresh'] == 1
+            assert len({result.content for result in results}) == 1
+        finally:
+            client.close()
+            httpd.shutdown()
+    print("✓ 并发请求测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试预览代理客户端...")
+
+    test_freshness_lifetime()
+    test_cache_lru_by_bytes()
+    test_client_caching_and_revalidation()
+    test_concurrent_requests_share_fetch()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+跳转缓存模块测试
+"""
+from src.core.crawler.redirect_cache import RedirectCache, normalize_cache_key
+
+class FakeClock:
+    """可手动调整的时钟"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_normalize_cache_key():
+    """测试缓存键规范化"""
+    print("\n测试缓存键规范化:")
+
+    a = normalize_cache_key('HTTPS://Example.com:443/landing?b=2&gclid=xyz&a=1#top')
+    b = normalize_cache_key('https://example.com/landing?a=1&b=2&utm_source=google')
+    assert a == b == 'https://example.com/landing?a=1&b=2'
+    assert normalize_cache_key('https://example.com') == 'https://example.com/'
+    print("✓ 缓存键规范化测试通过")
+
+def test_ttl_and_negative_results():
+    """测试有效期和失败结果"""
+    print("\n测试有效期和失败结果:")
+
+    clock = FakeClock()
+    cache = RedirectCache(path=None, ttl=100, negative_ttl=10, clock=clock)
+    cache.set('https://a.com', 'https://a.com/final')
+    cache.set_negative('https://slow.com')
+
+    assert cache.get('https://a.com') == (True, 'https://a.com/final')
+    assert cache.get('https://slow.com') == (True, None)
+
+    clock.now += 20
+    assert cache.get('https://slow.com') == (False, None), "失败结果应更快过期"
+    assert cache.get('https://a.com')[0]
+
+    clock.now += 100
+    assert cache.get('https://a.com') == (False, None)
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['negative_hits'] == 1
+    assert stats['expired'] == 2
+    print("✓ 有效期和失败结果测试通过")
+
+def test_lru_eviction():
+    """测试按最近使用淘汰"""
+    print("\n测试 LRU 淘汰:")
+
+    cache = RedirectCache(path=None, max_entries=2)
+    cache.set('https://a.com', 'https://a.com/')
+    cache.set('https://b.com', 'https://b.com/')
+    cache.get('https://a.com')
+    cache.set('https://c.com', 'https://c.com/')
+
+    assert cache.get('https://b.com') == (False, None), "最久未使用的条目应被淘汰"
+    assert cache.get('https://a.com')[0]
+    assert cache.get('https://c.com')[0]
+    assert cache.stats()['evictions'] == 1
+    print("✓ LRU 淘汰测试通过")
+
+def test_persistence(tmp_path):
+    """测试重启后缓存仍然有效"""
+    print("\n测试缓存持久化:")
+
+    path = tmp_path / 'redirects.db'
+    clock = FakeClock()
+    cache = RedirectCache(path=path, ttl=100, negative_ttl=10, clock=clock)
+    cache.set('https://a.com/?utm_source=x', 'https://a.com/final')
+    cache.set_negative('https://slow.com')
+    cache.close()
+
+    reopened = RedirectCache(path=path, ttl=100, negative_ttl=10, clock=clock)
+    assert reopened.get('https://a.com/') == (True, 'https://a.com/final')
+    assert reopened.get('https://slow.com') == (True, None)
+    reopened.close()
+
+    clock.now += 50
+    expired = RedirectCache(path=path, ttl=100, negative_ttl=10, clock=clock)
+    assert expired.get('https://slow.com') == (False, None), "过期条目不应被加载"
+    assert expired.get('https://a.com/')[0]
+    expired.close()
+    print("✓ 缓存持久化测试通过")
+
+def main():
+    """运行所有测试"""
+    import tempfile
+    from pathlib import Path
+
+    print("开始测试跳转缓存模块...")
+
+    test_normalize_cache_key()
+    test_ttl_and_negative_results()
+    test_lru_eviction()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_persistence(Path(tmp_dir))
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+跳转解析模块测试
+"""
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote
+from src.core.crawler.redirects import RedirectResolver, extract_ad_target
+from src.core.crawler.redirect_cache import RedirectCache
+
+class RedirectHandler(BaseHTTPRequestHandler):
+    """/r/<n>?delay=秒 延迟后跳转到 /final/<n>"""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.startswith('/r/'):
+            delay = float(parse_qs(parsed.query).get('delay', ['0'])[0])
+            time.sleep(delay)
+            self.send_response(302)
+            self.send_header('Location', '/final/' + parsed.path.split('/')[-1])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            body = b'ok'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    """启动本地测试服务，返回服务实例和地址"""
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RedirectHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f'http://127.0.0.1:{httpd.server_address[1]}'
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """保持连接的服务：/r/<n> 跳转到 /final/<n>，/nohead/ 开头的路径不支持 HEAD，记录各连接和请求方法"""
+
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    methods = Counter()
+
+    def _respond(self, send_body):
+        self.connections.add(self.client_address[1])
+        self.methods[self.command] += 1
+        path = urlparse(self.path).path
+        if self.command == 'HEAD' and path.startswith('/nohead/'):
+            self.send_response(405)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if '/r/' in path:
+            self.send_response(302)
+            self.send_header('Location', path.replace('/r/', '/final/'))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'x' * 1024
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, *args):
+        pass
+
+def test_connections_reused():
+    """测试解析跳转时复用连接：优先使用 HEAD，不支持时改用 GET 并读完较小的正文"""
+    print("\n测试连接复用:")
+
+    KeepAliveHandler.connections.clear()
+    KeepAliveHandler.methods.clear()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    server = f'http://127.0.0.1:{httpd.server_address[1]}'
+    resolver = RedirectResolver(max_workers=1, timeout=5, max_retries=0)
+    try:
+        for i in range(5):
+            assert resolver.resolve(f'{server}/r/{i}') == f'{server}/final/{i}'
+        assert KeepAliveHandler.methods == Counter({'HEAD': 10}), "支持 HEAD 时不发送 GET"
+
+        for i in range(3):
+            assert resolver.resolve(f'{server}/nohead/r/{i}') == f'{server}/nohead/final/{i}'
+        assert KeepAliveHandler.methods['GET'] == 6
+        assert len(KeepAliveHandler.connections) == 1, "所有请求应复用同一个连接"
+    finally:
+        resolver.close()
+        httpd.shutdown()
+        httpd.server_close()
+    print("✓ 连接复用测试通过")
+
+def test_extract_ad_target():
+    """测试广告目标 URL 提取"""
+    print("\n测试广告目标 URL 提取:")
+
+    url = 'https://www.google.com/aclk?sa=L&ai=abc&adurl=' + quote('https://example.com/landing?x=1', safe='')
+    assert extract_ad_target(url) == 'https://example.com/landing?x=1'
+    assert extract_ad_target('https://example.com') is None
+    # 各市场的 Google 域名和 googleadservices
+    for host in ('https://www.google.co.in', 'https://google.com.gh', 'https://www.googleadservices.com/pagead'):
+        assert extract_ad_target(f'{host}/aclk?sa=L&adurl=https://x.example') == 'https://x.example', host
+    assert extract_ad_target('https://www.google.co.in/search?q=x&adurl=https://x.example') is None
+    assert extract_ad_target('https://google.evil.example/aclk?adurl=https://x.example') is None
+    assert extract_ad_target('https://evil.example/google.com/aclk?adurl=https://x.example') is None
+    print("✓ 广告目标 URL 提取测试通过")
+
+def test_resolve_many_concurrent_and_ordered():
+    """测试并发解析且结果保持顺序"""
+    print("\n测试并发解析:")
+
+    httpd, server = start_server()
+    resolver = RedirectResolver(max_workers=4, timeout=5)
+    try:
+        delays = [0.4, 0.1, 0.3, 0.2]
+        urls = [f'{server}/r/{i}?delay={d}' for i, d in enumerate(delays)]
+
+        start = time.perf_counter()
+        final_urls = resolver.resolve_many(urls)
+        elapsed = time.perf_counter() - start
+
+        assert final_urls == [f'{server}/final/{i}' for i in range(4)], "结果应与输入顺序一致"
+        assert elapsed < sum(delays), "并发解析耗时应接近最慢的一次跳转"
+        print(f"✓ 并发解析 4 个跳转耗时 {elapsed:.2f}s (串行约 {sum(delays):.1f}s)")
+    finally:
+        resolver.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+def test_resolve_failure_returns_original():
+    """测试解析失败时返回原链接"""
+    print("\n测试解析失败:")
+
+    resolver = RedirectResolver(max_workers=1, timeout=0.5, max_retries=0)
+    try:
+        url = 'http://127.0.0.1:1/unreachable'
+        assert resolver.resolve(url) == url
+        assert resolver.resolve('') is None
+    finally:
+        resolver.close()
+    print("✓ 解析失败测试通过")
+
+def test_resolve_uses_cache():
+    """测试解析结果缓存"""
+    print("\n测试解析结果缓存:")
+
+    httpd, server = start_server()
+    cache = RedirectCache(path=None)
+    resolver = RedirectResolver(max_workers=1, timeout=5, cache=cache)
+    try:
+        ad_url = 'https://www.google.com/aclk?sa=L&adurl=' + quote(f'{server}/r/7?delay=0&gclid=abc', safe='')
+        assert resolver.resolve(ad_url) == f'{server}/final/7'
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    # 服务已关闭，仍能从缓存得到结果（跟踪参数不影响缓存键）
+    assert resolver.resolve(f'{server}/r/7?gclid=other&delay=0') == f'{server}/final/7'
+    assert cache.stats()['hits'] == 1
+    resolver.close()
+    print("✓ 解析结果缓存测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试跳转解析模块...")
+    test_extract_ad_target()
+    test_resolve_many_concurrent_and_ordered()
+    test_resolve_failure_returns_original()
+    test_resolve_uses_cache()
+    test_connections_reused()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
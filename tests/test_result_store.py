@@ -0,0 +1,176 @@
+"""
+结果存储模块测试
+"""
+import json
+import os
+import tempfile
+import threading
+from src.core.results.store import ResultStore
+
+def make_record(domain, keyword='shoes', market='in', timestamp='2024-01-01T00:00:00'):
+    """创建测试记录"""
+    return {
+        'domain': domain,
+        'original_url': f'https://www.google.com/aclk?adurl=https://{domain}/',
+        'final_url': f'https://{domain}/landing',
+        'screenshot_path': f'{domain}.png',
+        'timestamp': timestamp,
+        'keyword_records': [
+            {'timestamp': timestamp, 'market': market, 'keyword': keyword, 'title': f'{domain} ad'}
+        ]
+    }
+
+def test_json_roundtrip():
+    """测试导入导出后记录保持不变"""
+    print("\n测试导入导出:")
+
+    records = [make_record('a.com'), make_record('b.com'), {'final_url': 'https://c.com/', 'custom': [1, 2], 'screenshot_path': None}]
+    records[0]['keyword_records'].append({'timestamp': '2023-12-01T00:00:00', 'keyword': 'legacy', 'title': 'Old'})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'all_results.json')
+        with open(source, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+
+        # 首次使用时自动导入
+        store = ResultStore(os.path.join(tmpdir, 'results.db'), json_path=source)
+        assert store.count() == 3
+        # 缺少 keyword_records 的记录读出时补为空列表
+        records[2]['keyword_records'] = []
+        assert store.all() == records
+
+        exported = os.path.join(tmpdir, 'export.json')
+        assert store.export_json(exported) == 3
+        with open(exported, 'r', encoding='utf-8') as f:
+            assert json.load(f) == records
+        store.close()
+
+        # 已有数据时不再自动导入
+        with open(source, 'w', encoding='utf-8') as f:
+            json.dump([], f)
+        store = ResultStore(os.path.join(tmpdir, 'results.db'), json_path=source)
+        assert store.count() == 3
+        store.close()
+    print("✓ 导入导出测试通过")
+
+def test_lookup_update_delete():
+    """测试按索引字段查找、更新截图和删除"""
+    print("\n测试查找、更新和删除:")
+
+    store = ResultStore(None)
+    store.insert_many([make_record('a.com'), make_record('b.com')])
+
+    page_id, record = store.find_one('domain', 'a.com')
+    assert record['final_url'] == 'https://a.com/landing'
+    assert store.find_one('original_url', record['original_url'])[0] == page_id
+    assert store.domains() == {'a.com', 'b.com'}
+
+    assert store.update_screenshot('B.COM', 'b_new.png') == 1
+    assert store.find_one('domain', 'b.com')[1]['screenshot_path'] == 'b_new.png'
+
+    record['screenshot_path'] = 'a_new.png'
+    store.update(page_id, record)
+    assert store.get(page_id)['screenshot_path'] == 'a_new.png'
+
+    assert store.delete('final_url', 'https://a.com/landing') == 1
+    assert store.delete('final_url', 'https://missing.com/') == 0
+    assert [r['domain'] for r in store.all()] == ['b.com']
+    print("✓ 查找、更新和删除测试通过")
+
+def test_add_keyword_record():
+    """测试添加关键词记录"""
+    print("\n测试添加关键词记录:")
+
+    store = ResultStore(None)
+    page_id = store.insert(make_record('a.com'))
+
+    # 新关键词插入到最前面，并更新落地页时间戳
+    assert store.add_keyword_record(page_id, {
+        'timestamp': '2024-02-01T00:00:00', 'market': 'in', 'keyword': 'boots', 'title': 'Boots'
+    })
+    record = store.get(page_id)
+    assert [r['keyword'] for r in record['keyword_records']] == ['boots', 'shoes']
+    assert record['timestamp'] == '2024-02-01T00:00:00'
+
+    # 相同关键词和市场：时间更晚时替换，否则忽略
+    assert store.add_keyword_record(page_id, {
+        'timestamp': '2024-03-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'New title'
+    })
+    assert not store.add_keyword_record(page_id, {
+        'timestamp': '2023-01-01T00:00:00', 'market': 'in', 'keyword': 'shoes', 'title': 'Older'
+    })
+    record = store.get(page_id)
+    assert len(record['keyword_records']) == 2
+    assert record['keyword_records'][1]['title'] == 'New title'
+
+    # 不同市场单独记录
+    store.add_keyword_record(page_id, {
+        'timestamp': '2024-03-02T00:00:00', 'market': 'gh', 'keyword': 'shoes', 'title': 'GH'
+    })
+    assert len(store.get(page_id)['keyword_records']) == 3
+    print("✓ 添加关键词记录测试通过")
+
+def test_transaction_rollback():
+    """测试事务失败时回滚"""
+    print("\n测试事务回滚:")
+
+    store = ResultStore(None)
+    store.insert(make_record('a.com'))
+    try:
+        with store.transaction():
+            store.insert(make_record('b.com'))
+            raise RuntimeError('boom')
+    except RuntimeError:
+        pass
+    assert store.domains() == {'a.com'}
+    print("✓ 事务回滚测试通过")
+
+def test_reads_not_blocked_by_writes():
+    """测试文件数据库的读取不等待进行中的写事务"""
+    print("\n测试读写并发:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ResultStore(os.path.join(tmpdir, 'results.db'), json_path=None)
+        store.insert(make_record('a.com'))
+
+        writing, release = threading.Event(), threading.Event()
+
+        def writer():
+            with store.transaction():
+                store.insert(make_record('b.com'))
+                # 写线程在事务中能读到未提交的修改
+                assert store.domains() == {'a.com', 'b.com'}
+                writing.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        assert writing.wait(5)
+
+        results = []
+        reader = threading.Thread(target=lambda: results.append((store.domains(), store.count())))
+        reader.start()
+        reader.join(2)
+        assert not reader.is_alive(), "读取不应等待写事务"
+        assert results == [({'a.com'}, 1)], "只读到已提交的数据"
+
+        release.set()
+        thread.join()
+        assert store.domains() == {'a.com', 'b.com'}
+        store.close()
+    print("✓ 读写并发测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试结果存储模块...")
+
+    test_json_roundtrip()
+    test_lookup_update_delete()
+    test_add_keyword_record()
+    test_transaction_rollback()
+    test_reads_not_blocked_by_writes()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
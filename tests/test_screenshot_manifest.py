@@ -0,0 +1,115 @@
+"""
+截图清单测试
+"""
+import os
+import time
+import tempfile
+from pathlib import Path
+from PIL import Image
+from src.utils.screenshot_manifest import MANIFEST_FILE, ScreenshotManifest, screenshot_key
+
+def make_image(path, size=(40, 30), mtime=None):
+    """在 path 保存一张纯色图片"""
+    Image.new('RGB', size, 'white').save(path)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_screenshot_key():
+    """测试截图键与 capture_screenshot 的文件名规则一致"""
+    print("\n测试截图键:")
+
+    assert screenshot_key('https://www.Example.com/path?q=1') == 'wwwexamplecom'
+    assert screenshot_key('wwwexamplecom.jpg') == 'wwwexamplecom'
+    assert screenshot_key('/tmp/shots/my-site.png') == 'my-site'
+    print("✓ 截图键测试通过")
+
+def test_scan_and_lookup():
+    """测试扫描目录、按 URL 查找和清单持久化"""
+    print("\n测试扫描和查找:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = Path(tmpdir)
+        make_image(directory / 'wwwexamplecom.jpg', size=(120, 80))
+        make_image(directory / 'shopnet.png', mtime=1000)
+        make_image(directory / 'shopnet.jpg', mtime=2000)
+        (directory / 'notes.txt').write_text('x')
+
+        manifest = ScreenshotManifest(directory)
+        assert len(manifest) == 2
+        entry = manifest.lookup('https://www.example.com/landing')
+        assert entry['file'] == 'wwwexamplecom.jpg'
+        assert (entry['width'], entry['height']) == (120, 80)
+        assert entry['size'] == os.path.getsize(directory / 'wwwexamplecom.jpg')
+        # 加上或去掉 www 前缀
+        assert manifest.filename_for('https://example.com/') == 'wwwexamplecom.jpg'
+        assert manifest.filename_for('https://www.shop.net/') == 'shopnet.jpg', "同一键保留最新的文件"
+        assert manifest.filename_for('https://missing.com/') is None
+
+        # 重新打开时从清单文件读取
+        assert (directory / MANIFEST_FILE).exists()
+        reopened = ScreenshotManifest(directory)
+        assert reopened.lookup('https://example.com/') == entry
+        assert reopened.version == 0, "文件没有变化时清单不变"
+    print("✓ 扫描和查找测试通过")
+
+def test_record_and_refresh():
+    """测试保存截图后记录，以及目录变化后核对"""
+    print("\n测试清单更新:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = Path(tmpdir)
+        manifest = ScreenshotManifest(directory)
+        assert len(manifest) == 0
+
+        path = directory / 'newsitecom.jpg'
+        make_image(path)
+        version = manifest.version
+        assert manifest.record(path)['file'] == 'newsitecom.jpg'
+        assert manifest.version == version + 1
+        assert manifest.filename_for('https://newsite.com/') == 'newsitecom.jpg'
+
+        # 截图目录之外的文件被忽略
+        with tempfile.TemporaryDirectory() as other:
+            outside = Path(other) / 'othercom.jpg'
+            make_image(outside)
+            assert manifest.record(outside) is None
+
+        # 其他进程删除和新增的文件在 refresh() 后生效
+        os.unlink(path)
+        make_image(directory / 'addedcom.jpg')
+        assert manifest.refresh()
+        assert manifest.filename_for('https://newsite.com/') is None
+        assert manifest.filename_for('https://added.com/') == 'addedcom.jpg'
+        assert not manifest.refresh()
+    print("✓ 清单更新测试通过")
+
+def test_watcher():
+    """测试后台线程发现新截图"""
+    print("\n测试目录监视:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = Path(tmpdir)
+        manifest = ScreenshotManifest(directory, watch_interval=0.05).start_watching()
+        try:
+            make_image(directory / 'watchedcom.jpg')
+            deadline = time.monotonic() + 5
+            while manifest.filename_for('https://watched.com/') is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert manifest.filename_for('https://watched.com/') == 'watchedcom.jpg'
+        finally:
+            manifest.stop_watching()
+    print("✓ 目录监视测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试截图清单...")
+
+    test_screenshot_key()
+    test_scan_and_lookup()
+    test_record_and_refresh()
+    test_watcher()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+搜索索引测试
+"""
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.core.results.store import ResultStore
+from src.core.results.search import build_match_query, search_pages, tokenize
+from tests.helpers import create_store
+
+# 包含中英文标题的结果记录
+RESULTS = [
+    {
+        'domain': 'shoeshop.com',
+        'final_url': 'https://www.shoeshop.com/',
+        'keyword_records': [
+            {'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': 'running shoes', 'title': 'Best Running Shoes'},
+        ]
+    },
+    {
+        'domain': 'example.cn',
+        'final_url': 'https://example.cn/',
+        'keyword_records': [
+            {'timestamp': '2024-01-02T00:00:00', 'market': 'in', 'keyword': '运动鞋', 'title': '运动鞋特价 Sale'},
+        ]
+    },
+    {
+        'domain': 'hats.net',
+        'final_url': 'https://hats.net/',
+        'keyword_records': [
+            {'timestamp': '2024-01-03T00:00:00', 'market': 'gh', 'keyword': 'hats', 'title': 'Shoes and Hats'},
+        ]
+    },
+]
+
+def ids(store, text):
+    """搜索并返回落地页域名"""
+    return [store.get(result['id'])['domain'] for result in search_pages(store, text)['results']]
+
+def test_tokenize():
+    """测试中英文混合分词"""
+    print("\n测试分词:")
+
+    assert tokenize('Best ＲＵＮＮＩＮＧ shoes_2024') == ['best', 'running', 'shoes', '2024']
+    assert tokenize('运动鞋 Sale') == ['运', '动', '鞋', '运动', '动鞋', 'sale']
+    assert tokenize('www.shoe-shop.com') == ['www', 'shoe', 'shop', 'com']
+    assert tokenize(None) == []
+
+    assert build_match_query('Run 运动鞋') == '"run"* "运动" "动鞋"'
+    assert build_match_query('鞋', prefix=False) == '"鞋"'
+    assert build_match_query('"*) OR') == '"or"*', "查询语法字符被忽略"
+    assert build_match_query('  ') is None
+    print("✓ 分词测试通过")
+
+def test_search_ranking(make_store):
+    """测试前缀匹配、中文匹配和排序"""
+    print("\n测试搜索:")
+
+    store = make_store(RESULTS)
+    assert ids(store, 'runn') == ['shoeshop.com'], "前缀匹配"
+    assert ids(store, '运动') == ['example.cn']
+    assert ids(store, '鞋') == ['example.cn']
+    assert ids(store, '动鞋 sale') == ['example.cn']
+    assert ids(store, 'hats.net') == ['hats.net']
+    # 域名匹配的权重高于标题
+    assert ids(store, 'shoe') == ['shoeshop.com', 'hats.net']
+    assert ids(store, 'nothing') == []
+    assert search_pages(store, '***')['results'] == []
+    print("✓ 搜索测试通过")
+
+def test_incremental_updates(make_store):
+    """测试写入时在同一事务中更新索引"""
+    print("\n测试增量更新:")
+
+    store = make_store(RESULTS)
+    page_id, record = store.find_one('domain', 'hats.net')
+    store.add_keyword_record(page_id, {'timestamp': '2024-02-01T00:00:00', 'market': 'gh', 'keyword': 'caps', 'title': '帽子'})
+    assert ids(store, '帽子') == ['hats.net']
+
+    record['keyword_records'] = [{'timestamp': '2024-02-02T00:00:00', 'market': 'gh', 'keyword': 'scarves', 'title': 'Scarves'}]
+    store.update(page_id, record)
+    assert ids(store, 'scarv') == ['hats.net'] and ids(store, '帽子') == []
+
+    store.delete('domain', 'hats.net')
+    assert ids(store, 'scarves') == []
+
+    store.replace_all([{'domain': 'new.com', 'keyword_records': [{'keyword': 'boots', 'title': 'Boots'}]}])
+    assert ids(store, 'boot') == ['new.com'] and ids(store, 'run') == []
+    print("✓ 增量更新测试通过")
+
+def test_existing_database_is_indexed():
+    """测试已有数据的数据库第一次打开时建立索引"""
+    print("\n测试已有数据库:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / 'results.db'
+        store = ResultStore(path, json_path=None)
+        store.insert({'domain': 'legacy.com', 'keyword_records': [{'keyword': 'legacy', 'title': 'Old Ad'}]})
+        store.close()
+
+        # 模拟没有搜索索引的旧数据库
+        conn = sqlite3.connect(path)
+        conn.execute('DROP TABLE search_index')
+        conn.commit()
+        conn.close()
+
+        store = ResultStore(path, json_path=None)
+        assert ids(store, 'old ad') == ['legacy.com']
+        store.close()
+    print("✓ 已有数据库测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试搜索索引...")
+
+    test_tokenize()
+    test_search_ranking(create_store)
+    test_incremental_updates(create_store)
+    test_existing_database_is_indexed()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+结果文件序列化模块测试
+"""
+import os
+import json
+import tempfile
+import pytest
+from src.core.results import serialization
+from src.core.results.serialization import (
+    FORMAT_COMPACT,
+    FORMAT_JSON,
+    FORMAT_MSGPACK,
+    ResultsWriter,
+    detect_format,
+    dump_results,
+    encode,
+    format_for_path,
+    iter_results,
+    load_results
+)
+
+RESULTS = [
+    {
+        'domain': 'a.com',
+        'final_url': 'https://a.com/',
+        'keyword_records': [{'timestamp': '2024-01-01T00:00:00', 'market': 'in', 'keyword': '鞋子', 'title': 'A'}]
+    }
+]
+
+def test_round_trip():
+    """测试各格式写入后读取一致，紧凑格式更小"""
+    print("\n测试写入和读取:")
+
+    sizes = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in (FORMAT_JSON, FORMAT_COMPACT):
+            path = os.path.join(tmpdir, f'{fmt}.json')
+            sizes[fmt] = dump_results(RESULTS, path, fmt=fmt)
+            assert load_results(path) == RESULTS
+            # 仍是标准 JSON，其他工具可以直接读取
+            with open(path, 'r', encoding='utf-8') as f:
+                assert json.load(f) == RESULTS
+    assert sizes[FORMAT_COMPACT] < sizes[FORMAT_JSON]
+    print("✓ 写入和读取测试通过")
+
+def test_detect_format():
+    """测试格式识别"""
+    print("\n测试格式识别:")
+
+    assert detect_format(b'[{"a": 1}]') == FORMAT_JSON
+    assert detect_format(b'\n  {"a": 1}') == FORMAT_JSON
+    assert detect_format(b'\xef\xbb\xbf[]') == FORMAT_JSON
+    assert detect_format(b'\x91\x81\xa1a\x01') == FORMAT_MSGPACK
+    assert detect_format(b'\xdc\x00\x01\x01') == FORMAT_MSGPACK
+    assert detect_format(b'\xde\x00\x00') == FORMAT_MSGPACK
+    # 不是数组或映射前缀的内容按 JSON 处理，损坏的文件报告 JSON 解码错误
+    assert detect_format(b'invalid json') == FORMAT_JSON
+    assert detect_format(b'') == FORMAT_JSON
+    with pytest.raises(ValueError):
+        serialization.decode(b'invalid json')
+    assert format_for_path('results.msgpack') == FORMAT_MSGPACK
+    assert format_for_path('results.json', default=FORMAT_JSON) == FORMAT_JSON
+    print("✓ 格式识别测试通过")
+
+def test_msgpack():
+    """测试 MessagePack 格式（需要安装 msgpack）"""
+    print("\n测试 MessagePack:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'results.msgpack')
+        if serialization.msgpack is None:
+            with pytest.raises(RuntimeError):
+                dump_results(RESULTS, path)
+            assert not os.path.exists(path)
+            print("✓ 未安装 msgpack 时拒绝写入")
+            return
+
+        dump_results(RESULTS, path)
+        assert load_results(path) == RESULTS
+        assert os.path.getsize(path) < len(encode(RESULTS, FORMAT_COMPACT))
+    print("✓ MessagePack 测试通过")
+
+def test_atomic_write_keeps_original_on_failure():
+    """测试写入失败时原文件保持完整且不留下临时文件"""
+    print("\n测试原子写入:")
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'all_results.json')
+        dump_results(RESULTS, path)
+
+        original_replace = serialization.os.replace
+        serialization.os.replace = fail
+        try:
+            with pytest.raises(OSError):
+                dump_results([{'domain': 'b.com'}], path)
+        finally:
+            serialization.os.replace = original_replace
+
+        assert load_results(path) == RESULTS
+        assert os.listdir(tmpdir) == ['all_results.json']
+    print("✓ 原子写入测试通过")
+
+def test_streaming_round_trip():
+    """测试逐条读写：读入边界落在记录中间时也能正确解析"""
+    print("\n测试流式读写:")
+
+    records = [
+        {'domain': f'site{i}.com', 'title': '标题' * i, 'score': i * 1.5, 'keyword_records': []}
+        for i in range(200)
+    ] + [12345, 'text', None]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in (FORMAT_JSON, FORMAT_COMPACT):
+            path = os.path.join(tmpdir, f'{fmt}.json')
+            with ResultsWriter(path, fmt=fmt) as writer:
+                for record in records:
+                    writer.write(record)
+            assert writer.count == len(records)
+            assert load_results(path) == records
+            for chunk_size in (1, 7, 1 << 20):
+                assert list(iter_results(path, chunk_size=chunk_size)) == records
+
+        # 空列表
+        path = os.path.join(tmpdir, 'empty.json')
+        with ResultsWriter(path) as writer:
+            pass
+        assert load_results(path) == [] and list(iter_results(path)) == []
+    print("✓ 流式读写测试通过")
+
+def test_streaming_rewrite_in_place():
+    """测试边读边写同一个文件，出错时原文件不变"""
+    print("\n测试原地改写:")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'all_results.json')
+        dump_results([{'n': i} for i in range(10)], path, fmt=FORMAT_JSON)
+
+        with ResultsWriter(path) as writer:
+            for record in iter_results(path):
+                writer.write({'n': record['n'] * 2})
+        assert load_results(path) == [{'n': i * 2} for i in range(10)]
+
+        with pytest.raises(KeyError):
+            with ResultsWriter(path) as writer:
+                for record in iter_results(path):
+                    writer.write(record['missing'])
+        assert load_results(path) == [{'n': i * 2} for i in range(10)]
+        assert os.listdir(tmpdir) == ['all_results.json']
+
+        # 截断的文件
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[{"n": 1}, {"n": 2')
+        with pytest.raises(ValueError):
+            list(iter_results(path))
+    print("✓ 原地改写测试通过")
+
+def main():
+    """运行所有测试"""
+    print("开始测试结果文件序列化模块...")
+
+    test_round_trip()
+    test_detect_format()
+    test_msgpack()
+    test_atomic_write_keeps_original_on_failure()
+    test_streaming_round_trip()
+    test_streaming_rewrite_in_place()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+搜索结果页快照解析模块测试
+"""
+import tempfile
+from pathlib import Path
+from src.core.crawler.serp_parser import (
+    parse_serp_html,
+    parse_serp_snapshot,
+    save_serp_snapshot
+)
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+def load_fixture(name):
+    """读取测试用的页面快照"""
+    return (FIXTURES_DIR / name).read_text(encoding='utf-8')
+
+def test_parse_ads_fixture():
+    """测试解析带广告的快照"""
+    print("\n测试解析带广告的快照:")
+
+    extracted = parse_serp_html(load_fixture('serp_mobile_ads.html'))
+
+    assert extracted['selector'] == 'div.uEierd'
+    assert extracted['total'] == 4
+    assert extracted['fallback'] is False
+    assert extracted['raw_ads'] == [
+        {
+            'title': 'Cheap Flights to Goa',
+            'link': 'https://www.google.com/aclk?sa=l&ai=AAA&adurl=https://www.flyfast.example/deals',
+            'position': 1
+        },
+        {
+            'title': 'TravelHub - Compare Fares',
+            'link': 'https://www.googleadservices.com/pagead/aclk?adurl=https://www.travelhub.example/in',
+            'position': 2
+        },
+    ]
+    for ad in extracted['raw_ads']:
+        print(f"✓ {ad['position']}: {ad['title']}")
+
+def test_parse_no_ads_fixture():
+    """测试解析无广告的快照"""
+    print("\n测试解析无广告的快照:")
+
+    extracted = parse_serp_html(load_fixture('serp_no_ads.html'))
+
+    assert extracted == {'selector': None, 'total': 0, 'raw_ads': [], 'fallback': False}
+    print("✓ 无广告快照解析正确")
+
+def test_relative_links_use_base_url():
+    """测试相对链接按页面地址补全"""
+    print("\n测试相对链接补全:")
+
+    html = '<div class="uEierd"><a href="/aclk?adurl=https://a.example"><h3>Ad</h3></a></div>'
+    extracted = parse_serp_html(html, 'https://www.google.co.in/search?q=test')
+
+    assert extracted['raw_ads'][0]['link'] == 'https://www.google.co.in/aclk?adurl=https://a.example'
+    print("✓ 相对链接补全正确")
+
+def test_snapshot_roundtrip():
+    """测试保存并重新解析快照"""
+    print("\n测试快照保存和重新解析:")
+
+    html = load_fixture('serp_mobile_ads.html')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = save_serp_snapshot(html, 'cheap flights', 'IN', tmpdir)
+        assert path is not None and path.name.startswith('in_cheap_flights_')
+        assert path.suffix == '.gz'
+
+        assert parse_serp_snapshot(path) == parse_serp_html(html)
+        assert parse_serp_snapshot(FIXTURES_DIR / 'serp_mobile_ads.html') == parse_serp_html(html)
+    print("✓ 快照保存和重新解析结果一致")
+
+def main():
+    """运行所有测试"""
+    print("开始测试搜索结果页快照解析模块...")
+
+    test_parse_ads_fixture()
+    test_parse_no_ads_fixture()
+    test_relative_links_use_base_url()
+    test_snapshot_roundtrip()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()
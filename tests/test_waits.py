@@ -0,0 +1,88 @@
+"""
+页面就绪等待模块测试
+"""
+import time
+from src.core.crawler.waits import wait_for_serp_ready
+
+class ProbeDriver:
+    """按顺序返回预设页面状态的模拟驱动"""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        if len(self.states) > 1:
+            return self.states.pop(0)
+        return self.states[0]
+
+def test_return_when_ads_rendered():
+    """测试广告出现后立即返回"""
+    print("\n测试广告出现后立即返回:")
+
+    driver = ProbeDriver([
+        {'ads': 0, 'results': False, 'blocked': False, 'ready': 'loading', 'quiet': 0},
+        {'ads': 3, 'results': True, 'blocked': False, 'ready': 'complete', 'quiet': 0},
+    ])
+    readiness = wait_for_serp_ready(driver, timeout=5, quiet_period=0.5, poll_interval=0.01)
+
+    assert readiness.state == 'ads'
+    assert readiness.ads == 3
+    assert readiness.waited < 1, "广告出现后不应继续等待"
+    print(f"✓ 等待 {readiness.waited:.3f}s 后返回")
+
+def test_no_ads_marker():
+    """测试无广告页面"""
+    print("\n测试无广告页面:")
+
+    driver = ProbeDriver([
+        {'ads': 0, 'results': True, 'blocked': False, 'ready': 'complete', 'quiet': 0.1},
+        {'ads': 0, 'results': True, 'blocked': False, 'ready': 'complete', 'quiet': 0.6},
+    ])
+    readiness = wait_for_serp_ready(driver, timeout=5, quiet_period=0.5, poll_interval=0.01)
+
+    assert readiness.state == 'no_ads'
+    assert driver.calls == 2
+    print("✓ 无广告页面检测正确")
+
+def test_blocked_page():
+    """测试验证码拦截页面"""
+    print("\n测试验证码拦截页面:")
+
+    driver = ProbeDriver([
+        {'ads': 0, 'results': False, 'blocked': True, 'ready': 'complete', 'quiet': 0},
+    ])
+    readiness = wait_for_serp_ready(driver, timeout=5, poll_interval=0.01)
+
+    assert readiness.state == 'blocked'
+    print("✓ 拦截页面检测正确")
+
+def test_timeout_upper_bound():
+    """测试等待上限"""
+    print("\n测试等待上限:")
+
+    driver = ProbeDriver([
+        {'ads': 0, 'results': False, 'blocked': False, 'ready': 'loading', 'quiet': 0},
+    ])
+    start = time.monotonic()
+    readiness = wait_for_serp_ready(driver, timeout=0.2, quiet_period=0.5, poll_interval=0.02)
+    elapsed = time.monotonic() - start
+
+    assert readiness.state == 'timeout'
+    assert elapsed < 1, "不应超过等待上限太多"
+    print(f"✓ 超时返回, 等待 {elapsed:.3f}s")
+
+def main():
+    """运行所有测试"""
+    print("开始测试页面就绪等待模块...")
+
+    test_return_when_ads_rendered()
+    test_no_ads_marker()
+    test_blocked_page()
+    test_timeout_upper_bound()
+
+    print("\n所有测试通过! ✨")
+
+if __name__ == "__main__":
+    main()